@@ -2,7 +2,6 @@
 """
 Analyze the web_app directory structure and identify files for cleanup
 """
-import os
 import json
 from pathlib import Path
 from datetime import datetime
@@ -12,6 +11,13 @@ import shutil
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
 from scripts.logger import log_action
+from scripts.docs_dedup import find_near_duplicates
+from scripts.fs_scanner import scan_tree, parent_parts
+from scripts.scan_cache import ScanCache
+from scripts.tree_snapshot import take_snapshot, snapshot_path, diff_snapshot_files
+from scripts.directory_stats import DirectoryStats, format_stats_table
+from scripts.glob_matcher import GlobMatcher
+from scripts.duplicate_finder import SizeIndex, find_duplicate_files
 
 # Define critical directories and files
 CRITICAL_PATHS = {
@@ -101,54 +107,48 @@ ORGANIZATION_MAP = {
     ],
 }
 
+# Directories whose files are never cleanup/organization candidates
+CLEANUP_SKIP_DIRS = {'node_modules', '.git', '.next', 'src', '.quarantine'}
+
+# Cleanup candidates that also name real test suites and the backup archive;
+# they only apply to stray files outside these directories
+SCOPED_CLEANUP_CANDIDATES = {'*_backup_*', '*_supabase_backup_*', 'test_*.py', 'debug_*.py'}
+SCOPED_CLEANUP_SKIP_DIRS = {'tests', 'backup'}
+
+# Byte-identical copies are only planned for deletion inside these directories
+DUPLICATE_DELETE_DIRS = {'backup'}
+
+# Cleanup candidates and organization categories compiled into one matcher
+CLEANUP_PATTERNS = {
+    'cleanup': sorted(CLEANUP_CANDIDATES - SCOPED_CLEANUP_CANDIDATES),
+    'scoped_cleanup': sorted(SCOPED_CLEANUP_CANDIDATES),
+    **ORGANIZATION_MAP,
+}
+CLEANUP_MATCHER = GlobMatcher(CLEANUP_PATTERNS)
+
+def is_critical_path(rel_path):
+    """Whether rel_path is a critical path or lies inside a critical directory"""
+    rel_path = rel_path.rstrip('/')
+    return any(rel_path == critical.rstrip('/') or rel_path.startswith(critical.rstrip('/') + '/')
+               for critical in CRITICAL_PATHS)
+
+def is_duplicate_archive(rel_path):
+    """Whether a redundant copy at rel_path may be deleted: it lies inside a backup directory"""
+    return bool(DUPLICATE_DELETE_DIRS.intersection(rel_path.split('/')[:-1]))
+
 def get_directory_stats(path):
     """Get statistics about a directory"""
-    stats = {
-        'total_files': 0,
-        'total_dirs': 0,
-        'total_size': 0,
-        'file_types': {},
-        'largest_files': [],
-        'duplicate_patterns': {},
-    }
-    
-    for root, dirs, files in os.walk(path):
-        stats['total_dirs'] += len(dirs)
-        stats['total_files'] += len(files)
-        
-        for file in files:
-            file_path = Path(root) / file
-            try:
-                size = file_path.stat().st_size
-                stats['total_size'] += size
-                
-                # Track file types
-                ext = file_path.suffix.lower()
-                stats['file_types'][ext] = stats['file_types'].get(ext, 0) + 1
-                
-                # Track largest files
-                stats['largest_files'].append({
-                    'path': str(file_path.relative_to(path)),
-                    'size': size
-                })
-                
-                # Check for duplicate patterns
-                base_name = file_path.stem
-                for pattern in ['backup', 'v1', 'v2', 'old', 'copy', 'test']:
-                    if pattern in base_name.lower():
-                        stats['duplicate_patterns'][pattern] = stats['duplicate_patterns'].get(pattern, 0) + 1
-                        
-            except Exception as e:
-                log_action(f"Error processing {file_path}: {e}")
-    
-    # Sort largest files
-    stats['largest_files'].sort(key=lambda x: x['size'], reverse=True)
-    stats['largest_files'] = stats['largest_files'][:20]  # Top 20
-    
-    return stats
+    stats = DirectoryStats()
+    for entry in scan_tree(path):
+        stats.add(entry)
+    return stats.to_dict()
 
-def analyze_scripts_directory(scripts_path):
-    """Analyze scripts directory for redundancy"""
+def analyze_scripts_directory(scripts_path, script_files=None):
+    """Analyze scripts directory for redundancy
+
+    script_files may be passed in from an existing scan to avoid walking
+    the directory again.
+    """
     script_analysis = {
         'database_scripts': [],
         'test_scripts': [],
@@ -158,7 +158,10 @@ def analyze_scripts_directory(scripts_path):
         'duplicates': []
     }
     
-    for file in scripts_path.glob('**/*.py'):
+    if script_files is None:
+        script_files = scripts_path.glob('**/*.py')
+    
+    for file in script_files:
         name = file.name.lower()
         
         if 'database' in str(file) or 'supabase' in name or 'firebase' in name:
@@ -178,17 +181,23 @@ def analyze_scripts_directory(scripts_path):
     
     return script_analysis
 
-def analyze_docs_directory(docs_path):
-    """Analyze docs directory for redundancy"""
+def analyze_docs_directory(docs_path, doc_files=None):
+    """Analyze docs directory for redundancy
+
+    doc_files may be passed in from an existing scan to avoid walking the
+    directory again.
+    """
     docs_analysis = {
         'total_docs': 0,
         'deprecated_docs': [],
         'duplicate_topics': {},
         'index_files': [],
-        'backup_files': []
+        'backup_files': [],
+        'near_duplicates': []
     }
     
-    for file in docs_path.glob('**/*.md'):
+    doc_files = sorted(docs_path.glob('**/*.md') if doc_files is None else doc_files)
+    for file in doc_files:
         docs_analysis['total_docs'] += 1
         name = file.name.lower()
         
@@ -206,48 +215,119 @@ def analyze_docs_directory(docs_path):
                     docs_analysis['duplicate_topics'][topic] = []
                 docs_analysis['duplicate_topics'][topic].append(str(file.relative_to(docs_path)))
     
+    # Content-level near-duplicates (MinHash/LSH), e.g. timestamped plan backups
+    for cluster in find_near_duplicates(doc_files):
+        docs_analysis['near_duplicates'].append({
+            'canonical': str(Path(cluster['canonical']).relative_to(docs_path)),
+            'members': [
+                {'path': str(Path(member['path']).relative_to(docs_path)), 'similarity': member['similarity']}
+                for member in cluster['members']
+            ]
+        })
+    
     return docs_analysis
 
-def generate_cleanup_plan(web_app_path):
-    """Generate a comprehensive cleanup plan"""
+def generate_cleanup_plan(web_app_path, snapshot=None):
+    """Generate a comprehensive cleanup plan
+
+    If snapshot names a snapshot, the tree is also saved as a binary
+    snapshot for later diffing. It comes from a fresh scan, because
+    catalog entries can miss files rewritten in place.
+    """
     log_action("Starting directory structure analysis")
     
-    # Get overall stats
-    stats = get_directory_stats(web_app_path)
-    
-    # Analyze specific directories
-    scripts_analysis = analyze_scripts_directory(web_app_path / 'scripts')
-    docs_analysis = analyze_docs_directory(web_app_path / 'docs')
-    
-    # Identify files to clean
+    # A single traversal feeds the stats, the scripts/docs analyses and
+    # the cleanup/organization matching
+    directory_stats = DirectoryStats()
+    script_files = []
+    doc_files = []
     cleanup_files = []
     organize_files = {}
     
-    for root, dirs, files in os.walk(web_app_path):
+    # Directories already listed for cleanup; their contents go with them
+    cleanup_dirs = set()
+    # Files eligible for the byte-identical duplicate check, as paths by size
+    duplicate_candidates = SizeIndex(web_app_path)
+    
+    # Unchanged directories are served from the scan catalog instead of relisted
+    scan_cache = ScanCache(web_app_path / 'logs' / 'scan_cache.db')
+    
+    for entry in scan_cache.scan(web_app_path):
+        directory_stats.add(entry)
+        parents = parent_parts(entry)
+        
+        if not entry.is_dir:
+            if parents[:1] == ['scripts'] and entry.name.endswith('.py'):
+                script_files.append(Path(entry.path))
+            elif parents[:1] == ['docs'] and entry.name.endswith('.md'):
+                doc_files.append(Path(entry.path))
+        
         # Skip critical directories
-        if any(critical in str(root) for critical in ['node_modules', '.git', '.next', 'src']):
+        if CLEANUP_SKIP_DIRS.intersection(parents):
             continue
-            
-        for file in files:
-            file_path = Path(root) / file
-            relative_path = file_path.relative_to(web_app_path)
-            
-            # Check if file should be cleaned
-            for pattern in CLEANUP_CANDIDATES:
-                if pattern.startswith('*'):
-                    if file.endswith(pattern[1:]) or pattern[1:] in file:
-                        cleanup_files.append(str(relative_path))
-                elif file == pattern:
-                    cleanup_files.append(str(relative_path))
-            
-            # Check if file should be organized
-            for category, patterns in ORGANIZATION_MAP.items():
-                for pattern in patterns:
-                    if pattern.startswith('*'):
-                        if file.endswith(pattern[1:]):
-                            if category not in organize_files:
-                                organize_files[category] = []
-                            organize_files[category].append(str(relative_path))
+        
+        # Parents are always scanned before their children
+        if cleanup_dirs and any('/'.join(parents[:depth]) in cleanup_dirs
+                                for depth in range(1, len(parents) + 1)):
+            continue
+        
+        if not entry.is_dir:
+            duplicate_candidates.add(entry)
+        
+        # Critical files and everything inside critical directories are never moved or deleted
+        if is_critical_path(entry.rel_path):
+            continue
+        
+        relative_path = entry.rel_path
+        
+        # One precompiled lookup covers every cleanup and organization pattern
+        categories = CLEANUP_MATCHER.match(entry.name, entry.is_dir)
+        if 'scoped_cleanup' in categories:
+            categories.remove('scoped_cleanup')
+            if 'cleanup' not in categories and not SCOPED_CLEANUP_SKIP_DIRS.intersection(parents):
+                categories.insert(0, 'cleanup')
+        for category in categories:
+            if category == 'cleanup':
+                if entry.is_dir:
+                    cleanup_dirs.add(relative_path)
+                    cleanup_files.append(f"{relative_path}/")
+                else:
+                    cleanup_files.append(relative_path)
+            elif not entry.is_dir:
+                organize_files.setdefault(category, []).append(relative_path)
+    
+    stats = directory_stats.to_dict()
+    
+    if snapshot:
+        take_snapshot(web_app_path, snapshot_path(snapshot))
+    
+    # Identical files are reported with their reclaimable bytes. A copy
+    # inside a critical directory such as public/ is kept over any other
+    duplicate_files = find_duplicate_files(duplicate_candidates, hash_cache=scan_cache,
+                                           protected=is_critical_path)
+    log_action(f"Scan cache: {scan_cache.dirs_listed} directories listed, {scan_cache.dirs_reused} reused")
+    scan_cache.close()
+    
+    # Copies can each be needed where they are, so only those inside a
+    # backup directory, whose kept original lies outside one, are deleted
+    listed = set(cleanup_files)
+    for group in duplicate_files:
+        if group['keep'] in listed or is_duplicate_archive(group['keep']):
+            continue
+        for path in group['duplicates']:
+            if path not in listed and is_duplicate_archive(path) and not is_critical_path(path):
+                cleanup_files.append(path)
+                listed.add(path)
+    reclaimable_bytes = sum(group['reclaimable_bytes'] for group in duplicate_files)
+    
+    # Scan order depends on thread scheduling; keep the plan deterministic
+    cleanup_files.sort()
+    for files in organize_files.values():
+        files.sort()
+    
+    # Analyze specific directories from the scanned file lists
+    scripts_analysis = analyze_scripts_directory(web_app_path / 'scripts', sorted(script_files))
+    docs_analysis = analyze_docs_directory(web_app_path / 'docs', doc_files)
     
     # Create cleanup plan
     cleanup_plan = {
@@ -261,6 +341,9 @@ def generate_cleanup_plan(web_app_path):
             'large_files_to_review': stats['largest_files'][:10],
             'duplicate_scripts': scripts_analysis['duplicates'],
             'deprecated_docs': docs_analysis['deprecated_docs'],
+            'near_duplicate_docs': docs_analysis['near_duplicates'],
+            'duplicate_files': duplicate_files,
+            'reclaimable_bytes': reclaimable_bytes,
         },
         'organization_plan': {
             'create_directories': [
@@ -305,6 +388,8 @@ def generate_cleanup_plan(web_app_path):
     print(f"Files to organize: {sum(len(files) for files in organize_files.values())}")
     print(f"Duplicate scripts found: {len(scripts_analysis['duplicates'])}")
     print(f"Deprecated docs found: {len(docs_analysis['deprecated_docs'])}")
+    print(f"Near-duplicate doc clusters: {len(docs_analysis['near_duplicates'])}")
+    print(f"Duplicate file groups: {len(duplicate_files)} ({reclaimable_bytes / (1024*1024):.2f} MB reclaimable)")
     
     print("\nTop 5 largest files:")
     for file in stats['largest_files'][:5]:
@@ -314,14 +399,37 @@ def generate_cleanup_plan(web_app_path):
     for ext, count in sorted(stats['file_types'].items(), key=lambda x: x[1], reverse=True)[:10]:
         print(f"  - {ext or 'no extension'}: {count} files")
     
+    print("\nStorage breakdown:")
+    print(format_stats_table(stats))
+    
     return cleanup_plan
 
 def main():
-    """Main execution function"""
+    """Main execution function
+
+    Usage:
+        python3 analyze_directory_structure.py [--snapshot NAME]
+        python3 analyze_directory_structure.py --diff OLD NEW
+    """
     web_app_path = Path("/app/main/web_app")
+    args = sys.argv[1:]
+    
+    if args[:1] == ['--diff']:
+        if len(args) != 3:
+            print(main.__doc__)
+            return
+        diff_snapshot_files(args[1], args[2])
+        return
+    
+    snapshot = None
+    if args[:1] == ['--snapshot']:
+        if len(args) != 2:
+            print(main.__doc__)
+            return
+        snapshot = args[1]
     
     # Generate cleanup plan
-    cleanup_plan = generate_cleanup_plan(web_app_path)
+    cleanup_plan = generate_cleanup_plan(web_app_path, snapshot)
     
     print("\n" + "="*60)
     print("Next Steps:")
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Asyncio counterpart of GoogleCloudHelper for high-concurrency transfers
+Talks to the Cloud Storage JSON API over one pooled aiohttp session, bounds in-flight
+requests with a semaphore and streams file bodies in chunks, so a single process can
+drive hundreds of concurrent small-object transfers
+
+Usage:
+    python3 async_google_cloud_helper.py upload <bucket> <prefix> <path>...
+    python3 async_google_cloud_helper.py download <bucket> <prefix> <destination_dir>
+    python3 async_google_cloud_helper.py list <bucket> [prefix]
+"""
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from urllib.parse import quote
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.google_cloud_helper import (
+    BACKOFF_SECONDS,
+    LIST_FIELDS,
+    LIST_PAGE_SIZE,
+    MAX_BACKOFF_SECONDS,
+    MAX_COMPOSE_SOURCES,
+    RETRYABLE_STATUS_CODES,
+    SERVICE_KEY_PATH,
+    STORAGE_ENDPOINT,
+    STORAGE_SCOPES,
+    TRANSFER_ATTEMPTS,
+    local_target,
+)
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+GOOGLE_STORAGE_ENDPOINT = 'https://storage.googleapis.com'
+
+# Requests in flight at once; also the size of the connection pool
+ASYNC_CONCURRENCY = 256
+
+# Bytes per streamed body chunk
+STREAM_CHUNK = 256 * 1024
+
+# Refresh the access token this long before it expires
+TOKEN_REFRESH_MARGIN = 300
+
+
+class StorageError(Exception):
+    """Failed JSON API request; code is the HTTP status"""
+
+    def __init__(self, code, message):
+        super().__init__(f"HTTP {code}: {message}")
+        self.code = code
+
+
+async def _read_chunks(path, chunk_size=STREAM_CHUNK):
+    """Yield a file's contents in chunks, reading off the event loop"""
+    loop = asyncio.get_running_loop()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = await loop.run_in_executor(None, f.read, chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+class AsyncGoogleCloudHelper:
+    """Async storage helper; use as `async with AsyncGoogleCloudHelper() as helper:`
+
+    Every request goes through one aiohttp session and a semaphore of
+    `concurrency` slots. Transient failures are retried with the same
+    jittered backoff as GoogleCloudHelper.
+    """
+
+    def __init__(self, endpoint=STORAGE_ENDPOINT, concurrency=ASYNC_CONCURRENCY):
+        if aiohttp is None:
+            raise ImportError("aiohttp not installed. Run: pip install --break-system-packages aiohttp")
+        self.endpoint = (endpoint or GOOGLE_STORAGE_ENDPOINT).rstrip('/')
+        self.emulated = bool(endpoint)
+        self.concurrency = concurrency
+        self.session = None
+        self._semaphore = None
+        self._credentials = None
+        self._token_lock = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.concurrency)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=None))
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._token_lock = asyncio.Lock()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+
+    async def _auth_headers(self):
+        """Bearer token for Google; emulators take anonymous requests"""
+        if self.emulated:
+            return {}
+        async with self._token_lock:
+            if self._credentials is None:
+                from google.oauth2 import service_account
+                self._credentials = service_account.Credentials.from_service_account_file(
+                    SERVICE_KEY_PATH, scopes=STORAGE_SCOPES
+                )
+            expiry = self._credentials.expiry
+            if not self._credentials.token or expiry is None or \
+                    expiry.timestamp() - time.time() < TOKEN_REFRESH_MARGIN:
+                from google.auth.transport.requests import Request
+                await asyncio.get_running_loop().run_in_executor(None, self._credentials.refresh, Request())
+            return {'Authorization': f"Bearer {self._credentials.token}"}
+
+    async def _request(self, method, url, handle, body=None, headers=None, params=None):
+        """Send one request under the semaphore, retrying transient failures
+
+        body is a zero-argument callable so each attempt gets a fresh
+        stream; handle receives the response and returns the result.
+        """
+        for attempt in range(TRANSFER_ATTEMPTS):
+            try:
+                async with self._semaphore:
+                    request_headers = {**await self._auth_headers(), **(headers or {})}
+                    async with self.session.request(method, url, params=params, headers=request_headers,
+                                                    data=body() if body else None) as response:
+                        if response.status >= 400:
+                            raise StorageError(response.status, await response.text())
+                        return await handle(response)
+            except (StorageError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError,
+                    asyncio.TimeoutError) as e:
+                retryable = not isinstance(e, StorageError) or e.code in RETRYABLE_STATUS_CODES
+                if attempt == TRANSFER_ATTEMPTS - 1 or not retryable:
+                    raise
+                delay = min(MAX_BACKOFF_SECONDS, BACKOFF_SECONDS * 2 ** attempt)
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+    def _object_url(self, bucket_name, blob_name, suffix=''):
+        return f"{self.endpoint}/storage/v1/b/{quote(bucket_name, safe='')}/o/{quote(blob_name, safe='')}{suffix}"
+
+    async def list_files(self, bucket_name, prefix=None, fields=LIST_FIELDS, delimiter=None,
+                         page_size=LIST_PAGE_SIZE):
+        """Async generator over object resources (dicts) under prefix
+
+        With a delimiter, "directory" prefixes are yielded as strings
+        after each page's objects.
+        """
+        url = f"{self.endpoint}/storage/v1/b/{quote(bucket_name, safe='')}/o"
+        params = {'maxResults': str(page_size), 'fields': f"items({fields}),nextPageToken,prefixes"}
+        if prefix:
+            params['prefix'] = prefix
+        if delimiter:
+            params['delimiter'] = delimiter
+
+        while True:
+            page = await self._request('GET', url, lambda response: response.json(), params=params)
+            for item in page.get('items', []):
+                yield item
+            for directory in page.get('prefixes', []):
+                yield directory
+            if not page.get('nextPageToken'):
+                return
+            params['pageToken'] = page['nextPageToken']
+
+    async def upload_file(self, bucket_name, source_file_path, destination_blob_name=None):
+        """Stream a file into an object with a single media upload; returns the object resource"""
+        source_file_path = Path(source_file_path)
+        if destination_blob_name is None:
+            destination_blob_name = source_file_path.name
+        url = f"{self.endpoint}/upload/storage/v1/b/{quote(bucket_name, safe='')}/o"
+        headers = {
+            'Content-Type': 'application/octet-stream',
+            'Content-Length': str(source_file_path.stat().st_size),
+        }
+        return await self._request(
+            'POST', url, lambda response: response.json(),
+            body=lambda: _read_chunks(source_file_path), headers=headers,
+            params={'uploadType': 'media', 'name': destination_blob_name},
+        )
+
+    async def download_file(self, bucket_name, source_blob_name, destination_file_path):
+        """Stream an object to a file, which appears only once complete; returns bytes written"""
+        destination_file_path = Path(destination_file_path)
+        partial = destination_file_path.with_name(destination_file_path.name + '.part')
+        loop = asyncio.get_running_loop()
+
+        async def write(response):
+            written = 0
+            with open(partial, 'wb') as f:
+                async for chunk in response.content.iter_chunked(STREAM_CHUNK):
+                    await loop.run_in_executor(None, f.write, chunk)
+                    written += len(chunk)
+            return written
+
+        try:
+            written = await self._request('GET', self._object_url(bucket_name, source_blob_name), write,
+                                          params={'alt': 'media'})
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+        os.replace(partial, destination_file_path)
+        return written
+
+    async def compose(self, bucket_name, source_blob_names, destination_blob_name):
+        """Concatenate up to 32 objects into one; returns the new object resource"""
+        if not 0 < len(source_blob_names) <= MAX_COMPOSE_SOURCES:
+            raise ValueError(f"compose takes 1 to {MAX_COMPOSE_SOURCES} sources")
+        body = json.dumps({
+            'sourceObjects': [{'name': name} for name in source_blob_names],
+            'destination': {'contentType': 'application/octet-stream'},
+        }).encode()
+        return await self._request(
+            'POST', self._object_url(bucket_name, destination_blob_name, '/compose'),
+            lambda response: response.json(), body=lambda: body,
+            headers={'Content-Type': 'application/json'},
+        )
+
+    async def delete_file(self, bucket_name, blob_name):
+        """Delete one object"""
+        async def done(response):
+            return True
+        return await self._request('DELETE', self._object_url(bucket_name, blob_name), done)
+
+    async def _gather(self, label, jobs):
+        """Await (name, coroutine) jobs together and print a throughput summary"""
+        start = time.perf_counter()
+        names = [name for name, _ in jobs]
+        outcomes = await asyncio.gather(*(job for _, job in jobs), return_exceptions=True)
+
+        summary = {'succeeded': [], 'failed': {}, 'bytes': 0}
+        for name, outcome in zip(names, outcomes):
+            if isinstance(outcome, BaseException):
+                summary['failed'][name] = str(outcome)
+                print(f"  Failed to {label.lower()} {name}: {str(outcome)}")
+            else:
+                summary['succeeded'].append(name)
+                summary['bytes'] += outcome
+        summary['seconds'] = time.perf_counter() - start
+        summary['throughput_mb_s'] = summary['bytes'] / (1024 * 1024) / summary['seconds'] if summary['seconds'] > 0 else 0.0
+        print(f"{label}ed {len(summary['succeeded'])} files, "
+              f"{summary['bytes'] / (1024 * 1024):.1f} MB in {summary['seconds']:.1f}s "
+              f"({summary['throughput_mb_s']:.1f} MB/s), {len(summary['failed'])} failed")
+        return summary
+
+    async def upload_many(self, bucket_name, paths, prefix=''):
+        """Upload files, and directories recursively, to gs://bucket_name/prefix concurrently"""
+        prefix = prefix.strip('/')
+        uploads = []
+        for path in map(Path, paths):
+            if path.is_dir():
+                uploads.extend((file, file.relative_to(path.parent).as_posix())
+                               for file in sorted(path.rglob('*')) if file.is_file())
+            else:
+                uploads.append((path, path.name))
+
+        async def upload(source, blob_name):
+            await self.upload_file(bucket_name, source, blob_name)
+            return source.stat().st_size
+
+        jobs = []
+        for source, relative_name in uploads:
+            blob_name = f"{prefix}/{relative_name}" if prefix else relative_name
+            jobs.append((f"gs://{bucket_name}/{blob_name}", upload(source, blob_name)))
+        return await self._gather('Upload', jobs)
+
+    async def download_many(self, bucket_name, prefix, destination_dir):
+        """Download every object under prefix into destination_dir concurrently
+
+        Objects whose names would resolve outside destination_dir fail
+        without being fetched.
+        """
+        prefix = prefix.strip('/')
+        names = [item['name'] async for item in self.list_files(bucket_name, f"{prefix}/" if prefix else None,
+                                                                 fields='name')]
+
+        async def download(blob_name):
+            target = local_target(destination_dir, blob_name, prefix)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            return await self.download_file(bucket_name, blob_name, target)
+
+        return await self._gather('Download', [(f"gs://{bucket_name}/{name}", download(name)) for name in names])
+
+
+async def _main(args):
+    async with AsyncGoogleCloudHelper() as helper:
+        if args[0] == 'upload':
+            await helper.upload_many(args[1], args[3:], prefix=args[2])
+        elif args[0] == 'download':
+            await helper.download_many(args[1], args[2], args[3])
+        else:
+            count = 0
+            async for item in helper.list_files(args[1], args[2] if len(args) > 2 else None, fields='name'):
+                print(f"  - {item['name']}")
+                count += 1
+            print(f"Found {count} files in {args[1]}")
+
+
+def main():
+    """Command line entry point"""
+    args = sys.argv[1:]
+    valid = (
+        (args[:1] == ['upload'] and len(args) >= 4)
+        or (args[:1] == ['download'] and len(args) == 4)
+        or (args[:1] == ['list'] and len(args) in (2, 3))
+    )
+    if not valid:
+        print(__doc__)
+        return
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark of GoogleCloudHelper storage paths against the local fake GCS server
+Measures bulk upload, no-op sync, streaming listing, bulk download and the parallel
+large-file paths, checks the round-tripped data and saves the results as JSON
+
+Usage:
+    python3 benchmark_gcs.py [small_files] [large_file_mb]
+"""
+import contextlib
+import filecmp
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.logger import log_action
+from scripts.fake_gcs_server import FakeGCSServer
+from scripts.google_cloud_helper import GoogleCloudHelper
+
+RESULTS_PATH = Path("/app/main/web_app/logs/gcs_benchmark.json")
+
+BENCHMARK_BUCKET = 'benchmark'
+SMALL_FILES = 500
+SMALL_FILE_SIZE = 256 * 1024
+LARGE_FILE_MB = 300
+
+
+def _timed(name, results, size, operation):
+    """Run operation with its progress output suppressed and record its throughput
+
+    Raises RuntimeError, with the operation's output, when it reports a
+    failure: a False or None return or a summary with failed transfers.
+    """
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        value = operation()
+    seconds = time.perf_counter() - start
+    if value is None or value is False or (isinstance(value, dict) and value.get('failed')):
+        raise RuntimeError(f"Benchmark step {name} failed:\n{output.getvalue()}")
+    results.append({
+        'benchmark': name,
+        'seconds': seconds,
+        'bytes': size,
+        'throughput_mb_s': size / (1024 * 1024) / seconds if size and seconds > 0 else None,
+    })
+    return value
+
+
+def _write_random(path, size):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'wb') as f:
+        for offset in range(0, size, 1024 * 1024):
+            f.write(os.urandom(min(1024 * 1024, size - offset)))
+
+
+def run_benchmarks(small_files=SMALL_FILES, large_file_mb=LARGE_FILE_MB):
+    """Run every benchmark against a fresh in-process server; returns the results"""
+    results = []
+    with FakeGCSServer() as server, tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        helper = GoogleCloudHelper(endpoint=server.url)
+        with contextlib.redirect_stdout(io.StringIO()):
+            if helper.create_bucket(BENCHMARK_BUCKET) is None:
+                raise RuntimeError(f"Could not create bucket {BENCHMARK_BUCKET} on {server.url}")
+
+        source = workdir / 'source'
+        for index in range(small_files):
+            _write_random(source / f"dir{index % 10}" / f"file{index:05d}.bin", SMALL_FILE_SIZE)
+        small_bytes = small_files * SMALL_FILE_SIZE
+        large_file = workdir / 'large.mp4'
+        large_bytes = large_file_mb * 1024 * 1024
+        _write_random(large_file, large_bytes)
+
+        _timed('upload_many', results, small_bytes,
+               lambda: helper.upload_many(BENCHMARK_BUCKET, [source], prefix='small'))
+        _timed('sync (unchanged)', results, small_bytes,
+               lambda: helper.sync(source, BENCHMARK_BUCKET, prefix='small/source'))
+        count = _timed('iter_files', results, 0,
+                       lambda: sum(1 for _ in helper.iter_files(BENCHMARK_BUCKET, 'small/')))
+        if count != small_files:
+            raise RuntimeError(f"Listed {count} of {small_files} uploaded files")
+        names = [f"small/source/{path.relative_to(source).as_posix()}" for path in sorted(source.rglob('*.bin'))]
+        _timed('download_many', results, small_bytes,
+               lambda: helper.download_many(BENCHMARK_BUCKET, names, workdir / 'restored', prefix='small/source'))
+        _timed('upload_file (large)', results, large_bytes,
+               lambda: helper.upload_file(BENCHMARK_BUCKET, str(large_file), 'large.mp4'))
+        _timed('download_file (large)', results, large_bytes,
+               lambda: helper.download_file(BENCHMARK_BUCKET, 'large.mp4', str(workdir / 'large_restored.mp4')))
+
+        mismatched = [
+            path for path in source.rglob('*.bin')
+            if not filecmp.cmp(path, workdir / 'restored' / path.relative_to(source), shallow=False)
+        ]
+        if not filecmp.cmp(large_file, workdir / 'large_restored.mp4', shallow=False):
+            mismatched.append(large_file)
+
+    return {'small_files': small_files, 'listed': count, 'large_file_mb': large_file_mb,
+            'mismatched': [str(path) for path in mismatched], 'results': results}
+
+
+def main():
+    """Command line entry point"""
+    args = sys.argv[1:]
+    if len(args) > 2 or not all(arg.isdigit() for arg in args):
+        print(__doc__)
+        return
+    report = run_benchmarks(*(int(arg) for arg in args))
+
+    RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = RESULTS_PATH.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, RESULTS_PATH)
+    log_action(f"GCS benchmark results saved to: {RESULTS_PATH}")
+
+    print("\n" + "=" * 60)
+    print("GCS Benchmark (fake server)")
+    print("=" * 60)
+    for result in report['results']:
+        rate = f"{result['throughput_mb_s']:.1f} MB/s" if result['throughput_mb_s'] else '-'
+        print(f"{result['benchmark']:<24} {result['seconds']:>8.2f} s  {rate}")
+    print(f"Files listed: {report['listed']}")
+    print(f"Round-trip mismatches: {len(report['mismatched'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,5 +19,11 @@ alias ga="git add"
 # Project specific
 alias webdev="cd /app/main/web_app && vercel dev"
 alias logs="tail -f /app/main/web_app/logs/*.log"
+alias docs-search="python3 /app/main/web_app/scripts/docs_index.py search"
+alias docs-index="python3 /app/main/web_app/scripts/docs_index.py build"
+alias disk-usage="python3 /app/main/web_app/scripts/disk_usage_daemon.py query"
+alias disk-usage-daemon="nohup python3 /app/main/web_app/scripts/disk_usage_daemon.py start >/dev/null 2>&1 &"
+alias fake-gcs="python3 /app/main/web_app/scripts/fake_gcs_server.py"
+alias gcs-benchmark="python3 /app/main/web_app/scripts/benchmark_gcs.py"
 
 echo "Web App CLI aliases loaded!"
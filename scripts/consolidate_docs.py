@@ -7,11 +7,14 @@ import shutil
 from datetime import datetime
 from pathlib import Path
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 # Add parent directory to path
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
 from scripts.logger import log_action
+from scripts.docs_dedup import docs_duplicate_map, unique_paragraphs
+from scripts.docs_metadata import DocMetadataCache
 
 # Document categories based on analysis
 DOC_CATEGORIES = {
@@ -97,8 +100,28 @@ def backup_docs():
     
     return backup_path
 
-def create_master_index():
-    """Create master index file"""
+def create_master_index(metadata=None):
+    """Create master index file
+
+    The index is only re-rendered when a listed doc appears or disappears;
+    doc metadata comes from the persistent cache, so unchanged docs are
+    never reread.
+    """
+    metadata = metadata or DocMetadataCache()
+    docs_dir = Path("/app/main/web_app/docs")
+    index_path = docs_dir / "README.md"
+    
+    present = {
+        file: metadata.get(docs_dir / file) is not None
+        for category in DOC_CATEGORIES.values()
+        for file in category['files']
+    }
+    fingerprint = metadata.fingerprint(['consolidate_docs', DOC_CATEGORIES, present])
+    if metadata.is_current(index_path, fingerprint):
+        log_action("Master index is up to date")
+        metadata.save()
+        return index_path
+    
     content = """# Web App Documentation Index
 
 This is the consolidated documentation for the Wedding Vendor Discovery Platform.
@@ -112,9 +135,7 @@ This is the consolidated documentation for the Wedding Vendor Discovery Platform
         content += f"{category['description']}\n\n"
         
         for file in category['files']:
-            # Check if file exists
-            file_path = Path(f"/app/main/web_app/docs/{file}")
-            if file_path.exists():
+            if present[file]:
                 content += f"- [{file}](./{file})\n"
             else:
                 content += f"- {file} (missing)\n"
@@ -145,51 +166,85 @@ This is the consolidated documentation for the Wedding Vendor Discovery Platform
 """
     
     # Write master index
-    index_path = Path("/app/main/web_app/docs/README.md")
     index_path.write_text(content)
+    metadata.record_render(index_path, fingerprint)
+    metadata.save()
     log_action("Created master index at README.md")
     
     return index_path
 
-def create_category_indexes():
-    """Create index files for each category"""
-    docs_dir = Path("/app/main/web_app/docs")
-    
-    for category_id, category in DOC_CATEGORIES.items():
-        category_content = f"""# {category['title']}
+def _category_summary_line(file_path):
+    """Return the first non-heading line of a document as its summary"""
+    with open(file_path, 'r') as f:
+        for _, line in zip(range(5), f):
+            if line.strip() and not line.startswith("#"):
+                return line.strip()
+    return ""
+
+def _write_category_index(docs_dir, category_id, category, duplicates=None):
+    """Write the index file for a single category
+
+    Near-duplicates of another doc are listed under their canonical doc
+    instead of getting an entry of their own.
+    """
+    merged = {}
+    hidden = set()
+    for file in category['files']:
+        canonical, similarity = (duplicates or {}).get(file, (None, 0))
+        if canonical in category['files']:
+            merged.setdefault(canonical, []).append((file, similarity))
+            hidden.add(file)
+
+    category_content = f"""# {category['title']}
 
 {category['description']}
 
 ## Documents in this category:
 
 """
-        
-        for file in category['files']:
-            file_path = docs_dir / file
-            if file_path.exists():
-                # Read first few lines as summary
-                with open(file_path, 'r') as f:
-                    lines = f.readlines()[:5]
-                    summary = ""
-                    for line in lines:
-                        if line.strip() and not line.startswith("#"):
-                            summary = line.strip()
-                            break
-                
-                category_content += f"### [{file}](./{file})\n"
-                if summary:
-                    category_content += f"{summary}\n\n"
-                else:
-                    category_content += "\n"
-        
-        # Write category index
-        category_path = docs_dir / f"_{category_id}_index.md"
-        category_path.write_text(category_content)
-        log_action(f"Created category index for {category['title']}")
+    
+    for file in category['files']:
+        file_path = docs_dir / file
+        if file_path.exists() and file not in hidden:
+            summary = _category_summary_line(file_path)
+            
+            category_content += f"### [{file}](./{file})\n"
+            if summary:
+                category_content += f"{summary}\n\n"
+            else:
+                category_content += "\n"
+            
+            for duplicate, similarity in merged.get(file, []):
+                category_content += f"- Near-duplicate merged here: [{duplicate}](./{duplicate}) ({similarity:.0%} similar)\n"
+            if file in merged:
+                category_content += "\n"
+    
+    # Write category index
+    category_path = docs_dir / f"_{category_id}_index.md"
+    category_path.write_text(category_content)
+    log_action(f"Created category index for {category['title']}")
+    return category_path
 
-def consolidate_related_docs():
-    """Consolidate related documents into single comprehensive files"""
+def create_category_indexes(categories=None, workers=8):
+    """Create index files for each category
+
+    Categories are independent, so their indexes are read and written
+    concurrently on a small thread pool.
+    """
     docs_dir = Path("/app/main/web_app/docs")
+    categories = DOC_CATEGORIES if categories is None else categories
+    duplicates = docs_duplicate_map(docs_dir)
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_write_category_index, docs_dir, category_id, category, duplicates)
+            for category_id, category in categories.items()
+        ]
+        return [future.result() for future in futures]
+
+def consolidate_related_docs(docs_dir=None):
+    """Consolidate related documents into single comprehensive files"""
+    docs_dir = Path(docs_dir or "/app/main/web_app/docs")
     
     # Consolidate implementation plans
     implementation_files = [
@@ -204,21 +259,67 @@ This document consolidates all implementation-related documentation for the Wedd
 
 """
     
+    texts = {}
     for file in implementation_files:
         file_path = docs_dir / file
         if file_path.exists():
-            consolidated_content += f"\n## From {file}\n\n"
             with open(file_path, 'r') as f:
-                consolidated_content += f.read()
-            consolidated_content += "\n\n---\n\n"
+                texts[file] = f.read()
+    
+    # A near-duplicate of another listed doc contributes only the paragraphs
+    # its canonical doc (and earlier copies) lack, so nothing is copied twice
+    # and nothing unique is dropped
+    duplicates = docs_duplicate_map(docs_dir)
+    merged = {}
+    
+    for file, text in texts.items():
+        canonical, similarity = duplicates.get(file, (None, None))
+        if canonical not in texts:
+            consolidated_content += f"\n## From {file}\n\n{text}\n\n---\n\n"
+            continue
+        
+        unique = unique_paragraphs(text, texts[canonical], *merged.setdefault(canonical, []))
+        merged[canonical].append(text)
+        if not unique:
+            log_action(f"Merged {file} into {canonical}: {similarity:.0%} similar, nothing unique")
+            continue
+        log_action(f"Merged {file} into {canonical}: {similarity:.0%} similar, {len(unique)} unique paragraphs")
+        consolidated_content += f"\n## From {file}\n\n"
+        consolidated_content += f"_{similarity:.0%} similar to {canonical}; only content not found there is kept._\n\n"
+        consolidated_content += "\n\n".join(unique)
+        consolidated_content += "\n\n---\n\n"
     
     # Write consolidated file
     consolidated_path = docs_dir / "CONSOLIDATED_IMPLEMENTATION.md"
     consolidated_path.write_text(consolidated_content)
     log_action("Created CONSOLIDATED_IMPLEMENTATION.md")
 
-def create_documentation_summary():
-    """Create a summary of all documentation"""
+def create_documentation_summary(categories=None, metadata=None):
+    """Create a summary of all documentation
+
+    Per-doc size, title and word count come from the metadata cache, and
+    the JSON is only rewritten when one of the listed docs changed.
+    """
+    categories = DOC_CATEGORIES if categories is None else categories
+    metadata = metadata or DocMetadataCache()
+    docs_dir = Path("/app/main/web_app/docs")
+    summary_path = docs_dir / "documentation_summary.json"
+    
+    entries = {
+        file: metadata.get(docs_dir / file)
+        for category in categories.values()
+        for file in category["files"]
+    }
+    fingerprint = metadata.fingerprint([
+        categories,
+        {file: entry and [entry['hash'], entry['mtime_ns']] for file, entry in entries.items()}
+    ])
+    if metadata.is_current(summary_path, fingerprint):
+        log_action("documentation_summary.json is up to date")
+        metadata.save()
+        with open(summary_path, 'r') as f:
+            return json.load(f)
+    
     summary = {
         "metadata": {
             "generated_at": datetime.now().isoformat(),
@@ -228,9 +329,7 @@ def create_documentation_summary():
         "files": {}
     }
     
-    docs_dir = Path("/app/main/web_app/docs")
-    
-    for category_id, category in DOC_CATEGORIES.items():
+    for category_id, category in categories.items():
         category_summary = {
             "title": category["title"],
             "description": category["description"],
@@ -239,13 +338,14 @@ def create_documentation_summary():
         }
         
         for file in category["files"]:
-            file_path = docs_dir / file
-            if file_path.exists():
-                file_stat = file_path.stat()
+            entry = entries[file]
+            if entry is not None:
                 category_summary["files"].append({
                     "name": file,
-                    "size": file_stat.st_size,
-                    "modified": datetime.fromtimestamp(file_stat.st_mtime).isoformat()
+                    "title": entry["title"],
+                    "size": entry["size"],
+                    "word_count": entry["word_count"],
+                    "modified": datetime.fromtimestamp(entry["mtime_ns"] / 1e9).isoformat()
                 })
                 summary["metadata"]["total_files"] += 1
             else:
@@ -254,9 +354,10 @@ def create_documentation_summary():
         summary["metadata"]["categories"][category_id] = category_summary
     
     # Write summary
-    summary_path = docs_dir / "documentation_summary.json"
     with open(summary_path, 'w') as f:
         json.dump(summary, f, indent=2)
+    metadata.record_render(summary_path, fingerprint)
+    metadata.save()
     
     log_action("Created documentation_summary.json")
     
@@ -271,7 +372,8 @@ def main():
     log_action(f"Backup completed at {backup_path}")
     
     # Step 2: Create master index
-    index_path = create_master_index()
+    metadata = DocMetadataCache()
+    index_path = create_master_index(metadata)
     log_action(f"Master index created at {index_path}")
     
     # Step 3: Create category indexes
@@ -283,9 +385,18 @@ def main():
     log_action("Related documents consolidated")
     
     # Step 5: Create documentation summary
-    summary = create_documentation_summary()
+    summary = create_documentation_summary(metadata=metadata)
     log_action(f"Documentation summary created with {summary['metadata']['total_files']} files")
     
+    # Step 6: Refresh the full-text search index (only changed docs are reread)
+    from scripts.docs_index import update_docs_index
+    update_docs_index()
+    log_action("Docs search index updated")
+    
+    # Step 7: Validate every markdown link after files were rewritten
+    from scripts.docs_links import check_docs_links
+    broken_links = check_docs_links()
+    
     log_action("Documentation consolidation completed successfully!")
     
     # Print summary
@@ -293,6 +404,7 @@ def main():
     print("=" * 50)
     print(f"Total files processed: {summary['metadata']['total_files']}")
     print(f"Categories created: {len(DOC_CATEGORIES)}")
+    print(f"Broken links: {len(broken_links)}")
     print(f"Backup location: {backup_path}")
     print("\nNew files created:")
     print("- README.md (master index)")
@@ -9,12 +9,23 @@ from datetime import datetime
 from pathlib import Path
 import json
 import re
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # Add parent directory to path
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
 from scripts.logger import log_action
 
+DOCS_DIR = Path("/app/main/web_app/docs")
+
+# Records completed pipeline work so interrupted runs resume and reruns skip unchanged docs
+CHECKPOINT_PATH = Path("/app/main/web_app/logs/docs_consolidation_checkpoint.json")
+
+# Thread pool size for doc reads/writes
+IO_WORKERS = 8
+
 # Document categories based on analysis
 DOC_CATEGORIES = {
     "implementation": {
@@ -91,53 +102,104 @@ DOC_CATEGORIES = {
     }
 }
 
+# Supabase -> Firebase replacements, applied in this order
+SUPABASE_REPLACEMENTS = {
+    # Database
+    'Supabase': 'Firebase',
+    'supabase': 'firebase',
+    'PostgreSQL': 'Firestore',
+    'RLS policies': 'Firestore security rules',
+    'Row Level Security': 'Firestore security rules',
+    
+    # Auth
+    'Supabase Auth': 'Firebase Auth',
+    'supabase.auth': 'firebase.auth',
+    
+    # Real-time
+    'Supabase real-time': 'Firebase real-time listeners',
+    'PostgreSQL subscriptions': 'Firestore real-time listeners',
+    
+    # Storage
+    'Supabase Storage': 'Firebase Storage',
+    
+    # Cache
+    'Upstash Redis': 'Firebase Functions + Firestore caching',
+    
+    # Database specific
+    'CREATE TABLE': '// Firestore collection',
+    'INSERT INTO': 'db.collection().add()',
+    'SELECT': 'db.collection().get()',
+    'UPDATE': 'db.collection().doc().update()',
+    'DELETE': 'db.collection().doc().delete()',
+}
+
+# All replacements compiled into one alternation so each doc is scanned once.
+# Alternatives are tried in dict order, so an earlier key still wins over a
+# longer later key exactly as the sequential str.replace calls did, and no
+# replacement output contains another key.
+SUPABASE_PATTERN = re.compile('|'.join(re.escape(old) for old in SUPABASE_REPLACEMENTS))
+
+MIGRATION_NOTICE = """
+> **Migration Notice**: This document has been updated to reflect the migration from Supabase to Firebase. 
+> Original Supabase references have been replaced with Firebase equivalents.
+
+"""
+
 def migrate_supabase_references(content):
     """Replace Supabase references with Firebase equivalents"""
-    replacements = {
-        # Database
-        'Supabase': 'Firebase',
-        'supabase': 'firebase',
-        'PostgreSQL': 'Firestore',
-        'RLS policies': 'Firestore security rules',
-        'Row Level Security': 'Firestore security rules',
-        
-        # Auth
-        'Supabase Auth': 'Firebase Auth',
-        'supabase.auth': 'firebase.auth',
-        
-        # Real-time
-        'Supabase real-time': 'Firebase real-time listeners',
-        'PostgreSQL subscriptions': 'Firestore real-time listeners',
-        
-        # Storage
-        'Supabase Storage': 'Firebase Storage',
-        
-        # Cache
-        'Upstash Redis': 'Firebase Functions + Firestore caching',
-        
-        # Database specific
-        'CREATE TABLE': '// Firestore collection',
-        'INSERT INTO': 'db.collection().add()',
-        'SELECT': 'db.collection().get()',
-        'UPDATE': 'db.collection().doc().update()',
-        'DELETE': 'db.collection().doc().delete()',
-    }
-    
-    migrated_content = content
-    for old, new in replacements.items():
-        migrated_content = migrated_content.replace(old, new)
+    migrated_content = SUPABASE_PATTERN.sub(
+        lambda match: SUPABASE_REPLACEMENTS[match.group(0)],
+        content
+    )
     
     # Add migration notice if content was changed
     if migrated_content != content:
-        migration_notice = """
-> **Migration Notice**: This document has been updated to reflect the migration from Supabase to Firebase. 
-> Original Supabase references have been replaced with Firebase equivalents.
-
-"""
-        migrated_content = migration_notice + migrated_content
+        migrated_content = MIGRATION_NOTICE + migrated_content
     
     return migrated_content
 
+def _content_hash(content):
+    """Hash document text for checkpoint comparisons"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def _fingerprint(file_path):
+    """Cheap change detector: size and mtime in nanoseconds"""
+    stat = file_path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+class ConsolidationCheckpoint:
+    """Persistent record of completed consolidation work"""
+    
+    def __init__(self, path=CHECKPOINT_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.data = {'backup': {}, 'docs': {}}
+        
+        if self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    self.data.update(json.load(f))
+            except (json.JSONDecodeError, OSError) as e:
+                log_action(f"Ignoring unreadable checkpoint {self.path}: {e}")
+    
+    def get(self, section, key):
+        """Return the recorded entry for a key, or None"""
+        return self.data[section].get(key)
+    
+    def update(self, section, key, entry):
+        """Record an entry and persist the checkpoint immediately"""
+        with self._lock:
+            self.data[section][key] = entry
+            self._save()
+    
+    def _save(self):
+        # Write-then-rename so a crash never leaves a half-written checkpoint
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
 def create_firebase_migration_guide():
     """Create a comprehensive Firebase migration guide"""
     content = """# Firebase Migration Guide
@@ -325,23 +387,41 @@ const unsubscribe = db
     guide_path.write_text(content)
     log_action("Created Firebase migration guide")
 
-def backup_docs():
-    """Create backup of existing docs"""
-    backup_dir = Path("/app/main/web_app/docs/backup")
+def backup_docs(checkpoint=None, workers=IO_WORKERS):
+    """Create backup of docs changed since the last backup"""
+    backup_dir = DOCS_DIR / "backup"
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     backup_path = backup_dir / f"docs_backup_{timestamp}"
     
+    # Scan: only files whose size/mtime moved since the last backup are copied
+    changed_files = []
+    for file in DOCS_DIR.iterdir():
+        if not file.is_file():
+            continue
+        previous = checkpoint.get('backup', file.name) if checkpoint else None
+        if previous is None or previous['fingerprint'] != _fingerprint(file):
+            changed_files.append(file)
+    
+    if not changed_files:
+        log_action("No docs changed since the last backup")
+        return None
+    
     log_action(f"Creating backup at {backup_path}")
     
     # Create backup directory
     backup_path.mkdir(parents=True, exist_ok=True)
     
-    # Copy all current docs
-    docs_dir = Path("/app/main/web_app/docs")
-    for file in docs_dir.iterdir():
-        if file.is_file() and file.name not in ['backup']:
-            shutil.copy2(file, backup_path / file.name)
-            log_action(f"Backed up {file.name}")
+    def copy_one(file):
+        shutil.copy2(file, backup_path / file.name)
+        if checkpoint:
+            checkpoint.update('backup', file.name, {
+                'fingerprint': _fingerprint(file),
+                'backup_path': str(backup_path / file.name)
+            })
+        log_action(f"Backed up {file.name}")
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(copy_one, changed_files))
     
     return backup_path
 
@@ -413,52 +493,128 @@ See [Firebase Migration Guide](./FIREBASE_MIGRATION_GUIDE.md) for details.
     tech_path.write_text(content)
     log_action("Updated current tech stack documentation")
 
-def migrate_existing_docs():
+# Docs rewritten by the Supabase -> Firebase migration
+FILES_TO_MIGRATE = [
+    "implementation_guide.md",
+    "implementation_plan.md",
+    "DEPLOYMENT_GUIDE.md",
+    "VIDEO_FEED_ALGORITHM.md",
+    "FEED_GENERATION_API.md"
+]
+
+def scan_docs(checkpoint, workers=IO_WORKERS):
+    """Pipeline stage 1: read the docs that still need migrating
+
+    Docs whose size/mtime match the checkpointed output are skipped without
+    being read, so a rerun over unchanged docs does no content work.
+    """
+    def scan_one(filename):
+        file_path = DOCS_DIR / filename
+        if not file_path.exists():
+            return None
+        
+        entry = checkpoint.get('docs', filename)
+        if entry and entry.get('status') == 'done' and entry.get('fingerprint') == _fingerprint(file_path):
+            return None
+        
+        with open(file_path, 'r') as f:
+            content = f.read()
+        content_hash = _content_hash(content)
+        
+        # An interrupted run may have written the output but not the checkpoint
+        if entry and entry.get('output_hash') == content_hash:
+            checkpoint.update('docs', filename, {
+                **entry,
+                'status': 'done',
+                'fingerprint': _fingerprint(file_path)
+            })
+            return None
+        
+        return {'name': filename, 'path': file_path, 'content': content, 'hash': content_hash}
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return [task for task in pool.map(scan_one, FILES_TO_MIGRATE) if task]
+
+def transform_doc(task, checkpoint):
+    """Pipeline stage 2: migrate one doc and record it in the checkpoint"""
+    filename = task['name']
+    content = task['content']
+    migrated_content = migrate_supabase_references(content)
+    output_hash = _content_hash(migrated_content)
+    
+    if migrated_content == content:
+        checkpoint.update('docs', filename, {
+            'status': 'done',
+            'output_hash': output_hash,
+            'fingerprint': _fingerprint(task['path'])
+        })
+        return False
+    
+    # Mark the doc in progress before touching it, so a crash between the
+    # two writes below is recognised on resume instead of migrating twice
+    checkpoint.update('docs', filename, {
+        'status': 'in_progress',
+        'source_hash': task['hash'],
+        'output_hash': output_hash
+    })
+    
+    # Save original to deprecated
+    deprecated_path = DOCS_DIR / f"deprecated_supabase_{filename}"
+    with open(deprecated_path, 'w') as f:
+        f.write(content)
+    
+    # Write migrated content
+    with open(task['path'], 'w') as f:
+        f.write(migrated_content)
+    
+    checkpoint.update('docs', filename, {
+        'status': 'done',
+        'source_hash': task['hash'],
+        'output_hash': output_hash,
+        'fingerprint': _fingerprint(task['path'])
+    })
+    log_action(f"Migrated {filename} to Firebase")
+    return True
+
+def migrate_existing_docs(checkpoint=None, workers=IO_WORKERS):
     """Migrate existing documentation to reflect Firebase usage"""
-    docs_dir = Path("/app/main/web_app/docs")
+    if checkpoint is None:
+        checkpoint = ConsolidationCheckpoint()
     
-    # List of files that need migration
-    files_to_migrate = [
-        "implementation_guide.md",
-        "implementation_plan.md",
-        "DEPLOYMENT_GUIDE.md",
-        "VIDEO_FEED_ALGORITHM.md",
-        "FEED_GENERATION_API.md"
-    ]
-    
-    migrated_count = 0
-    
-    for filename in files_to_migrate:
-        file_path = docs_dir / filename
-        if file_path.exists():
-            # Read content
-            with open(file_path, 'r') as f:
-                content = f.read()
-            
-            # Migrate content
-            migrated_content = migrate_supabase_references(content)
-            
-            # Only write if content changed
-            if migrated_content != content:
-                # Save original to deprecated
-                deprecated_path = docs_dir / f"deprecated_supabase_{filename}"
-                with open(deprecated_path, 'w') as f:
-                    f.write(content)
-                
-                # Write migrated content
-                with open(file_path, 'w') as f:
-                    f.write(migrated_content)
-                
-                log_action(f"Migrated {filename} to Firebase")
-                migrated_count += 1
-                
-                # Add to deprecated category
-                DOC_CATEGORIES["deprecated"]["files"].append(f"deprecated_supabase_{filename}")
+    tasks = scan_docs(checkpoint, workers)
+    log_action(f"{len(tasks)} of {len(FILES_TO_MIGRATE)} docs need migration")
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        migrated_count = sum(pool.map(lambda task: transform_doc(task, checkpoint), tasks))
+    
+    # Deprecated copies from this run and earlier runs both belong in the index
+    for filename in FILES_TO_MIGRATE:
+        deprecated_name = f"deprecated_supabase_{filename}"
+        if (DOCS_DIR / deprecated_name).exists() and deprecated_name not in DOC_CATEGORIES["deprecated"]["files"]:
+            DOC_CATEGORIES["deprecated"]["files"].append(deprecated_name)
     
     return migrated_count
 
-def create_master_index():
-    """Create master index file with Firebase focus"""
+def create_master_index(metadata=None):
+    """Create master index file with Firebase focus
+
+    Only re-rendered when a listed doc appears or disappears.
+    """
+    from scripts.docs_metadata import DocMetadataCache
+    metadata = metadata or DocMetadataCache()
+    index_path = DOCS_DIR / "README.md"
+    
+    present = {
+        file: metadata.get(DOCS_DIR / file) is not None
+        for category in DOC_CATEGORIES.values()
+        for file in category['files']
+    }
+    fingerprint = metadata.fingerprint(['consolidate_docs_v2', DOC_CATEGORIES, present])
+    if metadata.is_current(index_path, fingerprint):
+        log_action("Firebase-focused master index is up to date")
+        metadata.save()
+        return index_path
+    
     content = """# Web App Documentation Index
 
 This is the consolidated documentation for the Wedding Vendor Discovery Platform, now powered by Firebase.
@@ -487,9 +643,7 @@ See [Firebase Migration Guide](./FIREBASE_MIGRATION_GUIDE.md) for details.
         content += f"{category['description']}\n\n"
         
         for file in category['files']:
-            # Check if file exists
-            file_path = Path(f"/app/main/web_app/docs/{file}")
-            if file_path.exists():
+            if present[file]:
                 content += f"- [{file}](./{file})\n"
             else:
                 content += f"- {file} (missing)\n"
@@ -533,8 +687,9 @@ See [Firebase Migration Guide](./FIREBASE_MIGRATION_GUIDE.md) for details.
 """
     
     # Write master index
-    index_path = Path("/app/main/web_app/docs/README.md")
     index_path.write_text(content)
+    metadata.record_render(index_path, fingerprint)
+    metadata.save()
     log_action("Created Firebase-focused master index")
     
     return index_path
@@ -648,35 +803,49 @@ def main():
     create_firebase_migration_guide()
     log_action("Created Firebase migration guide")
     
+    checkpoint = ConsolidationCheckpoint()
+    
     # Step 2: Backup existing docs
-    backup_path = backup_docs()
+    backup_path = backup_docs(checkpoint)
     log_action(f"Backup completed at {backup_path}")
     
     # Step 3: Update tech stack documentation
     update_tech_stack_doc()
     log_action("Updated tech stack documentation")
     
-    # Step 4: Migrate existing docs to Firebase
-    migrated_count = migrate_existing_docs()
+    # Step 4: Migrate existing docs to Firebase (scan -> transform)
+    migrated_count = migrate_existing_docs(checkpoint)
     log_action(f"Migrated {migrated_count} documents to Firebase")
     
-    # Step 5: Create master index with Firebase focus
-    index_path = create_master_index()
-    log_action(f"Master index created at {index_path}")
-    
-    # Step 6: Create consolidated implementation guide
-    create_consolidated_implementation()
-    log_action("Created consolidated implementation guide")
-    
-    # Step 7: Create category indexes
+    # Steps 5-7: Write indexes; each writes a different file, so run them together
     from consolidate_docs import create_category_indexes, create_documentation_summary
-    create_category_indexes()
-    log_action("Category indexes created")
+    from scripts.docs_metadata import DocMetadataCache
+    metadata = DocMetadataCache()
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        index_future = pool.submit(create_master_index, metadata)
+        consolidated_future = pool.submit(create_consolidated_implementation)
+        category_future = pool.submit(create_category_indexes, DOC_CATEGORIES)
+        
+        index_path = index_future.result()
+        log_action(f"Master index created at {index_path}")
+        consolidated_future.result()
+        log_action("Created consolidated implementation guide")
+        category_future.result()
+        log_action("Category indexes created")
     
     # Step 8: Create documentation summary
-    summary = create_documentation_summary()
+    summary = create_documentation_summary(DOC_CATEGORIES, metadata)
     log_action(f"Documentation summary created")
     
+    # Step 9: Refresh the full-text search index (only changed docs are reread)
+    from scripts.docs_index import update_docs_index
+    update_docs_index()
+    log_action("Docs search index updated")
+    
+    # Step 10: Validate every markdown link after files were rewritten
+    from scripts.docs_links import check_docs_links
+    broken_links = check_docs_links()
+    
     log_action("Documentation consolidation with Firebase migration completed!")
     
     # Print summary
@@ -685,12 +854,13 @@ def main():
     print("Firebase Migration Integration:")
     print(f"- Documents migrated to Firebase: {migrated_count}")
     print(f"- Deprecated Supabase docs: {len(DOC_CATEGORIES['deprecated']['files'])}")
+    print(f"- Broken links: {len(broken_links)}")
     print("\nNew files created:")
     print("- README.md (Firebase-focused master index)")
     print("- FIREBASE_MIGRATION_GUIDE.md")
     print("- CONSOLIDATED_IMPLEMENTATION.md (Firebase version)")
     print("- current_tech_stack.md (updated)")
-    print(f"\nBackup location: {backup_path}")
+    print(f"\nBackup location: {backup_path or 'no changes since last backup'}")
     print("\n✅ Documentation is now Firebase-ready!")
 
 if __name__ == "__main__":
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Constant-memory directory statistics for the cleanup analyzers
+Counters live in compact arrays and the largest files are tracked with a bounded heap;
+bytes per extension and per top-level directory and log2 size histograms are
+accumulated in batches with NumPy when it is installed
+"""
+import heapq
+import os
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    # Optional: without NumPy every file is accumulated in pure Python
+    np = None
+
+# Largest files kept per scan
+TOP_FILES = 20
+
+# Histogram bucket b holds sizes in [2**(b-1), 2**b); bucket 0 holds empty files
+HISTOGRAM_BUCKETS = 65
+
+# Files buffered before a vectorized NumPy accumulation
+ACCUMULATE_BATCH = 65536
+
+# Label for files directly in the scan root
+ROOT_LABEL = '.'
+
+# Name fragments that hint at a duplicated/old copy of a file
+DUPLICATE_PATTERNS = ['backup', 'v1', 'v2', 'old', 'copy', 'test']
+
+
+class DirectoryStats:
+    """Accumulates statistics from a stream of scanner entries"""
+
+    def __init__(self, top_files=TOP_FILES):
+        self.top_files = top_files
+        # [files, dirs, bytes]
+        self.totals = array('Q', [0, 0, 0])
+        self.extension_ids = {}
+        self.extension_counts = array('Q')
+        self.extension_bytes = array('Q')
+        self.top_level_ids = {}
+        self.top_level_counts = array('Q')
+        self.top_level_bytes = array('Q')
+        # HISTOGRAM_BUCKETS counters per top-level directory
+        self.top_level_histograms = array('Q')
+        self.histogram_bytes = array('Q', [0] * HISTOGRAM_BUCKETS)
+        # (size, extension id, top-level id) awaiting a NumPy batch
+        self._pending_sizes = array('q')
+        self._pending_extensions = array('q')
+        self._pending_top_levels = array('q')
+        self.pattern_counts = array('Q', [0] * len(DUPLICATE_PATTERNS))
+        # Min-heap of (size, sequence, path); the root is the smallest kept file
+        self._largest = []
+        self._sequence = 0
+
+    def add(self, entry):
+        """Fold one scanner entry into the statistics"""
+        if entry.is_dir:
+            self.totals[1] += 1
+            return
+
+        self.totals[0] += 1
+        self.totals[2] += entry.size
+
+        stem, ext = os.path.splitext(entry.name)
+        ext_id = self.extension_ids.get(ext.lower())
+        if ext_id is None:
+            ext_id = self.extension_ids[ext.lower()] = len(self.extension_counts)
+            self.extension_counts.append(0)
+            self.extension_bytes.append(0)
+        self.extension_counts[ext_id] += 1
+
+        top_level, separator, _ = entry.rel_path.partition('/')
+        if not separator:
+            top_level = ROOT_LABEL
+        top_id = self.top_level_ids.get(top_level)
+        if top_id is None:
+            top_id = self.top_level_ids[top_level] = len(self.top_level_counts)
+            self.top_level_counts.append(0)
+            self.top_level_bytes.append(0)
+            self.top_level_histograms.extend([0] * HISTOGRAM_BUCKETS)
+
+        if np is not None:
+            self._pending_sizes.append(entry.size)
+            self._pending_extensions.append(ext_id)
+            self._pending_top_levels.append(top_id)
+            if len(self._pending_sizes) >= ACCUMULATE_BATCH:
+                self._accumulate()
+        else:
+            bucket = entry.size.bit_length()
+            self.extension_bytes[ext_id] += entry.size
+            self.top_level_counts[top_id] += 1
+            self.top_level_bytes[top_id] += entry.size
+            self.top_level_histograms[top_id * HISTOGRAM_BUCKETS + bucket] += 1
+            self.histogram_bytes[bucket] += entry.size
+
+        # O(log N) only for files that make it into the top N
+        if len(self._largest) < self.top_files:
+            heapq.heappush(self._largest, (entry.size, self._sequence, entry.rel_path))
+            self._sequence += 1
+        elif entry.size > self._largest[0][0]:
+            heapq.heapreplace(self._largest, (entry.size, self._sequence, entry.rel_path))
+            self._sequence += 1
+
+        base_name = stem.lower()
+        for index, pattern in enumerate(DUPLICATE_PATTERNS):
+            if pattern in base_name:
+                self.pattern_counts[index] += 1
+
+    def _accumulate(self):
+        """Fold the pending batch into the counters with NumPy"""
+        if not self._pending_sizes:
+            return
+        sizes = np.frombuffer(self._pending_sizes, dtype=np.int64)
+        extensions = np.frombuffer(self._pending_extensions, dtype=np.int64)
+        top_levels = np.frombuffer(self._pending_top_levels, dtype=np.int64)
+
+        weights = sizes.astype(np.float64)
+        # frexp's exponent is the bit length of each size
+        buckets = np.frexp(weights)[1].astype(np.int64)
+
+        def fold(target, values):
+            for index in np.flatnonzero(values):
+                target[int(index)] += int(round(values[index]))
+
+        fold(self.extension_bytes, np.bincount(extensions, weights, len(self.extension_bytes)))
+        fold(self.top_level_counts, np.bincount(top_levels, minlength=len(self.top_level_counts)))
+        fold(self.top_level_bytes, np.bincount(top_levels, weights, len(self.top_level_bytes)))
+        fold(self.top_level_histograms, np.bincount(
+            top_levels * HISTOGRAM_BUCKETS + buckets, minlength=len(self.top_level_histograms)
+        ))
+        fold(self.histogram_bytes, np.bincount(buckets, weights, HISTOGRAM_BUCKETS))
+
+        self._pending_sizes = array('q')
+        self._pending_extensions = array('q')
+        self._pending_top_levels = array('q')
+
+    def _histogram(self, top_id):
+        start = top_id * HISTOGRAM_BUCKETS
+        return self.top_level_histograms[start:start + HISTOGRAM_BUCKETS]
+
+    def size_histogram(self):
+        """Non-empty log2 size buckets over all files"""
+        counts = [0] * HISTOGRAM_BUCKETS
+        for top_id in self.top_level_ids.values():
+            for bucket, count in enumerate(self._histogram(top_id)):
+                counts[bucket] += count
+        return [
+            {
+                'min_size': 0 if bucket == 0 else 1 << (bucket - 1),
+                'max_size': 0 if bucket == 0 else (1 << bucket) - 1,
+                'files': count,
+                'bytes': self.histogram_bytes[bucket],
+            }
+            for bucket, count in enumerate(counts)
+            if count
+        ]
+
+    def largest_files(self):
+        """Largest files, biggest first"""
+        return [
+            {'path': path, 'size': size}
+            for size, _, path in sorted(self._largest, key=lambda item: (-item[0], item[1]))
+        ]
+
+    def to_dict(self):
+        """Statistics in the cleanup plan's JSON shape"""
+        if np is not None:
+            self._accumulate()
+        return {
+            'total_files': self.totals[0],
+            'total_dirs': self.totals[1],
+            'total_size': self.totals[2],
+            'file_types': {
+                ext: self.extension_counts[ext_id] for ext, ext_id in self.extension_ids.items()
+            },
+            'bytes_by_extension': {
+                ext: self.extension_bytes[ext_id] for ext, ext_id in self.extension_ids.items()
+            },
+            'top_level_dirs': {
+                name: {
+                    'files': self.top_level_counts[top_id],
+                    'bytes': self.top_level_bytes[top_id],
+                    # log2 bucket -> files
+                    'size_histogram': {
+                        str(bucket): count for bucket, count in enumerate(self._histogram(top_id)) if count
+                    },
+                }
+                for name, top_id in self.top_level_ids.items()
+            },
+            'size_histogram': self.size_histogram(),
+            'largest_files': self.largest_files(),
+            'duplicate_patterns': {
+                pattern: count
+                for pattern, count in zip(DUPLICATE_PATTERNS, self.pattern_counts)
+                if count
+            },
+        }
+
+
+def _format_size(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def format_stats_table(stats, limit=10):
+    """Compact text tables of bytes by extension, top-level directory and size bucket"""
+    lines = [f"{'Extension':<16}{'Files':>10}{'Bytes':>12}"]
+    by_bytes = sorted(stats['bytes_by_extension'].items(), key=lambda item: item[1], reverse=True)
+    for ext, size in by_bytes[:limit]:
+        lines.append(f"{ext or 'none':<16}{stats['file_types'][ext]:>10,}{_format_size(size):>12}")
+
+    lines.append('')
+    lines.append(f"{'Directory':<24}{'Files':>10}{'Bytes':>12}")
+    top_levels = sorted(stats['top_level_dirs'].items(), key=lambda item: item[1]['bytes'], reverse=True)
+    for name, top_level in top_levels[:limit]:
+        lines.append(f"{name[:23]:<24}{top_level['files']:>10,}{_format_size(top_level['bytes']):>12}")
+
+    lines.append('')
+    lines.append(f"{'Size bucket':<24}{'Files':>10}{'Bytes':>12}")
+    for bucket in stats['size_histogram']:
+        label = '0 B' if bucket['max_size'] == 0 else \
+            f"{_format_size(bucket['min_size'])}-{_format_size(bucket['max_size'] + 1)}"
+        lines.append(f"{label:<24}{bucket['files']:>10,}{_format_size(bucket['bytes']):>12}")
+    return '\n'.join(lines)
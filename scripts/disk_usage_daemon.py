@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Live disk-usage tracker for the web_app tree
+Scans the tree once, then keeps per-directory size and file-count totals current from
+inotify events and answers queries from memory over a Unix socket
+
+Usage:
+    python3 disk_usage_daemon.py start [directory]
+    python3 disk_usage_daemon.py query <path>
+    python3 disk_usage_daemon.py top [path] [limit]
+"""
+import ctypes
+import ctypes.util
+import errno
+import json
+import os
+import selectors
+import signal
+import socket
+import struct
+import sys
+import time
+from pathlib import Path
+from stat import S_ISDIR
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.logger import log_action
+from scripts.fs_scanner import scan_tree
+
+WEB_APP_PATH = Path("/app/main/web_app")
+SOCKET_PATH = WEB_APP_PATH / "logs" / "disk_usage.sock"
+
+# Seconds a client waits for the daemon before falling back to a scan
+QUERY_TIMEOUT = 2.0
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+              | IN_ONLYDIR | IN_DONT_FOLLOW | IN_EXCL_UNLINK)
+
+# struct inotify_event header: wd, mask, cookie, name length
+EVENT_HEADER = struct.Struct('iIII')
+
+READ_SIZE = 64 * 1024
+
+
+class Inotify:
+    """Minimal ctypes binding to the Linux inotify API"""
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"inotify_init1 failed: {os.strerror(error)}")
+
+    def add_watch(self, path, mask=WATCH_MASK):
+        """Watch a directory; returns the watch descriptor"""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"inotify_add_watch {path}: {os.strerror(error)}")
+        return wd
+
+    def remove_watch(self, wd):
+        """Stop watching; errors for watches the kernel already dropped are ignored"""
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self):
+        """Yield (wd, mask, name) for every pending event"""
+        try:
+            data = os.read(self.fd, READ_SIZE)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            yield wd, mask, os.fsdecode(name)
+
+    def close(self):
+        os.close(self.fd)
+
+
+class DirNode:
+    """One directory with its own files and running totals for its subtree"""
+
+    __slots__ = ('rel_path', 'parent', 'files', 'children', 'bytes', 'file_count', 'dir_count', 'wd')
+
+    def __init__(self, rel_path, parent):
+        self.rel_path = rel_path
+        self.parent = parent
+        self.files = {}
+        self.children = {}
+        self.bytes = 0
+        self.file_count = 0
+        self.dir_count = 0
+        self.wd = None
+
+
+class UsageTree:
+    """In-memory aggregates for a tree, kept current from inotify events
+
+    Totals are updated by walking up the changed directory's ancestors,
+    so events cost O(depth) and queries are a dict lookup.
+    """
+
+    def __init__(self, root):
+        # Watches never follow symlinks, so track the real directory
+        self.root = Path(os.path.realpath(root))
+        self.inotify = Inotify()
+        self.nodes = {}
+        self.watches = {}
+        self.complete = True
+        self._reset()
+
+    def _reset(self):
+        for wd in list(self.watches):
+            self.inotify.remove_watch(wd)
+        self.watches = {}
+        self.nodes = {'': DirNode('', None)}
+        self.complete = True
+        self._watch(self.nodes[''])
+
+    def _path(self, rel_path):
+        return self.root / rel_path if rel_path else self.root
+
+    def _watch(self, node):
+        try:
+            node.wd = self.inotify.add_watch(self._path(node.rel_path))
+            self.watches[node.wd] = node
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                # Out of inotify watches: totals below here can go stale
+                self.complete = False
+            log_action(f"Cannot watch {self._path(node.rel_path)}: {e}")
+
+    def _adjust(self, node, size_delta, file_delta, dir_delta):
+        while node is not None:
+            node.bytes += size_delta
+            node.file_count += file_delta
+            node.dir_count += dir_delta
+            node = node.parent
+
+    def _add_dir(self, parent, name):
+        rel_path = f"{parent.rel_path}/{name}" if parent.rel_path else name
+        node = self.nodes.get(rel_path)
+        if node is None:
+            node = DirNode(rel_path, parent)
+            parent.children[name] = node
+            self.nodes[rel_path] = node
+            self._adjust(parent, 0, 0, 1)
+            self._watch(node)
+        return node
+
+    def _set_file(self, parent, name, size):
+        previous = parent.files.get(name)
+        parent.files[name] = size
+        if previous is None:
+            self._adjust(parent, size, 1, 0)
+        elif previous != size:
+            self._adjust(parent, size - previous, 0, 0)
+
+    def _remove(self, parent, name):
+        if name in parent.files:
+            self._adjust(parent, -parent.files.pop(name), -1, 0)
+            return
+        node = parent.children.pop(name, None)
+        if node is None:
+            return
+        self._adjust(parent, -node.bytes, -node.file_count, -node.dir_count - 1)
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            self.nodes.pop(current.rel_path, None)
+            if current.wd is not None and self.watches.pop(current.wd, None) is current:
+                self.inotify.remove_watch(current.wd)
+            stack.extend(current.children.values())
+
+    def scan(self, parent=None):
+        """Populate a directory's subtree from one parallel scan"""
+        parent = parent or self.nodes['']
+        base = parent.rel_path
+        for entry in scan_tree(self._path(base)):
+            rel_path = f"{base}/{entry.rel_path}" if base else entry.rel_path
+            directory = self.nodes.get(rel_path.rpartition('/')[0])
+            if directory is None:
+                continue
+            if entry.is_dir:
+                self._add_dir(directory, entry.name)
+            else:
+                self._set_file(directory, entry.name, entry.size)
+
+    def _refresh(self, parent, name):
+        """Bring one child of a directory in line with the filesystem"""
+        try:
+            info = os.lstat(self._path(parent.rel_path) / name)
+        except OSError:
+            self._remove(parent, name)
+            return
+        if S_ISDIR(info.st_mode):
+            if name in parent.files:
+                self._remove(parent, name)
+            if name not in parent.children:
+                self.scan(self._add_dir(parent, name))
+        else:
+            if name in parent.children:
+                self._remove(parent, name)
+            self._set_file(parent, name, info.st_size)
+
+    def process_events(self):
+        """Apply every pending inotify event; returns the number handled"""
+        # Repeated writes to one file in a batch need a single stat
+        touched = {}
+        handled = 0
+        for wd, mask, name in self.inotify.read_events():
+            handled += 1
+            if mask & IN_Q_OVERFLOW:
+                log_action("inotify queue overflowed, rescanning")
+                self._reset()
+                self.scan()
+                return handled
+            node = self.watches.get(wd)
+            if node is None:
+                continue
+            if mask & IN_IGNORED:
+                if self.watches.get(wd) is node:
+                    del self.watches[wd]
+                    node.wd = None
+                continue
+            if mask & IN_DELETE_SELF or not name:
+                continue
+            if mask & (IN_DELETE | IN_MOVED_FROM):
+                touched.pop((wd, name), None)
+                self._remove(node, name)
+            else:
+                touched[(wd, name)] = node
+
+        for (_, name), node in touched.items():
+            if node.rel_path in self.nodes:
+                self._refresh(node, name)
+        return handled
+
+    def usage(self, rel_path):
+        """Totals for one directory, or None if it is not tracked"""
+        node = self.nodes.get(rel_path.strip('/'))
+        if node is None:
+            return None
+        return {
+            'path': node.rel_path,
+            'bytes': node.bytes,
+            'files': node.file_count,
+            'dirs': node.dir_count,
+            'complete': self.complete,
+        }
+
+    def top(self, rel_path, limit=10):
+        """Largest immediate subdirectories of a directory"""
+        node = self.nodes.get(rel_path.strip('/'))
+        if node is None:
+            return None
+        children = sorted(node.children.values(), key=lambda child: child.bytes, reverse=True)
+        return [self.usage(child.rel_path) for child in children[:limit]]
+
+
+def _handle_request(tree, line):
+    """Answer one JSON request line"""
+    try:
+        request = json.loads(line)
+        op = request.get('op')
+        path = str(request.get('path', ''))
+        if os.path.isabs(path):
+            path = os.path.relpath(os.path.realpath(path), tree.root)
+            path = '' if path == '.' else path
+        if op == 'usage':
+            result = tree.usage(path)
+        elif op == 'top':
+            result = tree.top(path, int(request.get('limit', 10)))
+        elif op == 'ping':
+            result = {'root': str(tree.root), 'directories': len(tree.nodes)}
+        else:
+            return {'error': f"unknown op {op!r}"}
+        return {'result': result} if result is not None else {'error': f"not tracked: {path}"}
+    except (ValueError, TypeError) as e:
+        return {'error': str(e)}
+
+
+def serve(root=WEB_APP_PATH, socket_path=SOCKET_PATH):
+    """Run the daemon in the foreground until interrupted"""
+    start = time.perf_counter()
+    tree = UsageTree(root)
+    tree.scan()
+    log_action(f"Disk usage daemon tracking {len(tree.nodes)} directories under {tree.root} "
+               f"(initial scan {time.perf_counter() - start:.2f} s)")
+
+    socket_path = Path(socket_path)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if socket_path.exists():
+        socket_path.unlink()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(socket_path))
+    server.listen()
+    server.setblocking(False)
+
+    # One thread: inotify, the listening socket and clients share a selector
+    selector = selectors.DefaultSelector()
+    selector.register(tree.inotify.fd, selectors.EVENT_READ, 'inotify')
+    selector.register(server, selectors.EVENT_READ, 'accept')
+    buffers = {}
+
+    # Stop cleanly on kill as well as Ctrl-C
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    try:
+        while True:
+            for key, _ in selector.select():
+                if key.data == 'inotify':
+                    tree.process_events()
+                elif key.data == 'accept':
+                    client, _ = server.accept()
+                    client.setblocking(False)
+                    buffers[client] = b''
+                    selector.register(client, selectors.EVENT_READ, 'client')
+                else:
+                    client = key.fileobj
+                    try:
+                        data = client.recv(4096)
+                    except OSError:
+                        data = b''
+                    if not data:
+                        selector.unregister(client)
+                        buffers.pop(client, None)
+                        client.close()
+                        continue
+                    buffers[client] += data
+                    while b'\n' in buffers[client]:
+                        line, buffers[client] = buffers[client].split(b'\n', 1)
+                        response = json.dumps(_handle_request(tree, line)) + '\n'
+                        client.setblocking(True)
+                        client.sendall(response.encode('utf-8'))
+                        client.setblocking(False)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        log_action("Disk usage daemon stopped")
+        selector.close()
+        server.close()
+        if socket_path.exists():
+            socket_path.unlink()
+        tree.inotify.close()
+
+
+def query_daemon(request, socket_path=SOCKET_PATH, timeout=QUERY_TIMEOUT):
+    """Send one request to the daemon; returns the result or None if it is not running"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(str(socket_path))
+            client.sendall((json.dumps(request) + '\n').encode('utf-8'))
+            response = b''
+            while not response.endswith(b'\n'):
+                chunk = client.recv(65536)
+                if not chunk:
+                    break
+                response += chunk
+    except OSError:
+        return None
+    try:
+        return json.loads(response).get('result')
+    except ValueError:
+        return None
+
+
+def query_usage(path, socket_path=SOCKET_PATH):
+    """Size, file and directory counts for a path, or None without a daemon"""
+    return query_daemon({'op': 'usage', 'path': str(path)}, socket_path)
+
+
+def main():
+    """Command line entry point"""
+    args = sys.argv[1:]
+    command = args[0] if args else None
+
+    if command == 'start':
+        serve(Path(args[1]) if len(args) > 1 else WEB_APP_PATH)
+    elif command == 'query' and len(args) == 2:
+        usage = query_usage(args[1])
+        if usage is None:
+            print("Daemon not running or path not tracked")
+        else:
+            print(f"{usage['path'] or '.'}: {usage['bytes'] / (1024*1024):.2f} MB, "
+                  f"{usage['files']} files, {usage['dirs']} directories")
+    elif command == 'top':
+        limit = int(args[2]) if len(args) > 2 else 10
+        result = query_daemon({'op': 'top', 'path': args[1] if len(args) > 1 else '', 'limit': limit})
+        if result is None:
+            print("Daemon not running or path not tracked")
+            return
+        for usage in result:
+            print(f"  {usage['path']}: {usage['bytes'] / (1024*1024):.2f} MB ({usage['files']} files)")
+    else:
+        print(__doc__)
+
+
+if __name__ == "__main__":
+    main()
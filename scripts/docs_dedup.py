@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate documentation detection with MinHash and LSH
+Finds clusters of near-identical docs (e.g. timestamped backups) without comparing every pair
+"""
+import random
+import re
+import sys
+import zlib
+from collections import defaultdict
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.logger import log_action
+from scripts.docs_index import tokenize, iter_doc_paths
+
+# Words per shingle
+SHINGLE_SIZE = 5
+
+# MinHash signature length = LSH_BANDS * LSH_ROWS
+LSH_BANDS = 20
+LSH_ROWS = 5
+NUM_PERMUTATIONS = LSH_BANDS * LSH_ROWS
+
+# Minimum estimated Jaccard similarity for two docs to count as near-duplicates.
+# A pair with similarity s shares a bucket with probability 1 - (1 - s^5)^20:
+# ~99.96% at 0.8 and ~97.5% at 0.7, while only ~47% of pairs at 0.5 become
+# candidates. Every candidate is verified against the threshold.
+SIMILARITY_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed so signatures are comparable across runs
+_rng = random.Random(1729)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def shingle_hashes(text, size=SHINGLE_SIZE):
+    """32-bit hashes of the word shingles in a document"""
+    tokens = tokenize(text)
+    if len(tokens) < size:
+        return {zlib.crc32(' '.join(tokens).encode('utf-8'))} if tokens else set()
+    return {
+        zlib.crc32(' '.join(tokens[i:i + size]).encode('utf-8'))
+        for i in range(len(tokens) - size + 1)
+    }
+
+
+def minhash_signature(hashes):
+    """MinHash signature of a non-empty shingle set"""
+    return [
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _MAX_HASH
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def estimate_similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity of two signatures"""
+    matches = sum(1 for x, y in zip(signature_a, signature_b) if x == y)
+    return matches / NUM_PERMUTATIONS
+
+
+def _candidate_pairs(signatures):
+    """Pairs of docs sharing at least one LSH band bucket"""
+    candidates = set()
+    for band in range(LSH_BANDS):
+        start = band * LSH_ROWS
+        buckets = defaultdict(list)
+        for doc_id, signature in enumerate(signatures):
+            buckets[tuple(signature[start:start + LSH_ROWS])].append(doc_id)
+        for members in buckets.values():
+            for i in range(len(members)):
+                for j in range(i + 1, len(members)):
+                    candidates.add((members[i], members[j]))
+    return candidates
+
+
+def find_near_duplicates(paths, threshold=SIMILARITY_THRESHOLD):
+    """Cluster near-duplicate docs
+
+    Returns a list of clusters, largest first:
+        {'canonical': path, 'members': [{'path': path, 'similarity': float}, ...]}
+    The canonical doc is the most recently modified one; each member's
+    similarity is measured against it. Empty and unreadable docs have no
+    shingles to compare and are left out.
+    """
+    compared = []
+    signatures = []
+    mtimes = []
+    for path in map(Path, paths):
+        try:
+            text = path.read_text(encoding='utf-8', errors='replace')
+            mtime = path.stat().st_mtime
+        except OSError as e:
+            log_action(f"Error reading {path}: {e}")
+            continue
+        hashes = shingle_hashes(text)
+        if not hashes:
+            continue
+        compared.append(path)
+        signatures.append(minhash_signature(hashes))
+        mtimes.append(mtime)
+    paths = compared
+
+    # Union-find over candidate pairs that pass verification
+    parent = list(range(len(paths)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in _candidate_pairs(signatures):
+        if estimate_similarity(signatures[i], signatures[j]) >= threshold:
+            parent[find(i)] = find(j)
+
+    groups = defaultdict(list)
+    for doc_id in range(len(paths)):
+        groups[find(doc_id)].append(doc_id)
+
+    clusters = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        canonical = max(members, key=lambda i: (mtimes[i], -len(str(paths[i]))))
+        clusters.append({
+            'canonical': str(paths[canonical]),
+            'members': [
+                {
+                    'path': str(paths[i]),
+                    'similarity': round(estimate_similarity(signatures[canonical], signatures[i]), 3)
+                }
+                for i in sorted(members, key=lambda i: str(paths[i]))
+                if i != canonical
+            ]
+        })
+
+    clusters.sort(key=lambda cluster: len(cluster['members']), reverse=True)
+    return clusters
+
+
+def duplicate_map(clusters):
+    """Map each non-canonical doc to (canonical doc, similarity)"""
+    duplicates = {}
+    for cluster in clusters:
+        for member in cluster['members']:
+            duplicates[member['path']] = (cluster['canonical'], member['similarity'])
+    return duplicates
+
+
+def _paragraphs(text):
+    """Non-empty blank-line separated blocks of a document"""
+    return [block.strip() for block in re.split(r'\n\s*\n', text) if block.strip()]
+
+
+def unique_paragraphs(text, *references):
+    """Paragraphs of text found in none of the reference texts, in order
+
+    Whitespace differences are ignored, so reflowed copies still match.
+    """
+    seen = {' '.join(paragraph.split()) for reference in references for paragraph in _paragraphs(reference)}
+    unique = []
+    for paragraph in _paragraphs(text):
+        key = ' '.join(paragraph.split())
+        if key not in seen:
+            seen.add(key)
+            unique.append(paragraph)
+    return unique
+
+
+def docs_duplicate_map(docs_dir, threshold=SIMILARITY_THRESHOLD):
+    """Near-duplicate map keyed by file name for the top level of a docs directory"""
+    clusters = find_near_duplicates(sorted(Path(docs_dir).glob('*.md')), threshold)
+    return {
+        Path(path).name: (Path(canonical).name, similarity)
+        for path, (canonical, similarity) in duplicate_map(clusters).items()
+    }
+
+
+def main():
+    """Report near-duplicate clusters across all documentation sources"""
+    paths = sys.argv[1:] or list(iter_doc_paths())
+    clusters = find_near_duplicates(paths)
+
+    print("\n" + "=" * 60)
+    print("Near-Duplicate Documentation Report")
+    print("=" * 60)
+    print(f"Docs compared: {len(paths)}")
+    print(f"Clusters found: {len(clusters)}")
+    for cluster in clusters:
+        print(f"\n📄 {cluster['canonical']}")
+        for member in cluster['members']:
+            print(f"   {member['similarity']:.0%}  {member['path']}")
+
+    log_action(f"Near-duplicate scan: {len(clusters)} clusters across {len(paths)} docs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Full-text search index over the web app documentation
+Builds a positional inverted index with BM25 ranking and updates it incrementally by mtime
+
+Usage:
+    python3 docs_index.py build
+    python3 docs_index.py search hls buffering
+"""
+import gzip
+import json
+import math
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.logger import log_action
+
+WEB_APP_DIR = Path("/app/main/web_app")
+
+# (root, glob pattern) pairs; a pattern of None means the root is a single document
+DOC_SOURCES = [
+    (WEB_APP_DIR / "docs", "**/*.md"),
+    (WEB_APP_DIR / "backup", "**/docs/**/*.md"),
+    (WEB_APP_DIR / "Web_App_Instructions", None),
+]
+
+INDEX_PATH = WEB_APP_DIR / "logs" / "docs_search_index.json.gz"
+
+INDEX_VERSION = 1
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Score bonus when every query term appears as an exact phrase
+PHRASE_BONUS = 1.5
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9_]*")
+HEADING_PATTERN = re.compile(r"^#\s+(.+)$", re.MULTILINE)
+
+
+def tokenize(text):
+    """Lowercase word tokens in document order"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def iter_doc_paths(sources=None):
+    """Yield every documentation file under the configured sources"""
+    for root, pattern in sources or DOC_SOURCES:
+        if pattern is None:
+            if root.is_file():
+                yield root
+        elif root.is_dir():
+            yield from sorted(root.glob(pattern))
+
+
+def _doc_title(text, path):
+    match = HEADING_PATTERN.search(text)
+    return match.group(1).strip() if match else Path(path).name
+
+
+class DocsIndex:
+    """Positional inverted index over markdown documents"""
+
+    def __init__(self, index_path=INDEX_PATH):
+        self.index_path = Path(index_path)
+        # doc id -> {'path', 'mtime_ns', 'size', 'length', 'title'}; None for dropped docs
+        self.docs = []
+        # term -> list of [doc id, [delta-encoded positions]]
+        self.postings = defaultdict(list)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def load(self):
+        """Load the index from disk; returns False if there is none"""
+        if not self.index_path.exists():
+            return False
+
+        with gzip.open(self.index_path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != INDEX_VERSION:
+            return False
+
+        self.docs = [
+            {'path': path, 'mtime_ns': mtime_ns, 'size': size, 'length': length, 'title': title}
+            for path, mtime_ns, size, length, title in data['docs']
+        ]
+        # Postings stay delta-encoded in memory; only query terms are decoded
+        self.postings = defaultdict(list, data['terms'])
+        return True
+
+    def save(self):
+        """Write the index to disk, compacting doc ids"""
+        remap = {}
+        docs = []
+        for doc_id, doc in enumerate(self.docs):
+            if doc is not None:
+                remap[doc_id] = len(docs)
+                docs.append([doc['path'], doc['mtime_ns'], doc['size'], doc['length'], doc['title']])
+
+        terms = {}
+        for term, entries in self.postings.items():
+            kept = [[remap[doc_id], deltas] for doc_id, deltas in entries if doc_id in remap]
+            if kept:
+                terms[term] = kept
+
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix('.tmp')
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'docs': docs, 'terms': terms}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.index_path)
+
+        # Keep the in-memory ids consistent with what was written
+        self.docs = [self.docs[doc_id] for doc_id in remap]
+        self.postings = defaultdict(list, terms)
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+    def add_document(self, path, text, stat):
+        """Tokenize a document and add its postings"""
+        tokens = tokenize(text)
+        doc_id = len(self.docs)
+        self.docs.append({
+            'path': str(path),
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'length': len(tokens),
+            'title': _doc_title(text, path),
+        })
+
+        positions = defaultdict(list)
+        for position, token in enumerate(tokens):
+            positions[token].append(position)
+        for token, token_positions in positions.items():
+            self.postings[token].append([doc_id, _delta(token_positions)])
+
+    def update(self, paths=None):
+        """Re-index new or modified docs and drop deleted ones
+
+        Unchanged docs (same mtime and size) are not reread.
+        Returns (added_or_updated, removed) counts.
+        """
+        paths = [Path(p) for p in (paths if paths is not None else iter_doc_paths())]
+        current = {}
+        for path in paths:
+            try:
+                current[str(path)] = path.stat()
+            except OSError:
+                continue
+
+        stale_ids = set()
+        removed = 0
+        indexed = {}
+        for doc_id, doc in enumerate(self.docs):
+            if doc is None:
+                continue
+            stat = current.get(doc['path'])
+            if stat is None or stat.st_mtime_ns != doc['mtime_ns'] or stat.st_size != doc['size']:
+                stale_ids.add(doc_id)
+                removed += stat is None
+                self.docs[doc_id] = None
+            else:
+                indexed[doc['path']] = doc_id
+
+        if stale_ids:
+            for term in list(self.postings):
+                entries = [entry for entry in self.postings[term] if entry[0] not in stale_ids]
+                if entries:
+                    self.postings[term] = entries
+                else:
+                    del self.postings[term]
+
+        updated = 0
+        for path_str, stat in current.items():
+            if path_str in indexed:
+                continue
+            try:
+                text = Path(path_str).read_text(encoding='utf-8', errors='replace')
+            except OSError as e:
+                log_action(f"Error reading {path_str}: {e}")
+                continue
+            self.add_document(path_str, text, stat)
+            updated += 1
+
+        return updated, removed
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+    def search(self, query, limit=10):
+        """Rank documents for a query with BM25 plus a phrase bonus"""
+        terms = tokenize(query)
+        live_docs = [doc for doc in self.docs if doc is not None]
+        if not terms or not live_docs:
+            return []
+
+        doc_count = len(live_docs)
+        avg_length = sum(doc['length'] for doc in live_docs) / doc_count or 1
+
+        scores = defaultdict(float)
+        for term in dict.fromkeys(terms):
+            entries = self.postings.get(term, [])
+            if not entries:
+                continue
+            idf = math.log(1 + (doc_count - len(entries) + 0.5) / (len(entries) + 0.5))
+            for doc_id, deltas in entries:
+                tf = len(deltas)
+                length = self.docs[doc_id]['length']
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+                scores[doc_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        if len(terms) > 1:
+            term_positions = [
+                {doc_id: set(_undelta(deltas)) for doc_id, deltas in self.postings.get(term, [])}
+                for term in terms
+            ]
+            for doc_id in scores:
+                if _has_phrase(doc_id, term_positions):
+                    scores[doc_id] *= PHRASE_BONUS
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [
+            {
+                'path': self.docs[doc_id]['path'],
+                'title': self.docs[doc_id]['title'],
+                'score': round(score, 4),
+            }
+            for doc_id, score in ranked
+        ]
+
+
+def _delta(positions):
+    previous = 0
+    deltas = []
+    for position in positions:
+        deltas.append(position - previous)
+        previous = position
+    return deltas
+
+
+def _undelta(deltas):
+    position = 0
+    positions = []
+    for delta in deltas:
+        position += delta
+        positions.append(position)
+    return positions
+
+
+def _has_phrase(doc_id, term_positions):
+    """Whether the query terms occur consecutively in a document"""
+    if any(doc_id not in positions for positions in term_positions):
+        return False
+    return any(
+        all(start + offset in positions[doc_id] for offset, positions in enumerate(term_positions))
+        for start in term_positions[0][doc_id]
+    )
+
+
+def update_docs_index(index_path=INDEX_PATH):
+    """Incrementally refresh the on-disk docs index"""
+    index = DocsIndex(index_path)
+    index.load()
+    updated, removed = index.update()
+    if updated or removed or not index.index_path.exists():
+        index.save()
+    log_action(f"Docs search index: {updated} docs (re)indexed, {removed} removed")
+    return index
+
+
+def main():
+    """Command line entry point"""
+    if len(sys.argv) < 2 or sys.argv[1] not in ('build', 'search'):
+        print(__doc__)
+        return
+
+    if sys.argv[1] == 'build':
+        index = update_docs_index()
+        print(f"Indexed {sum(1 for doc in index.docs if doc)} docs into {index.index_path}")
+        return
+
+    query = ' '.join(sys.argv[2:])
+    start = time.perf_counter()
+    index = DocsIndex()
+    if not index.load():
+        index = update_docs_index()
+    results = index.search(query)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{len(results)} results for '{query}' ({elapsed_ms:.1f} ms)")
+    for result in results:
+        print(f"  {result['score']:>8.3f}  {result['title']}")
+        print(f"            {result['path']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Markdown link graph and broken-link checker for the docs
+Parses every link and heading anchor in one pass per file, caches the result per file
+by content hash, validates all edges in one batch and rewrites links when docs move
+
+Usage:
+    python3 docs_links.py check [docs_dir]
+    python3 docs_links.py move <old_path> <new_path> [docs_dir]
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.logger import log_action
+
+DOCS_DIR = Path("/app/main/web_app/docs")
+CACHE_PATH = Path("/app/main/web_app/logs/docs_link_graph_cache.json")
+
+CACHE_VERSION = 1
+
+# [text](target "title") and ![alt](target)
+INLINE_LINK_PATTERN = re.compile(r'(!?\[[^\]]*\]\(\s*<?)([^)\s>]+)(>?(?:\s+"[^"]*")?\s*\))')
+# [id]: target
+REFERENCE_LINK_PATTERN = re.compile(r'^(\s{0,3}\[[^\]]+\]:\s*<?)(\S+?)(>?(?:\s|$))')
+HEADING_PATTERN = re.compile(r'^\s{0,3}(#{1,6})\s+(.*?)\s*#*\s*$')
+HTML_ANCHOR_PATTERN = re.compile(r'<a\s+[^>]*(?:name|id)\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+INLINE_CODE_PATTERN = re.compile(r'`[^`]*`')
+FENCE_PATTERN = re.compile(r'^\s{0,3}(```|~~~)')
+EXTERNAL_PATTERN = re.compile(r'^[a-z][a-z0-9+.-]*:', re.IGNORECASE)
+
+
+def slugify(heading):
+    """GitHub-style anchor slug for a heading"""
+    slug = re.sub(r'[^\w\- ]', '', heading.strip().lower())
+    return slug.replace(' ', '-')
+
+
+def parse_markdown(text):
+    """Single pass over a document collecting links and anchors
+
+    Returns (links, anchors) where links is a list of [line number, target]
+    and anchors is a list of anchor names defined in the document.
+    """
+    links = []
+    anchors = []
+    slug_counts = defaultdict(int)
+    in_fence = None
+
+    for line_number, line in enumerate(text.splitlines(), 1):
+        fence = FENCE_PATTERN.match(line)
+        if fence:
+            if in_fence is None:
+                in_fence = fence.group(1)
+            elif fence.group(1) == in_fence:
+                in_fence = None
+            continue
+        if in_fence:
+            continue
+
+        heading = HEADING_PATTERN.match(line)
+        if heading:
+            slug = slugify(heading.group(2))
+            count = slug_counts[slug]
+            slug_counts[slug] += 1
+            anchors.append(slug if count == 0 else f"{slug}-{count}")
+
+        anchors.extend(HTML_ANCHOR_PATTERN.findall(line))
+
+        searchable = INLINE_CODE_PATTERN.sub(lambda m: ' ' * len(m.group(0)), line)
+        for match in INLINE_LINK_PATTERN.finditer(searchable):
+            links.append([line_number, match.group(2)])
+        reference = REFERENCE_LINK_PATTERN.match(searchable)
+        if reference:
+            links.append([line_number, reference.group(2)])
+
+    return links, anchors
+
+
+def _split_target(target):
+    path_part, _, anchor = target.partition('#')
+    return unquote(path_part), unquote(anchor)
+
+
+def is_local_target(target):
+    """Whether a link points into the filesystem rather than the web"""
+    return not (EXTERNAL_PATTERN.match(target) or target.startswith('//'))
+
+
+class LinkGraph:
+    """Link graph over the markdown files below a docs directory
+
+    Root-relative links (/docs/guide.md) resolve against root_dir, the
+    repository the docs live in, which defaults to the parent of docs_dir.
+    """
+
+    def __init__(self, docs_dir=DOCS_DIR, cache_path=CACHE_PATH, root_dir=None):
+        self.docs_dir = Path(os.path.abspath(docs_dir))
+        self.root_dir = os.path.abspath(root_dir) if root_dir else str(self.docs_dir.parent)
+        self.cache_path = Path(cache_path)
+        # path -> {'size', 'mtime_ns', 'hash', 'links', 'anchors'}
+        self.files = {}
+        self._cache = {}
+        self._load_cache()
+
+    def _load_cache(self):
+        if not self.cache_path.exists():
+            return
+        try:
+            with open(self.cache_path, 'r') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return
+        if data.get('version') == CACHE_VERSION and data.get('docs_dir') == str(self.docs_dir):
+            self._cache = data['files']
+
+    def save_cache(self):
+        """Persist the per-file parse results"""
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': CACHE_VERSION, 'docs_dir': str(self.docs_dir), 'files': self.files}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def _parse_file(self, path, stat):
+        """Parse a file, reusing the cached result when its content is unchanged"""
+        key = str(path)
+        cached = self._cache.get(key)
+        if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+            return cached
+
+        data = path.read_bytes()
+        content_hash = hashlib.sha1(data).hexdigest()
+        if cached and cached['hash'] == content_hash:
+            # Touched but not edited
+            return {**cached, 'mtime_ns': stat.st_mtime_ns}
+
+        links, anchors = parse_markdown(data.decode('utf-8', errors='replace'))
+        return {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'hash': content_hash,
+            'links': links,
+            'anchors': anchors,
+        }
+
+    def build(self):
+        """Parse (or load from cache) every markdown file"""
+        self.files = {}
+        for path in sorted(self.docs_dir.rglob('*.md')):
+            try:
+                self.files[str(path)] = self._parse_file(path, path.stat())
+            except OSError as e:
+                log_action(f"Error reading {path}: {e}")
+        return self
+
+    def edges(self):
+        """Yield (source, line, raw target, resolved path, anchor) for every local link"""
+        for source, info in self.files.items():
+            source_dir = os.path.dirname(source)
+            for line_number, target in info['links']:
+                if not is_local_target(target):
+                    continue
+                path_part, anchor = _split_target(target)
+                if not path_part:
+                    resolved = source
+                elif path_part.startswith('/'):
+                    resolved = os.path.normpath(os.path.join(self.root_dir, path_part.lstrip('/')))
+                else:
+                    resolved = os.path.normpath(os.path.join(source_dir, path_part))
+                yield source, line_number, target, resolved, anchor
+
+    def validate(self):
+        """Check every edge in one batch; returns a list of broken links"""
+        edges = list(self.edges())
+
+        # Resolve each distinct target once
+        targets = {resolved for _, _, _, resolved, _ in edges}
+        exists = {target: target in self.files or os.path.exists(target) for target in targets}
+        # Heading slugs are lowercase but HTML id/name anchors keep their case;
+        # compare both case-insensitively
+        anchors = {path: {anchor.lower() for anchor in info['anchors']} for path, info in self.files.items()}
+
+        broken = []
+        for source, line_number, target, resolved, anchor in edges:
+            if not exists[resolved]:
+                broken.append({'source': source, 'line': line_number, 'target': target, 'reason': 'missing file'})
+            elif anchor and resolved in anchors and anchor.lower() not in anchors[resolved]:
+                broken.append({'source': source, 'line': line_number, 'target': target, 'reason': 'missing anchor'})
+        return broken
+
+    def move(self, moves):
+        """Move docs and rewrite every link affected by the moves
+
+        moves maps old paths to new paths. Links into a moved doc and
+        relative links out of a moved doc are both rewritten.
+        Returns the number of links rewritten.
+        """
+        moves = {os.path.normpath(os.path.abspath(old)): os.path.normpath(os.path.abspath(new))
+                 for old, new in moves.items()}
+
+        # file -> {line number: [(old target, new target)]}
+        rewrites = defaultdict(lambda: defaultdict(list))
+        for source, line_number, target, resolved, anchor in self.edges():
+            new_source = moves.get(source, source)
+            new_resolved = moves.get(resolved, resolved)
+            if new_source == source and new_resolved == resolved:
+                continue
+            path_part, _ = _split_target(target)
+            if not path_part:
+                continue  # same-document anchor
+            if path_part.startswith('/'):
+                new_path = '/' + os.path.relpath(new_resolved, self.root_dir)
+            else:
+                new_path = os.path.relpath(new_resolved, os.path.dirname(new_source))
+            # Spaces and parentheses would end the link target early
+            new_target = quote(new_path.replace(os.sep, '/'))
+            if anchor:
+                new_target += f"#{quote(anchor)}"
+            if new_target != target:
+                rewrites[source][line_number].append((target, new_target))
+
+        for old, new in moves.items():
+            Path(new).parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(old, new)
+            log_action(f"Moved {old} to {new}")
+
+        rewritten = 0
+        for source, line_changes in rewrites.items():
+            path = Path(moves.get(source, source))
+            lines = path.read_text(encoding='utf-8').split('\n')
+            for line_number, changes in line_changes.items():
+                line = lines[line_number - 1]
+                for old_target, new_target in changes:
+                    line, count = _replace_target(line, old_target, new_target)
+                    rewritten += count
+                lines[line_number - 1] = line
+            path.write_text('\n'.join(lines), encoding='utf-8')
+
+        self.build()
+        return rewritten
+
+
+def _replace_target(line, old_target, new_target):
+    """Swap a link target inside link syntax only; returns (line, count)"""
+    count = 0
+
+    def swap(match):
+        nonlocal count
+        if match.group(2) != old_target:
+            return match.group(0)
+        count += 1
+        return match.group(1) + new_target + match.group(3)
+
+    line = INLINE_LINK_PATTERN.sub(swap, line)
+    line = REFERENCE_LINK_PATTERN.sub(swap, line, count=1)
+    return line, count
+
+
+def check_docs_links(docs_dir=DOCS_DIR):
+    """Build the link graph, validate it and log broken links"""
+    graph = LinkGraph(docs_dir).build()
+    broken = graph.validate()
+    graph.save_cache()
+
+    for link in broken:
+        log_action(f"Broken link ({link['reason']}): {link['source']}:{link['line']} -> {link['target']}")
+    log_action(f"Link check: {len(graph.files)} docs, {len(broken)} broken links")
+    return broken
+
+
+def main():
+    """Command line entry point"""
+    if len(sys.argv) < 2 or sys.argv[1] not in ('check', 'move'):
+        print(__doc__)
+        return
+
+    if sys.argv[1] == 'check':
+        docs_dir = Path(sys.argv[2]) if len(sys.argv) > 2 else DOCS_DIR
+        start = time.perf_counter()
+        broken = check_docs_links(docs_dir)
+        print(f"\n{len(broken)} broken links ({(time.perf_counter() - start) * 1000:.0f} ms)")
+        return
+
+    if len(sys.argv) < 4:
+        print(__doc__)
+        return
+    docs_dir = Path(sys.argv[4]) if len(sys.argv) > 4 else DOCS_DIR
+    graph = LinkGraph(docs_dir).build()
+    rewritten = graph.move({sys.argv[2]: sys.argv[3]})
+    graph.save_cache()
+    print(f"Moved {sys.argv[2]} -> {sys.argv[3]}, rewrote {rewritten} links")
+
+
+if __name__ == "__main__":
+    main()
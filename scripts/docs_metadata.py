@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Persistent per-doc metadata cache for incremental index generation
+Keeps title, headings, size, word count and hash per doc so only changed docs are reread
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.logger import log_action
+
+CACHE_PATH = Path("/app/main/web_app/logs/docs_metadata_cache.json")
+
+CACHE_VERSION = 1
+
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$', re.MULTILINE)
+
+
+def extract_metadata(text):
+    """Title, headings and word count of a markdown document"""
+    headings = [[len(level), title] for level, title in HEADING_PATTERN.findall(text)]
+    title = next((title for level, title in headings if level == 1), None)
+    return {
+        'title': title,
+        'headings': headings,
+        'word_count': len(text.split()),
+    }
+
+
+class DocMetadataCache:
+    """Per-doc metadata keyed by path, refreshed only when a doc changes"""
+
+    def __init__(self, cache_path=CACHE_PATH):
+        self.cache_path = Path(cache_path)
+        self.docs = {}
+        self.renders = {}
+        self.reads = 0
+        self._dirty = False
+
+        if self.cache_path.exists():
+            try:
+                with open(self.cache_path, 'r') as f:
+                    data = json.load(f)
+                if data.get('version') == CACHE_VERSION:
+                    self.docs = data['docs']
+                    self.renders = data['renders']
+            except (json.JSONDecodeError, OSError, KeyError) as e:
+                log_action(f"Ignoring unreadable metadata cache {self.cache_path}: {e}")
+
+    def get(self, path):
+        """Metadata for a doc, or None if it does not exist
+
+        Only a stat is needed when size and mtime are unchanged; the doc is
+        reread when they move, and reparsed only if its hash changed too.
+        """
+        key = str(path)
+        try:
+            stat = os.stat(key)
+        except OSError:
+            if self.docs.pop(key, None) is not None:
+                self._dirty = True
+            return None
+
+        cached = self.docs.get(key)
+        if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+            return cached
+
+        with open(key, 'rb') as f:
+            data = f.read()
+        self.reads += 1
+        content_hash = hashlib.sha256(data).hexdigest()
+
+        if cached and cached['hash'] == content_hash:
+            entry = {**cached, 'mtime_ns': stat.st_mtime_ns}
+        else:
+            entry = {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'hash': content_hash,
+                **extract_metadata(data.decode('utf-8', errors='replace')),
+            }
+
+        self.docs[key] = entry
+        self._dirty = True
+        return entry
+
+    @staticmethod
+    def fingerprint(value):
+        """Stable hash of JSON-serialisable render inputs"""
+        return hashlib.sha256(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def is_current(self, output_path, fingerprint):
+        """Whether an output was rendered from these inputs and is untouched since"""
+        render = self.renders.get(str(output_path))
+        if not render or render['fingerprint'] != fingerprint:
+            return False
+        output = self.get(output_path)
+        return output is not None and output['hash'] == render['output_hash']
+
+    def record_render(self, output_path, fingerprint):
+        """Remember the inputs an output file was rendered from"""
+        output = self.get(output_path)
+        self.renders[str(output_path)] = {
+            'fingerprint': fingerprint,
+            'output_hash': output['hash'] if output else None,
+        }
+        self._dirty = True
+
+    def save(self):
+        """Persist the cache if anything changed"""
+        if not self._dirty:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': CACHE_VERSION, 'docs': self.docs, 'renders': self.renders}, f)
+        os.replace(tmp_path, self.cache_path)
+        self._dirty = False
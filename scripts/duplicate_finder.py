@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Byte-identical duplicate file finder for the cleanup analyzer
+Narrows candidates in stages: same size, then a hash of the first and last 64 KB,
+then a full hash of the files that still collide
+
+Usage:
+    python3 duplicate_finder.py [directory]
+"""
+import hashlib
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.logger import log_action
+from scripts.fs_scanner import ScanEntry, scan_tree
+
+# Bytes hashed from each end of a file in the partial-hash stage
+PARTIAL_BYTES = 64 * 1024
+
+# Read size for full hashes
+CHUNK_SIZE = 1024 * 1024
+
+# Files hashed concurrently; hashlib releases the GIL on large buffers
+HASH_WORKERS = 8
+
+# Directory names that mark a file as a copy rather than the original
+BACKUP_DIR_HINTS = ('backup', 'archive')
+
+
+def partial_hash(path, size):
+    """Hash of the first and last PARTIAL_BYTES of a file
+
+    Files no larger than two blocks are hashed whole, so their partial
+    hash is already a full hash.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        if size <= 2 * PARTIAL_BYTES:
+            digest.update(f.read())
+        else:
+            digest.update(f.read(PARTIAL_BYTES))
+            f.seek(-PARTIAL_BYTES, os.SEEK_END)
+            digest.update(f.read(PARTIAL_BYTES))
+    return digest.hexdigest()
+
+
+def full_hash(path):
+    """Hash of a file's entire content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _hash_groups(groups, hash_function, pool):
+    """Split each group of entries by hash, keeping only groups that still collide"""
+    entries = [entry for group in groups for entry in group]
+
+    def safe_hash(entry):
+        try:
+            return hash_function(entry)
+        except OSError as e:
+            log_action(f"Error hashing {entry.path}: {e}")
+            return None
+
+    by_hash = defaultdict(list)
+    for entry, digest in zip(entries, pool.map(safe_hash, entries)):
+        if digest is not None:
+            by_hash[(entry.size, digest)].append(entry)
+    return {key: group for key, group in by_hash.items() if len(group) > 1}
+
+
+class SizeIndex:
+    """Candidate files grouped by size, holding only their relative paths
+
+    Most files have a size no other file shares and cost one string here;
+    a size seen again becomes a list. Nothing else is kept per file, so
+    the cleanup analyzer can collect candidates from huge trees; full
+    entries are rebuilt with a fresh stat only for sizes that collide.
+    """
+
+    def __init__(self, root):
+        self.root = str(root)
+        self._paths = {}
+        self.files = 0
+
+    def add(self, entry):
+        """Index a scanner entry; directories and empty files are ignored"""
+        if entry.is_dir or entry.size == 0:
+            return
+        self.files += 1
+        paths = self._paths.get(entry.size)
+        if paths is None:
+            self._paths[entry.size] = entry.rel_path
+        elif isinstance(paths, str):
+            self._paths[entry.size] = [paths, entry.rel_path]
+        else:
+            paths.append(entry.rel_path)
+
+    def collisions(self):
+        """Lists of current ScanEntry values for every size shared by several files"""
+        for paths in self._paths.values():
+            if isinstance(paths, str):
+                continue
+            entries = []
+            for rel_path in paths:
+                path = os.path.join(self.root, rel_path)
+                try:
+                    stat = os.stat(path, follow_symlinks=False)
+                except OSError:
+                    continue
+                entries.append(ScanEntry(path, rel_path, rel_path.rsplit('/', 1)[-1], False, stat.st_size,
+                                         stat.st_mtime_ns, stat.st_ino, stat.st_dev))
+            yield entries
+
+
+def _keep_priority(entry, protected=None):
+    """Sort key choosing which copy to keep: protected, outside backups, shallowest, then by name"""
+    parts = entry.rel_path.lower().split('/')
+    in_backup = any(hint in part for part in parts[:-1] for hint in BACKUP_DIR_HINTS)
+    unprotected = protected is not None and not protected(entry.rel_path)
+    return (unprotected, in_backup, len(parts), entry.rel_path)
+
+
+def find_duplicate_files(candidates, root=None, workers=HASH_WORKERS, hash_cache=None, protected=None):
+    """Group byte-identical files from a SizeIndex or a stream of scanner entries
+
+    A stream is indexed by size first, with root as the scan root (the
+    current directory if omitted). Returns a list of groups, largest
+    reclaimable first, each with the copy to keep, the redundant copies and
+    the bytes deleting them would reclaim. Empty files and extra hard links
+    to one inode are ignored. hash_cache may be a ScanCache whose stored
+    full hashes are reused and updated. protected(rel_path) marks copies
+    that are served or otherwise must stay; one of those is kept in
+    preference to the rest.
+    """
+    if not isinstance(candidates, SizeIndex):
+        index = SizeIndex(root if root is not None else os.curdir)
+        for entry in candidates:
+            index.add(entry)
+        candidates = index
+
+    # Stage 1: only files sharing a size can be identical. Sizes come from
+    # a fresh stat, as catalog entries can predate an in-place rewrite
+    by_size = defaultdict(list)
+    seen_inodes = set()
+    for group in candidates.collisions():
+        for entry in group:
+            inode = (entry.device, entry.inode)
+            if entry.size == 0 or inode in seen_inodes:
+                continue
+            seen_inodes.add(inode)
+            if hash_cache is not None:
+                hash_cache.refresh(entry)
+            by_size[entry.size].append(entry)
+    size_groups = [group for group in by_size.values() if len(group) > 1]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Stage 2: first and last 64 KB
+        partial_groups = _hash_groups(size_groups, lambda entry: partial_hash(entry.path, entry.size), pool)
+
+        # Stage 3: full hash, only for collisions the partial hash did not cover
+        duplicate_groups = [group for (size, _), group in partial_groups.items() if size <= 2 * PARTIAL_BYTES]
+        large_groups = [group for (size, _), group in partial_groups.items() if size > 2 * PARTIAL_BYTES]
+
+        cached = {}
+        if hash_cache is not None:
+            cached = {entry: hash_cache.cached_hash(entry) for group in large_groups for entry in group}
+        computed = {}
+
+        def cached_full_hash(entry):
+            digest = cached.get(entry)
+            if digest is None:
+                digest = computed[entry] = full_hash(entry.path)
+            return digest
+
+        duplicate_groups.extend(_hash_groups(large_groups, cached_full_hash, pool).values())
+
+    if hash_cache is not None and computed:
+        hash_cache.store_hashes(computed.items())
+
+    duplicates = []
+    for group in duplicate_groups:
+        group.sort(key=lambda entry: _keep_priority(entry, protected))
+        size = group[0].size
+        duplicates.append({
+            'size': size,
+            'keep': group[0].rel_path,
+            'duplicates': [entry.rel_path for entry in group[1:]],
+            'reclaimable_bytes': size * (len(group) - 1),
+        })
+
+    duplicates.sort(key=lambda group: (-group['reclaimable_bytes'], group['keep']))
+    log_action(f"Duplicate scan: {sum(len(g) for g in size_groups)} same-size files, "
+               f"{sum(len(g) for g in partial_groups.values())} after partial hash, "
+               f"{len(duplicates)} duplicate groups")
+    return duplicates
+
+
+def main():
+    """Command line entry point"""
+    root = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("/app/main/web_app")
+    duplicates = find_duplicate_files(scan_tree(root, skip_dirs={'node_modules', '.git'}), root)
+
+    print("\n" + "=" * 60)
+    print("Duplicate Files")
+    print("=" * 60)
+    for group in duplicates[:20]:
+        print(f"{group['keep']} ({group['size'] / 1024:.1f} KB)")
+        for path in group['duplicates']:
+            print(f"  = {path}")
+    print(f"\nDuplicate groups: {len(duplicates)}")
+    reclaimable = sum(group['reclaimable_bytes'] for group in duplicates)
+    print(f"Reclaimable: {reclaimable / (1024 * 1024):.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Execute a cleanup plan produced by analyze_directory_structure.py
+Deleted files are renamed into a quarantine area on the same filesystem, moves are
+renamed into place, every operation is journaled and a whole run can be undone
+
+Usage:
+    python3 execute_cleanup.py run [plan_path] [--dry-run]
+    python3 execute_cleanup.py undo [run_id]
+    python3 execute_cleanup.py purge
+    python3 execute_cleanup.py list
+"""
+import ctypes
+import errno
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.logger import log_action
+from scripts.analyze_directory_structure import is_critical_path
+
+WEB_APP_PATH = Path("/app/main/web_app")
+PLAN_PATH = WEB_APP_PATH / "logs" / "cleanup_plan.json"
+JOURNAL_DIR = WEB_APP_PATH / "logs" / "cleanup_journals"
+
+# Inside the web app so quarantining is a rename on the same filesystem
+QUARANTINE_DIR = WEB_APP_PATH / ".quarantine"
+
+# Quarantined runs older than this are purged
+RETENTION_DAYS = 7
+
+# Independent subtrees processed concurrently
+CLEANUP_WORKERS = 8
+
+# Run ids are the start time plus a random suffix, e.g. 20250716_211351-3f9a1c
+RUN_ID_FORMAT = "%Y%m%d_%H%M%S"
+
+# renameat2() flag that fails with EEXIST instead of replacing the destination
+RENAME_NOREPLACE = 1
+AT_FDCWD = -100
+
+
+def _load_renameat2():
+    """libc renameat2, or None where it is unavailable"""
+    try:
+        return ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError):
+        return None
+
+
+_renameat2 = _load_renameat2()
+
+
+class CleanupJournal:
+    """Append-only JSONL journal of one cleanup run
+
+    Each operation is written before it is performed, so undo can rely on
+    the journal even if a run is interrupted.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a', buffering=1, encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def write(self, record_type, **fields):
+        """Append one record"""
+        line = json.dumps({'type': record_type, 'time': datetime.now().isoformat(), **fields})
+        with self._lock:
+            self._file.write(line + '\n')
+
+    def close(self):
+        """Flush the journal to disk"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+
+def read_journal(path):
+    """All records of a journal file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def journal_path(run_id):
+    return JOURNAL_DIR / f"{run_id}.jsonl"
+
+
+def _is_critical(rel_path):
+    """Critical paths and anything inside a critical directory such as public/"""
+    return is_critical_path(rel_path)
+
+
+def _is_below(rel_path, directories):
+    """Whether any ancestor of rel_path is in directories"""
+    parts = rel_path.split('/')
+    return any('/'.join(parts[:depth]) in directories for depth in range(1, len(parts)))
+
+
+def plan_operations(plan):
+    """Turn a cleanup plan into (action, source, destination) tuples
+
+    Paths below a directory that is already being removed, critical paths
+    and paths escaping the web app are skipped.
+    """
+    recommendations = plan.get('cleanup_recommendations', {})
+    deletions = sorted({path.rstrip('/') for path in recommendations.get('files_to_delete', [])})
+
+    operations = []
+    quarantined = set()
+    for rel_path in deletions:
+        if _is_below(rel_path, quarantined):
+            continue
+        if _is_critical(rel_path) or '..' in Path(rel_path).parts or os.path.isabs(rel_path):
+            log_action(f"Skipping protected path: {rel_path}")
+            continue
+        operations.append(('quarantine', rel_path, rel_path))
+        quarantined.add(rel_path)
+
+    for move in plan.get('organization_plan', {}).get('move_operations', []):
+        source, destination = move['from'], move['to']
+        if source in quarantined or _is_below(source, quarantined):
+            continue
+        if _is_critical(source) or '..' in Path(source).parts or '..' in Path(destination).parts:
+            log_action(f"Skipping protected path: {source}")
+            continue
+        operations.append(('move', source, destination))
+
+    return operations
+
+
+def _missing_parents(path):
+    """Ancestors of path that do not exist yet, deepest first"""
+    missing = []
+    parent = path.parent
+    while not parent.exists():
+        missing.append(str(parent))
+        parent = parent.parent
+    return missing
+
+
+def _rename(source, destination):
+    """Rename without replacing an existing destination or falling back to a copy
+
+    Uses renameat2(RENAME_NOREPLACE) where the kernel and filesystem
+    support it, else a hard link and unlink, which also fail rather than
+    replace. Only directories without renameat2 rely on a check first.
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    if _renameat2 is not None:
+        if _renameat2(AT_FDCWD, os.fsencode(source), AT_FDCWD, os.fsencode(destination), RENAME_NOREPLACE) == 0:
+            return
+        error = ctypes.get_errno()
+        if error not in (errno.ENOSYS, errno.EINVAL):
+            raise OSError(error, os.strerror(error), str(destination))
+
+    if os.path.isdir(source) and not os.path.islink(source):
+        if os.path.lexists(destination):
+            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), str(destination))
+        os.rename(source, destination)
+        return
+    os.link(source, destination, follow_symlinks=False)
+    os.unlink(source)
+
+
+def _run_group(operations, run_dir, journal, dry_run):
+    """Perform the operations of one group in order"""
+    done = 0
+    errors = 0
+    for action, source, target in operations:
+        source_path = WEB_APP_PATH / source
+        if action == 'quarantine':
+            destination_path = run_dir / target
+        else:
+            destination_path = WEB_APP_PATH / target
+
+        if not os.path.lexists(source_path):
+            continue
+        if dry_run:
+            print(f"  {action}: {source} -> {destination_path}")
+            done += 1
+            continue
+
+        journal.write('op', action=action, src=str(source_path), dst=str(destination_path),
+                      created_dirs=_missing_parents(destination_path))
+        try:
+            _rename(source_path, destination_path)
+            done += 1
+        except OSError as e:
+            journal.write('error', action=action, src=str(source_path), error=str(e))
+            log_action(f"Error during {action} of {source}: {e}")
+            errors += 1
+    return done, errors
+
+
+def _group_by_subtree(operations):
+    """Group operations that touch the same top-level directories, keeping plan order
+
+    A move joins the group of its source's and its destination's top-level
+    directory, so moves into one directory, such as two README.md files
+    both bound for documentation/, never run concurrently.
+    """
+    parent = {}
+
+    def find(key):
+        parent.setdefault(key, key)
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    for action, source, target, *_ in operations:
+        keys = [source.split('/', 1)[0]]
+        if action == 'move':
+            keys.append(target.split('/', 1)[0])
+        for key in keys[1:]:
+            parent[find(key)] = find(keys[0])
+
+    groups = defaultdict(list)
+    for operation in operations:
+        groups[find(operation[1].split('/', 1)[0])].append(operation)
+    return list(groups.values())
+
+
+def execute_plan(plan_path=PLAN_PATH, dry_run=False, workers=CLEANUP_WORKERS):
+    """Execute a cleanup plan; returns the run id"""
+    with open(plan_path, 'r') as f:
+        plan = json.load(f)
+
+    operations = plan_operations(plan)
+    # Runs started within the same second still get their own journal and quarantine
+    run_id = f"{datetime.now().strftime(RUN_ID_FORMAT)}-{uuid.uuid4().hex[:6]}"
+    run_dir = QUARANTINE_DIR / run_id
+    log_action(f"Cleanup run {run_id}: {len(operations)} operations from {plan_path}")
+
+    journal = None
+    if not dry_run:
+        run_dir.mkdir(parents=True, exist_ok=True)
+        if os.stat(run_dir).st_dev != os.stat(WEB_APP_PATH).st_dev:
+            raise OSError(f"Quarantine {run_dir} is not on the same filesystem as {WEB_APP_PATH}")
+        journal = CleanupJournal(journal_path(run_id))
+        journal.write('run', run_id=run_id, plan=str(plan_path), quarantine=str(run_dir))
+
+    done = 0
+    errors = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_run_group, group, run_dir, journal, dry_run)
+            for group in _group_by_subtree(operations)
+        ]
+        for future in futures:
+            group_done, group_errors = future.result()
+            done += group_done
+            errors += group_errors
+
+    if journal is not None:
+        journal.write('summary', done=done, errors=errors)
+        journal.close()
+        start_background_purge()
+
+    print("\n" + "=" * 60)
+    print("Cleanup Summary" + (" (dry run)" if dry_run else ""))
+    print("=" * 60)
+    print(f"Operations planned: {len(operations)}")
+    print(f"Operations done: {done}")
+    print(f"Errors: {errors}")
+    if not dry_run:
+        print(f"Run id: {run_id}")
+        print(f"Journal: {journal_path(run_id)}")
+        print(f"Undo with: python3 execute_cleanup.py undo {run_id}")
+    log_action(f"Cleanup run {run_id} finished: {done} done, {errors} errors")
+    return run_id
+
+
+def _undo_group(records):
+    """Reverse the operations of one group, newest first"""
+    restored = 0
+    errors = 0
+    for record in reversed(records):
+        source, destination = Path(record['src']), Path(record['dst'])
+        if os.path.lexists(source) or not os.path.lexists(destination):
+            continue
+        try:
+            _rename(destination, source)
+            restored += 1
+        except OSError as e:
+            log_action(f"Error restoring {source}: {e}")
+            errors += 1
+    return restored, errors
+
+
+def undo_run(run_id=None, workers=CLEANUP_WORKERS):
+    """Move everything from a run back where it was; defaults to the latest run"""
+    if run_id is None:
+        journals = sorted(JOURNAL_DIR.glob('*.jsonl'))
+        if not journals:
+            print("No cleanup runs to undo")
+            return
+        run_id = journals[-1].stem
+
+    records = read_journal(journal_path(run_id))
+    if any(record['type'] == 'purge' for record in records):
+        print(f"Run {run_id} was purged and cannot be undone")
+        return
+
+    operations = [
+        (record['action'], os.path.relpath(record['src'], WEB_APP_PATH),
+         os.path.relpath(record['dst'], WEB_APP_PATH), record)
+        for record in records if record['type'] == 'op'
+    ]
+    groups = [[operation[3] for operation in group] for group in _group_by_subtree(operations)]
+
+    restored = 0
+    errors = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for group_restored, group_errors in pool.map(_undo_group, groups):
+            restored += group_restored
+            errors += group_errors
+
+    journal = CleanupJournal(journal_path(run_id))
+    journal.write('undo', restored=restored, errors=errors)
+    journal.close()
+
+    # Drop directories the run created, now empty, deepest first
+    created_dirs = {QUARANTINE_DIR / run_id, QUARANTINE_DIR}
+    for record in records:
+        if record['type'] == 'op':
+            created_dirs.update(Path(directory) for directory in record.get('created_dirs', []))
+    for directory in sorted(created_dirs, key=lambda path: len(path.parts), reverse=True):
+        try:
+            directory.rmdir()
+        except OSError:
+            pass
+
+    print(f"Restored {restored} paths from run {run_id} ({errors} errors)")
+    log_action(f"Undid cleanup run {run_id}: {restored} restored, {errors} errors")
+
+
+def purge_quarantine(retention_days=RETENTION_DAYS, workers=CLEANUP_WORKERS):
+    """Permanently delete quarantined runs older than the retention window"""
+    if not QUARANTINE_DIR.exists():
+        return []
+
+    cutoff = datetime.now() - timedelta(days=retention_days)
+    expired = []
+    for run_dir in QUARANTINE_DIR.iterdir():
+        try:
+            created = datetime.strptime(run_dir.name.split('-', 1)[0], RUN_ID_FORMAT)
+        except ValueError:
+            continue
+        if created < cutoff:
+            expired.append(run_dir)
+
+    def purge(run_dir):
+        shutil.rmtree(run_dir, ignore_errors=True)
+        if journal_path(run_dir.name).exists():
+            journal = CleanupJournal(journal_path(run_dir.name))
+            journal.write('purge', quarantine=str(run_dir))
+            journal.close()
+        log_action(f"Purged quarantined cleanup run {run_dir.name}")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(purge, expired))
+    return [run_dir.name for run_dir in expired]
+
+
+def start_background_purge():
+    """Purge expired quarantine runs in a detached process"""
+    subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), 'purge'],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def list_runs():
+    """Print every journaled run with its state"""
+    for path in sorted(JOURNAL_DIR.glob('*.jsonl')):
+        records = read_journal(path)
+        operations = sum(1 for record in records if record['type'] == 'op')
+        state = 'active'
+        if any(record['type'] == 'purge' for record in records):
+            state = 'purged'
+        elif any(record['type'] == 'undo' for record in records):
+            state = 'undone'
+        print(f"{path.stem}: {operations} operations, {state}")
+
+
+def main():
+    """Command line entry point"""
+    args = sys.argv[1:]
+    command = args[0] if args else None
+
+    if command == 'run':
+        paths = [arg for arg in args[1:] if arg != '--dry-run']
+        execute_plan(Path(paths[0]) if paths else PLAN_PATH, dry_run='--dry-run' in args)
+    elif command == 'undo':
+        undo_run(args[1] if len(args) > 1 else None)
+    elif command == 'purge':
+        purged = purge_quarantine()
+        print(f"Purged {len(purged)} quarantined runs")
+    elif command == 'list':
+        list_runs()
+    else:
+        print(__doc__)
+
+
+if __name__ == "__main__":
+    main()
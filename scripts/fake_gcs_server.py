@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""
+In-memory stand-in for the Google Cloud Storage JSON API
+Implements the subset GoogleCloudHelper uses (buckets, listing, media, multipart and
+resumable uploads, compose, ranged downloads, metadata, delete and ?fields= partial
+responses) so storage code can be exercised and benchmarked offline
+
+Usage:
+    python3 fake_gcs_server.py [port]
+    STORAGE_EMULATOR_HOST=http://127.0.0.1:<port> python3 your_script.py
+"""
+import base64
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.logger import log_action
+
+DEFAULT_PORT = 4443
+
+# Objects per listing page when the client does not ask for fewer
+MAX_LIST_RESULTS = 1000
+
+# Same limit as GCS
+MAX_COMPOSE_SOURCES = 32
+
+RANGE_PATTERN = re.compile(r'bytes=(\d*)-(\d*)$')
+CONTENT_RANGE_PATTERN = re.compile(r'bytes (?:(\d+)-(\d+)|\*)/(\d+|\*)$')
+
+
+def crc32c_digest(data):
+    """Base64 CRC32C as GCS reports it, or None without google-crc32c"""
+    try:
+        import google_crc32c
+    except ImportError:
+        return None
+    return base64.b64encode(google_crc32c.Checksum(data).digest()).decode('ascii')
+
+
+class StoredObject:
+    """One object generation with its data and metadata"""
+
+    def __init__(self, bucket, name, data, content_type=None, metadata=None, composite=False):
+        self.bucket = bucket
+        self.name = name
+        self.data = data
+        self.content_type = content_type or 'application/octet-stream'
+        self.metadata = metadata
+        self.generation = time.time_ns()
+        self.updated = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+        self.crc32c = crc32c_digest(data)
+        # Like GCS, composite objects have no MD5
+        self.md5 = None if composite else base64.b64encode(hashlib.md5(data).digest()).decode('ascii')
+        self.component_count = None
+
+    def resource(self, base_url):
+        """JSON API representation"""
+        quoted = quote(self.name, safe='')
+        resource = {
+            'kind': 'storage#object',
+            'id': f"{self.bucket}/{self.name}/{self.generation}",
+            'name': self.name,
+            'bucket': self.bucket,
+            'generation': str(self.generation),
+            'metageneration': '1',
+            'contentType': self.content_type,
+            'size': str(len(self.data)),
+            'updated': self.updated,
+            'timeCreated': self.updated,
+            'storageClass': 'STANDARD',
+            'selfLink': f"{base_url}/storage/v1/b/{self.bucket}/o/{quoted}",
+            'mediaLink': f"{base_url}/download/storage/v1/b/{self.bucket}/o/{quoted}"
+                         f"?generation={self.generation}&alt=media",
+        }
+        if self.crc32c:
+            resource['crc32c'] = self.crc32c
+        if self.md5:
+            resource['md5Hash'] = self.md5
+        if self.metadata:
+            resource['metadata'] = self.metadata
+        if self.component_count:
+            resource['componentCount'] = self.component_count
+        return resource
+
+
+class ObjectStore:
+    """Buckets of objects in memory, safe for concurrent requests"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.uploads = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, name, create=True):
+        with self.lock:
+            if name not in self.buckets and create:
+                self.buckets[name] = {}
+            return self.buckets.get(name)
+
+    def put(self, stored):
+        objects = self.bucket(stored.bucket)
+        with self.lock:
+            objects[stored.name] = stored
+        return stored
+
+    def get(self, bucket, name, generation=None):
+        objects = self.bucket(bucket, create=False) or {}
+        with self.lock:
+            stored = objects.get(name)
+        if stored is None or (generation and str(stored.generation) != generation):
+            return None
+        return stored
+
+    def delete(self, bucket, name):
+        objects = self.bucket(bucket, create=False) or {}
+        with self.lock:
+            return objects.pop(name, None) is not None
+
+    def list(self, bucket, prefix='', delimiter=None, page_token=None, max_results=MAX_LIST_RESULTS):
+        """(objects, prefixes, next page token) for one listing page"""
+        objects = self.bucket(bucket, create=False) or {}
+        with self.lock:
+            names = sorted(name for name in objects if name.startswith(prefix))
+        if page_token:
+            names = [name for name in names if name > page_token]
+
+        items = []
+        prefixes = set()
+        next_token = None
+        for name in names:
+            if delimiter:
+                cut = name.find(delimiter, len(prefix))
+                if cut != -1:
+                    prefixes.add(name[:cut + len(delimiter)])
+                    continue
+            if len(items) == max_results:
+                next_token = items[-1].name
+                break
+            with self.lock:
+                stored = objects.get(name)
+            if stored is not None:
+                items.append(stored)
+        return items, sorted(prefixes), next_token
+
+
+def _parse_multipart(body, content_type):
+    """Metadata and data of a multipart/related upload body"""
+    boundary = re.search(r'boundary="?([^";]+)"?', content_type).group(1).encode()
+    parts = body.split(b'--' + boundary)
+    sections = []
+    for part in parts[1:]:
+        if part.startswith(b'--'):
+            break
+        headers, _, payload = part.lstrip(b'\r\n').partition(b'\r\n\r\n')
+        if payload.endswith(b'\r\n'):
+            payload = payload[:-2]
+        content = re.search(rb'content-type:\s*([^\r\n]+)', headers, re.IGNORECASE)
+        sections.append((content.group(1).decode() if content else None, payload))
+    metadata = json.loads(sections[0][1] or b'{}')
+    data_type, data = sections[1]
+    return metadata, data, data_type
+
+
+def _parse_fields(spec):
+    """{field: nested spec or None} for a fields selector such as 'items(name,size),nextPageToken'"""
+    selected = {}
+    depth = 0
+    start = 0
+    for index, char in enumerate(spec + ','):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            field = spec[start:index].strip()
+            start = index + 1
+            if not field:
+                continue
+            name, _, nested = field.partition('(')
+            selected[name.strip()] = _parse_fields(nested[:-1]) if nested else None
+    return selected
+
+
+def select_fields(resource, selected):
+    """resource reduced to the parsed fields selector, applied to each element of lists"""
+    if isinstance(resource, list):
+        return [select_fields(item, selected) for item in resource]
+    projected = {}
+    for name, nested in selected.items():
+        if name in resource:
+            projected[name] = resource[name] if nested is None else select_fields(resource[name], nested)
+    return projected
+
+
+class FakeGCSHandler(BaseHTTPRequestHandler):
+    """Routes JSON API, upload and download requests to the server's ObjectStore"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def store(self):
+        return self.server.store
+
+    @property
+    def base_url(self):
+        return f"http://{self.headers.get('Host')}"
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _send(self, status, body=b'', content_type='application/json', headers=None):
+        if isinstance(body, dict) and status < 400:
+            # Partial responses, as requested with ?fields=
+            spec = self._route()[1].get('fields')
+            if spec:
+                body = select_fields(body, _parse_fields(spec))
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._send(status, {'error': {'code': status, 'message': message}})
+
+    def _route(self):
+        """(path segments, query) with object names decoded"""
+        url = urlsplit(self.path)
+        segments = [unquote(segment) for segment in url.path.strip('/').split('/')]
+        query = {key: values[-1] for key, values in parse_qs(url.query, keep_blank_values=True).items()}
+        return segments, query
+
+    def do_GET(self):
+        segments, query = self._route()
+        if segments[:3] == ['storage', 'v1', 'b'] and len(segments) == 3:
+            self._send(200, {'kind': 'storage#buckets',
+                             'items': [{'name': name} for name in sorted(self.store.buckets)]})
+        elif segments[:3] == ['storage', 'v1', 'b'] and len(segments) == 4:
+            if self.store.bucket(segments[3], create=False) is None:
+                return self._error(404, f"Bucket {segments[3]} not found")
+            self._send(200, {'kind': 'storage#bucket', 'name': segments[3]})
+        elif segments[:3] == ['storage', 'v1', 'b'] and len(segments) == 5 and segments[4] == 'o':
+            self._list(segments[3], query)
+        elif segments[:3] == ['storage', 'v1', 'b'] and len(segments) >= 6 and segments[4] == 'o':
+            stored = self.store.get(segments[3], '/'.join(segments[5:]), query.get('generation'))
+            if stored is None:
+                return self._error(404, 'No such object')
+            if query.get('alt') == 'media':
+                return self._download(stored)
+            self._send(200, stored.resource(self.base_url))
+        elif segments[:4] == ['download', 'storage', 'v1', 'b'] and len(segments) >= 7:
+            stored = self.store.get(segments[4], '/'.join(segments[6:]), query.get('generation'))
+            if stored is None:
+                return self._error(404, 'No such object')
+            self._download(stored)
+        else:
+            self._error(404, f"Unsupported path {self.path}")
+
+    def _list(self, bucket, query):
+        max_results = min(int(query.get('maxResults') or MAX_LIST_RESULTS), MAX_LIST_RESULTS)
+        items, prefixes, next_token = self.store.list(
+            bucket, query.get('prefix', ''), query.get('delimiter'), query.get('pageToken'), max_results
+        )
+        response = {'kind': 'storage#objects', 'items': [item.resource(self.base_url) for item in items]}
+        if prefixes:
+            response['prefixes'] = prefixes
+        if next_token:
+            response['nextPageToken'] = next_token
+        self._send(200, response)
+
+    def _download(self, stored):
+        data = stored.data
+        hashes = ','.join(f"{name}={value}" for name, value in
+                          (('crc32c', stored.crc32c), ('md5', stored.md5)) if value)
+        headers = {'x-goog-generation': str(stored.generation), 'x-goog-stored-content-length': str(len(data))}
+        if hashes:
+            headers['x-goog-hash'] = hashes
+
+        requested = self.headers.get('Range')
+        match = RANGE_PATTERN.match(requested or '')
+        if not match:
+            return self._send(200, data, stored.content_type, headers)
+
+        first, last = match.groups()
+        if first == '':
+            start, end = max(0, len(data) - int(last)), len(data) - 1
+        else:
+            start, end = int(first), min(int(last) if last else len(data) - 1, len(data) - 1)
+        if start >= len(data) or start > end:
+            return self._send(416, b'', headers={'Content-Range': f"bytes */{len(data)}"})
+        headers['Content-Range'] = f"bytes {start}-{end}/{len(data)}"
+        self._send(206, data[start:end + 1], stored.content_type, headers)
+
+    def do_POST(self):
+        segments, query = self._route()
+        body = self._body()
+        if segments[:3] == ['storage', 'v1', 'b'] and len(segments) == 3:
+            name = json.loads(body or b'{}').get('name')
+            if not name:
+                return self._error(400, 'Bucket name required')
+            if self.store.bucket(name, create=False) is not None:
+                return self._error(409, f"Bucket {name} already exists")
+            self.store.bucket(name)
+            self._send(200, {'kind': 'storage#bucket', 'name': name})
+        elif segments[:4] == ['upload', 'storage', 'v1', 'b'] and len(segments) == 6:
+            self._upload(segments[4], query, body)
+        elif segments[:3] == ['storage', 'v1', 'b'] and len(segments) >= 7 and segments[-1] == 'compose':
+            self._compose(segments[3], '/'.join(segments[5:-1]), json.loads(body or b'{}'))
+        else:
+            self._error(404, f"Unsupported path {self.path}")
+
+    def _upload(self, bucket, query, body):
+        upload_type = query.get('uploadType')
+        content_type = self.headers.get('Content-Type', '')
+        if upload_type == 'media':
+            stored = self.store.put(StoredObject(bucket, query['name'], body, content_type))
+            self._send(200, stored.resource(self.base_url))
+        elif upload_type == 'multipart':
+            metadata, data, data_type = _parse_multipart(body, content_type)
+            name = metadata.get('name') or query.get('name')
+            stored = self.store.put(StoredObject(bucket, name, data, metadata.get('contentType') or data_type,
+                                                 metadata.get('metadata')))
+            self._send(200, stored.resource(self.base_url))
+        elif upload_type == 'resumable':
+            metadata = json.loads(body or b'{}')
+            upload_id = uuid.uuid4().hex
+            with self.store.lock:
+                self.store.uploads[upload_id] = {
+                    'bucket': bucket,
+                    'name': metadata.get('name') or query.get('name'),
+                    'content_type': metadata.get('contentType') or self.headers.get('X-Upload-Content-Type'),
+                    'metadata': metadata.get('metadata'),
+                    'data': bytearray(),
+                }
+            location = f"{self.base_url}/upload/storage/v1/b/{quote(bucket, safe='')}/o" \
+                       f"?uploadType=resumable&upload_id={upload_id}"
+            self._send(200, b'', headers={'Location': location})
+        else:
+            self._error(400, f"Unsupported uploadType {upload_type}")
+
+    def do_PUT(self):
+        segments, query = self._route()
+        body = self._body()
+        with self.store.lock:
+            upload = self.store.uploads.get(query.get('upload_id'))
+        if upload is None:
+            return self._error(404, 'No such upload')
+
+        match = CONTENT_RANGE_PATTERN.match(self.headers.get('Content-Range', f"bytes */{len(body)}"))
+        if not match:
+            return self._error(400, 'Bad Content-Range')
+        first, _, total = match.groups()
+        if first is not None and int(first) != len(upload['data']):
+            return self._error(400, f"Expected offset {len(upload['data'])}, got {first}")
+        upload['data'].extend(body)
+
+        if total == '*' or len(upload['data']) < int(total):
+            headers = {'Range': f"bytes=0-{len(upload['data']) - 1}"} if upload['data'] else {}
+            return self._send(308, b'', headers=headers)
+
+        with self.store.lock:
+            self.store.uploads.pop(query['upload_id'], None)
+        stored = self.store.put(StoredObject(upload['bucket'], upload['name'], bytes(upload['data']),
+                                             upload['content_type'], upload['metadata']))
+        self._send(200, stored.resource(self.base_url))
+
+    def _compose(self, bucket, name, request):
+        sources = request.get('sourceObjects', [])
+        if not sources or len(sources) > MAX_COMPOSE_SOURCES:
+            return self._error(400, f"Compose needs 1 to {MAX_COMPOSE_SOURCES} source objects")
+        parts = []
+        for source in sources:
+            stored = self.store.get(bucket, source['name'], str(source.get('generation') or '') or None)
+            if stored is None:
+                return self._error(404, f"Source {source['name']} not found")
+            parts.append(stored)
+        destination = request.get('destination') or {}
+        stored = StoredObject(bucket, name, b''.join(part.data for part in parts),
+                              destination.get('contentType') or parts[0].content_type,
+                              destination.get('metadata'), composite=True)
+        stored.component_count = sum(part.component_count or 1 for part in parts)
+        self._send(200, self.store.put(stored).resource(self.base_url))
+
+    def do_DELETE(self):
+        segments, _ = self._route()
+        if segments[:3] == ['storage', 'v1', 'b'] and len(segments) >= 6 and segments[4] == 'o':
+            if not self.store.delete(segments[3], '/'.join(segments[5:])):
+                return self._error(404, 'No such object')
+            return self._send(204)
+        self._error(404, f"Unsupported path {self.path}")
+
+
+class FakeGCSServer:
+    """Threaded fake storage server; use as a context manager in tests and benchmarks"""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.httpd = ThreadingHTTPServer((host, port), FakeGCSHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.store = ObjectStore()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    """Command line entry point"""
+    if len(sys.argv) > 2 or (len(sys.argv) == 2 and not sys.argv[1].isdigit()):
+        print(__doc__)
+        return
+    port = int(sys.argv[1]) if len(sys.argv) == 2 else DEFAULT_PORT
+    server = FakeGCSServer(port=port)
+    log_action(f"Fake GCS server listening on {server.url}")
+    print(f"Fake GCS server listening on {server.url}")
+    print(f"export STORAGE_EMULATOR_HOST={server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
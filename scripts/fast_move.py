@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Fast file and directory moves
+A move within one filesystem is a single rename; across filesystems files are copied
+in the kernel with copy_file_range or sendfile on a thread pool, checked against the
+source sizes, and only then is the source removed
+
+Usage:
+    python3 fast_move.py <source> <destination>
+"""
+import errno
+import os
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.logger import log_action
+from scripts.fs_scanner import scan_tree
+
+# Files copied concurrently across filesystems
+MOVE_WORKERS = 8
+
+# Bytes requested per copy_file_range/sendfile call
+COPY_CHUNK = 64 * 1024 * 1024
+
+# Errors meaning a zero-copy syscall cannot be used for this pair of files
+UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF}
+
+
+class _CopyMethods:
+    """Which copy path each file took, shared across worker threads"""
+
+    def __init__(self):
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, method):
+        with self._lock:
+            self.counts[method] = self.counts.get(method, 0) + 1
+
+
+def _copy_range(source_fd, destination_fd, size):
+    copied = 0
+    while copied < size:
+        sent = os.copy_file_range(source_fd, destination_fd, min(COPY_CHUNK, size - copied))
+        if sent == 0:
+            break
+        copied += sent
+    return copied
+
+
+def _sendfile(source_fd, destination_fd, size):
+    copied = 0
+    while copied < size:
+        sent = os.sendfile(destination_fd, source_fd, copied, min(COPY_CHUNK, size - copied))
+        if sent == 0:
+            break
+        copied += sent
+    return copied
+
+
+def copy_file(source, destination, methods=None):
+    """Copy one file's data in the kernel when possible, then its metadata
+
+    Tries copy_file_range, then sendfile, then a userspace copy; each
+    fallback starts over from an empty destination.
+    """
+    size = os.stat(source).st_size
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        method = None
+        for name, syscall in (('copy_file_range', getattr(os, 'copy_file_range', None)),
+                              ('sendfile', getattr(os, 'sendfile', None))):
+            if syscall is None:
+                continue
+            try:
+                (_copy_range if name == 'copy_file_range' else _sendfile)(src.fileno(), dst.fileno(), size)
+                method = name
+                break
+            except OSError as e:
+                if e.errno not in UNSUPPORTED_ERRNOS:
+                    raise
+                src.seek(0)
+                dst.seek(0)
+                dst.truncate()
+        if method is None:
+            shutil.copyfileobj(src, dst, COPY_CHUNK)
+            method = 'userspace'
+    shutil.copystat(source, destination, follow_symlinks=False)
+    if methods is not None:
+        methods.record(method)
+    return size
+
+
+def _copy_tree(source, destination, workers, methods):
+    """Copy a directory tree; returns [(source file, destination file, size)]"""
+    os.makedirs(destination)
+    directories = []
+    files = []
+    for entry in scan_tree(source):
+        target = os.path.join(destination, entry.rel_path)
+        if os.path.islink(entry.path):
+            os.symlink(os.readlink(entry.path), target)
+        elif entry.is_dir:
+            # Parents are always scanned before their children
+            os.mkdir(target)
+            directories.append((entry.path, target))
+        else:
+            files.append((entry.path, target, entry.size))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda item: copy_file(item[0], item[1], methods), files))
+
+    # Directory times last, after their contents stopped changing
+    for source_dir, target_dir in reversed(directories):
+        shutil.copystat(source_dir, target_dir)
+    shutil.copystat(source, destination)
+    return files
+
+
+def _verify(files):
+    """Sizes of every copied file must match the source"""
+    mismatched = [
+        destination for _, destination, size in files
+        if os.stat(destination, follow_symlinks=False).st_size != size
+    ]
+    if mismatched:
+        raise OSError(f"{len(mismatched)} copied files differ in size, e.g. {mismatched[0]}")
+
+
+def fast_move(source, destination, workers=MOVE_WORKERS):
+    """Move a file or directory to an exact destination path
+
+    Returns a summary with the method used, the file count and bytes.
+    The destination must not exist. On a failed cross-device copy the
+    partial destination is removed and the source is left untouched.
+    """
+    source = os.path.abspath(source)
+    destination = os.path.abspath(destination)
+    if os.path.lexists(destination):
+        raise FileExistsError(f"{destination} already exists")
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+
+    start = time.perf_counter()
+    try:
+        os.rename(source, destination)
+        log_action(f"Renamed {source} to {destination}")
+        return {'method': 'rename', 'files': None, 'bytes': None, 'seconds': time.perf_counter() - start}
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+
+    methods = _CopyMethods()
+    is_dir = os.path.isdir(source) and not os.path.islink(source)
+    try:
+        if is_dir:
+            files = _copy_tree(source, destination, workers, methods)
+        elif os.path.islink(source):
+            os.symlink(os.readlink(source), destination)
+            files = []
+        else:
+            files = [(source, destination, copy_file(source, destination, methods))]
+        _verify(files)
+    except BaseException:
+        if is_dir:
+            shutil.rmtree(destination, ignore_errors=True)
+        elif os.path.lexists(destination):
+            os.unlink(destination)
+        raise
+
+    if is_dir:
+        shutil.rmtree(source)
+    else:
+        os.unlink(source)
+
+    summary = {
+        'method': 'copy',
+        'copy_methods': methods.counts,
+        'files': len(files),
+        'bytes': sum(size for _, _, size in files),
+        'seconds': time.perf_counter() - start,
+    }
+    log_action(f"Copied {summary['files']} files ({summary['bytes'] / (1024*1024):.1f} MB) "
+               f"from {source} to {destination} in {summary['seconds']:.1f} s {methods.counts}")
+    return summary
+
+
+def main():
+    """Command line entry point"""
+    if len(sys.argv) != 3:
+        print(__doc__)
+        return
+    summary = fast_move(sys.argv[1], sys.argv[2])
+    print(f"Moved {sys.argv[1]} -> {sys.argv[2]} ({summary['method']}, {summary['seconds']:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
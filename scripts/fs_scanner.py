@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Fast parallel filesystem scanner shared by the cleanup analyzers
+Walks a tree with os.scandir on a thread pool and yields one stream of entries
+"""
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.logger import log_action
+
+# Directories listed concurrently
+SCAN_WORKERS = 8
+
+# One entry per file or directory below the scan root.
+# rel_path uses '/' separators and is relative to the root.
+ScanEntry = namedtuple('ScanEntry', ['path', 'rel_path', 'name', 'is_dir', 'size', 'mtime_ns', 'inode', 'device'])
+
+
+def _list_directory(path, rel_path, skip_dirs):
+    """List one directory; returns (entries, subdirectories to descend into)"""
+    entries = []
+    subdirs = []
+    try:
+        with os.scandir(path) as iterator:
+            for dir_entry in iterator:
+                try:
+                    is_dir = dir_entry.is_dir(follow_symlinks=False)
+                    # DirEntry caches its stat result, so each entry costs at most one syscall
+                    stat = dir_entry.stat(follow_symlinks=False)
+                except OSError as e:
+                    log_action(f"Error processing {dir_entry.path}: {e}")
+                    continue
+
+                entry_rel_path = f"{rel_path}/{dir_entry.name}" if rel_path else dir_entry.name
+                entries.append(ScanEntry(
+                    dir_entry.path, entry_rel_path, dir_entry.name, is_dir,
+                    0 if is_dir else stat.st_size, stat.st_mtime_ns, stat.st_ino, stat.st_dev
+                ))
+                if is_dir and dir_entry.name not in skip_dirs:
+                    subdirs.append((dir_entry.path, entry_rel_path))
+    except OSError as e:
+        log_action(f"Error scanning {path}: {e}")
+    return entries, subdirs
+
+
+def scan_tree(root, skip_dirs=(), workers=SCAN_WORKERS):
+    """Yield a ScanEntry for every file and directory below root
+
+    Directories are listed concurrently on a thread pool; entries are
+    yielded as each directory finishes, so order is not deterministic.
+    Directories named in skip_dirs are yielded but not descended into.
+    Symlinks are reported but never followed.
+    """
+    skip_dirs = frozenset(skip_dirs)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(_list_directory, str(root), '', skip_dirs)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                entries, subdirs = future.result()
+                for path, rel_path in subdirs:
+                    pending.add(pool.submit(_list_directory, path, rel_path, skip_dirs))
+                yield from entries
+
+
+def top_level_name(entry):
+    """First component of an entry's path relative to the scan root"""
+    return entry.rel_path.split('/', 1)[0]
+
+
+def parent_parts(entry):
+    """Directory components leading to an entry, relative to the scan root"""
+    return entry.rel_path.split('/')[:-1]
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Precompiled glob matcher for the cleanup analyzer
+Compiles every pattern once and returns all matching categories for a name in one lookup
+
+Usage:
+    python3 glob_matcher.py --benchmark [file_count]
+"""
+import fnmatch
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Characters that make a pattern a wildcard rather than a literal name
+WILDCARD_CHARS = set('*?[')
+
+
+class GlobMatcher:
+    """Match names against many categorised glob patterns at once
+
+    patterns maps category -> iterable of glob patterns. A pattern ending in
+    '/' only matches directories. Literal patterns are resolved with a dict
+    lookup. Wildcard patterns are compiled into a single regex: each
+    category's patterns form one alternation inside an optional lookahead
+    with its own marker group, so one regex match reports every category
+    that applies.
+    """
+
+    def __init__(self, patterns):
+        # (name, is_dir) -> categories
+        self._literals = {}
+        # marker group index -> (category, dir only)
+        self._wildcards = []
+        self._order = {category: index for index, category in enumerate(patterns)}
+        parts = []
+
+        for category, category_patterns in patterns.items():
+            # dir only -> translated wildcard patterns
+            alternations = {False: [], True: []}
+            for pattern in category_patterns:
+                dir_only = pattern.endswith('/')
+                glob = pattern.rstrip('/')
+                if WILDCARD_CHARS.isdisjoint(glob):
+                    for is_dir in ((True,) if dir_only else (False, True)):
+                        self._literals.setdefault((glob, is_dir), []).append(category)
+                else:
+                    alternations[dir_only].append(fnmatch.translate(glob))
+
+            for dir_only, translated in alternations.items():
+                if translated:
+                    self._wildcards.append((category, dir_only))
+                    parts.append(f"(?:(?={'|'.join(translated)})())?")
+
+        self._regex = re.compile(''.join(parts)) if parts else None
+
+    def match(self, name, is_dir=False):
+        """Every category whose patterns match the name, in definition order"""
+        categories = list(self._literals.get((name, is_dir), ()))
+
+        if self._regex is not None:
+            groups = self._regex.match(name).groups()
+            for group, (category, dir_only) in zip(groups, self._wildcards):
+                if group is not None and (is_dir or not dir_only) and category not in categories:
+                    categories.append(category)
+
+        if len(categories) > 1:
+            categories.sort(key=self._order.__getitem__)
+        return categories
+
+
+def _naive_match(patterns, name, is_dir=False):
+    """Reference implementation: test every pattern with fnmatch"""
+    return [
+        category
+        for category, category_patterns in patterns.items()
+        if any(fnmatch.fnmatchcase(name, pattern.rstrip('/')) for pattern in category_patterns
+               if is_dir or not pattern.endswith('/'))
+    ]
+
+
+def _synthetic_names(count, seed=42):
+    """Synthetic file names resembling a web app checkout"""
+    rng = random.Random(seed)
+    stems = ['index', 'deploy', 'test_api', 'debug_feed', 'README', 'config', 'video_player',
+             'migrate_supabase_to_firebase', 'page', 'layout', 'utils', 'schema']
+    suffixes = ['', '_backup_20250716', '_supabase_backup_20250716', '_v2', '.config', '_test']
+    extensions = ['.js', '.ts', '.tsx', '.py', '.md', '.json', '.sh', '.txt', '.tmp', '']
+    return [
+        rng.choice(stems) + rng.choice(suffixes) + rng.choice(extensions)
+        for _ in range(count)
+    ]
+
+
+def _synthetic_tree(root, file_count, files_per_dir=1000):
+    """Create file_count empty files with synthetic names below root"""
+    names = _synthetic_names(file_count)
+    for start in range(0, file_count, files_per_dir):
+        directory = Path(root) / f"area{start // (files_per_dir * 100):03d}" / f"dir{start // files_per_dir:05d}"
+        seen = {}
+        for name in names[start:start + files_per_dir]:
+            # Repeated synthetic names go into copyN/ subdirectories to stay distinct
+            copy = seen.get(name, 0)
+            seen[name] = copy + 1
+            target = directory / f"copy{copy}" if copy else directory
+            target.mkdir(parents=True, exist_ok=True)
+            (target / name).touch()
+
+
+def benchmark(file_count=1_000_000):
+    """Compare the compiled matcher with per-pattern fnmatch over a synthetic tree
+
+    file_count empty files are created in a temporary directory and
+    scanned with fs_scanner, so the names and directory entries matched are
+    those the cleanup analyzer would see.
+    """
+    from scripts.analyze_directory_structure import CLEANUP_PATTERNS
+    from scripts.fs_scanner import scan_tree
+
+    patterns = CLEANUP_PATTERNS
+    with tempfile.TemporaryDirectory() as root:
+        start = time.perf_counter()
+        _synthetic_tree(root, file_count)
+        create_time = time.perf_counter() - start
+        entries = [(entry.name, entry.is_dir) for entry in scan_tree(root)]
+
+    start = time.perf_counter()
+    matcher = GlobMatcher(patterns)
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matched = sum(1 for name, is_dir in entries if matcher.match(name, is_dir))
+    compiled_time = time.perf_counter() - start
+
+    # The naive loop is slow; time a sample and extrapolate
+    sample = entries[:min(len(entries), 100_000)]
+    start = time.perf_counter()
+    for name, is_dir in sample:
+        _naive_match(patterns, name, is_dir)
+    naive_time = (time.perf_counter() - start) * len(entries) / len(sample)
+
+    # Results must agree with the reference implementation
+    mismatches = sum(1 for name, is_dir in sample
+                     if matcher.match(name, is_dir) != _naive_match(patterns, name, is_dir))
+
+    print("\n" + "=" * 60)
+    print("Glob Matcher Benchmark")
+    print("=" * 60)
+    print(f"Synthetic tree: {file_count:,} files, {len(entries):,} entries (created in {create_time:.1f} s)")
+    print(f"Patterns: {sum(len(p) for p in patterns.values())} in {len(patterns)} categories")
+    print(f"Compile time: {compile_time * 1000:.2f} ms")
+    print(f"Compiled matcher: {compiled_time:.2f} s ({len(entries) / compiled_time:,.0f} entries/s)")
+    print(f"Per-pattern fnmatch (extrapolated): {naive_time:.2f} s ({len(entries) / naive_time:,.0f} entries/s)")
+    print(f"Speedup: {naive_time / compiled_time:.1f}x")
+    print(f"Entries matching any category: {matched:,}")
+    print(f"Mismatches vs fnmatch on {len(sample):,} samples: {mismatches}")
+    return mismatches
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--benchmark':
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000)
+    else:
+        print(__doc__)
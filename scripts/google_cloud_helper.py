@@ -5,20 +5,376 @@ Provides easy access to Google Cloud services using Python SDK
 """
 import os
 import json
+import base64
+import hashlib
+import io
+import queue
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from datetime import datetime
+from datetime import timedelta
 
 # Set up authentication
 SERVICE_KEY_PATH = "/app/main/web_app/google_service_key.json"
 os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = SERVICE_KEY_PATH
 
+STORAGE_SCOPES = ['https://www.googleapis.com/auth/devstorage.full_control']
+
+# Point at a local stand-in such as fake_gcs_server.py instead of Google
+STORAGE_ENDPOINT = os.environ.get('STORAGE_EMULATOR_HOST')
+EMULATOR_PROJECT = 'local-emulator'
+
+# HTTP connections kept open to storage; sized for concurrent transfers
+HTTP_POOL_SIZE = 32
+
+# Concurrent transfers in upload_many/download_many
+TRANSFER_WORKERS = 8
+
+# Attempts per object and the backoff between them (doubles each retry)
+TRANSFER_ATTEMPTS = 5
+BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 32.0
+
+# HTTP statuses worth retrying
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Local checksums reused by sync while a file's size and mtime are unchanged
+HASH_CACHE_PATH = Path("/app/main/web_app/logs/gcs_hash_cache.json")
+
+# Bytes read per checksum update
+HASH_CHUNK = 1024 * 1024
+
+# Blob fields requested by listings; nextPageToken and prefixes are added as needed
+LIST_FIELDS = 'name,size,updated,generation,crc32c'
+SYNC_LIST_FIELDS = 'name,size,crc32c,md5Hash'
+
+# Objects per listing page and pages fetched ahead of the consumer
+LIST_PAGE_SIZE = 1000
+LIST_PREFETCH_PAGES = 2
+
+# Files at least this large are transferred in parallel parts
+PARALLEL_THRESHOLD = 150 * 1024 * 1024
+
+# Preferred part size; files needing more parts than compose accepts get larger parts
+TARGET_PART_SIZE = 64 * 1024 * 1024
+
+# GCS compose accepts at most 32 source objects
+MAX_COMPOSE_SOURCES = 32
+
+# Parts transferred concurrently for one file
+PART_WORKERS = 16
+
+# Signed URLs kept for reuse, and how long before their expiry they are dropped
+SIGNED_URL_CACHE_SIZE = 10000
+SIGNED_URL_MARGIN = timedelta(minutes=5)
+
+# One storage client per process and endpoint, shared by every helper instance
+_client_lock = threading.Lock()
+_clients = {}
+_client_pid = None
+
+def _create_storage_client(project_id, endpoint=None):
+    """Build a storage client on a pooled, authorized HTTP session
+
+    With an endpoint the client talks to that server anonymously.
+    """
+    from google.cloud import storage
+    from requests.adapters import HTTPAdapter
+    
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+    if endpoint:
+        from google.auth.credentials import AnonymousCredentials
+        import requests
+        
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return storage.Client(project=project_id, credentials=AnonymousCredentials(),
+                              client_options={'api_endpoint': endpoint}, _http=session)
+    
+    from google.oauth2 import service_account
+    from google.auth.transport.requests import AuthorizedSession
+    
+    credentials = service_account.Credentials.from_service_account_file(
+        SERVICE_KEY_PATH, scopes=STORAGE_SCOPES
+    )
+    session = AuthorizedSession(credentials)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return storage.Client(project=project_id, credentials=credentials, _http=session)
+
+def get_shared_storage_client(project_id, endpoint=None):
+    """Process-wide storage client, created on first use
+
+    Credentials are loaded and connections opened once per process; a
+    forked child builds its own client instead of sharing sockets.
+    """
+    global _client_pid
+    
+    key = (project_id, endpoint)
+    client = _clients.get(key)
+    if client is not None and _client_pid == os.getpid():
+        return client
+    
+    with _client_lock:
+        if _client_pid != os.getpid():
+            _clients.clear()
+            _client_pid = os.getpid()
+        if key not in _clients:
+            _clients[key] = _create_storage_client(project_id, endpoint)
+        return _clients[key]
+
+def _is_retryable(error):
+    """Whether a failed request is transient and worth retrying"""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    if getattr(error, 'code', None) in RETRYABLE_STATUS_CODES:
+        return True
+    try:
+        from requests import exceptions as requests_exceptions
+        return isinstance(error, (requests_exceptions.ConnectionError,
+                                  requests_exceptions.Timeout,
+                                  requests_exceptions.ChunkedEncodingError))
+    except ImportError:
+        return False
+
+def with_retries(operation, attempts=TRANSFER_ATTEMPTS):
+    """Run operation, retrying transient failures with jittered exponential backoff"""
+    for attempt in range(attempts):
+        try:
+            return operation()
+        except Exception as e:
+            if attempt == attempts - 1 or not _is_retryable(e):
+                raise
+            delay = min(MAX_BACKOFF_SECONDS, BACKOFF_SECONDS * 2 ** attempt)
+            time.sleep(delay * random.uniform(0.5, 1.0))
+
+def file_checksums(path):
+    """Base64 MD5 and CRC32C of a file, encoded the way GCS reports them
+
+    CRC32C needs google-crc32c, which ships with google-cloud-storage;
+    without it only the MD5 is returned.
+    """
+    try:
+        import google_crc32c
+        crc = google_crc32c.Checksum()
+    except ImportError:
+        crc = None
+    md5 = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            md5.update(chunk)
+            if crc is not None:
+                crc.update(chunk)
+    return {
+        'md5': base64.b64encode(md5.digest()).decode('ascii'),
+        'crc32c': base64.b64encode(crc.digest()).decode('ascii') if crc is not None else None,
+    }
+
+class ChecksumCache:
+    """Local file checksums keyed by path, valid while size and mtime match"""
+    
+    def __init__(self, path=HASH_CACHE_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, 'r') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+    
+    def checksums(self, path, stat):
+        """Cached checksums of path, computed on a miss"""
+        key = str(path)
+        with self._lock:
+            entry = self.entries.get(key)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry
+        entry = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, **file_checksums(path)}
+        with self._lock:
+            self.entries[key] = entry
+        return entry
+    
+    def save(self):
+        """Write the cache atomically"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with self._lock:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+def checksums_match(local, remote):
+    """Compare by CRC32C when both sides have it, else by MD5
+
+    Composite objects carry no MD5, so CRC32C is preferred.
+    """
+    if local.get('crc32c') and remote.get('crc32c'):
+        return local['crc32c'] == remote['crc32c']
+    if remote.get('md5'):
+        return local['md5'] == remote['md5']
+    return False
+
+def transfer_policy(size):
+    """(part count, concurrent parts) for a file of this many bytes
+
+    Small files go in one stream. Large ones are split into parts of about
+    TARGET_PART_SIZE, capped at what a single compose can join.
+    """
+    if size < PARALLEL_THRESHOLD:
+        return 1, 1
+    parts = min(MAX_COMPOSE_SOURCES, max(2, -(-size // TARGET_PART_SIZE)))
+    return parts, min(parts, PART_WORKERS)
+
+def part_ranges(size, parts):
+    """(start, length) byte ranges splitting size into parts"""
+    part_size = -(-size // parts)
+    return [(start, min(part_size, size - start)) for start in range(0, size, part_size)]
+
+def local_target(destination_dir, blob_name, prefix=''):
+    """Path below destination_dir for a blob, with its prefix/ stripped
+    
+    Raises ValueError for a blob outside the prefix or a name that would
+    land outside destination_dir, such as one with '..' segments.
+    """
+    prefix = prefix.strip('/')
+    relative_name = blob_name
+    if prefix:
+        if not blob_name.startswith(f"{prefix}/"):
+            raise ValueError(f"{blob_name} is not under {prefix}/")
+        relative_name = blob_name[len(prefix) + 1:]
+    root = Path(destination_dir).resolve()
+    target = (root / relative_name).resolve()
+    if root not in target.parents:
+        raise ValueError(f"{blob_name} would be written outside {root}")
+    return target
+
+class _OffsetWriter:
+    """File-like writer placing data at an offset of a shared descriptor"""
+    
+    def __init__(self, fd, offset):
+        self.fd = fd
+        self.offset = offset
+    
+    def write(self, data):
+        written = 0
+        while written < len(data):
+            written += os.pwrite(self.fd, memoryview(data)[written:], self.offset + written)
+        self.offset += written
+        return written
+
+class _FileSlice(io.RawIOBase):
+    """Read-only view of length bytes of a file starting at start
+    
+    Positions are relative to the slice, so the library's resumable
+    upload, which insists on a stream at position 0, can send a part.
+    """
+    
+    def __init__(self, path, start, length):
+        self._file = open(path, 'rb')
+        self._start = start
+        self._length = length
+        self._position = 0
+    
+    def readable(self):
+        return True
+    
+    def seekable(self):
+        return True
+    
+    def tell(self):
+        return self._position
+    
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._length
+        self._position = max(0, min(offset, self._length))
+        return self._position
+    
+    def read(self, size=-1):
+        remaining = self._length - self._position
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        self._file.seek(self._start + self._position)
+        data = self._file.read(size)
+        self._position += len(data)
+        return data
+    
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+    
+    def close(self):
+        self._file.close()
+        super().close()
+
+class SignedUrlCache:
+    """LRU cache of signed URLs keyed by (bucket, blob, method)
+
+    Each entry keeps its URL's absolute expiry. A cached URL is handed out
+    only while it stays valid for the requested lifetime less
+    SIGNED_URL_MARGIN, so a caller asking for a day never gets a URL
+    signed for an hour.
+    """
+    
+    def __init__(self, max_entries=SIGNED_URL_CACHE_SIZE, margin=SIGNED_URL_MARGIN):
+        self.max_entries = max_entries
+        self.margin = margin.total_seconds()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, lifetime):
+        """Cached URL for key still valid for lifetime (a timedelta) less the margin, else None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            url, url_expires_at = entry
+            remaining = url_expires_at - time.time()
+            if remaining <= self.margin:
+                del self._entries[key]
+                return None
+            if remaining < lifetime.total_seconds() - self.margin:
+                return None
+            self._entries.move_to_end(key)
+            return url
+    
+    def put(self, key, url, lifetime):
+        """Cache a URL signed just now to be valid for lifetime (a timedelta)"""
+        if lifetime.total_seconds() <= self.margin:
+            return
+        with self._lock:
+            self._entries[key] = (url, time.time() + lifetime.total_seconds())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+_signed_urls = SignedUrlCache()
+
 class GoogleCloudHelper:
     """Helper class for Google Cloud operations"""
     
-    def __init__(self):
-        """Initialize the helper with service account"""
+    def __init__(self, endpoint=STORAGE_ENDPOINT):
+        """Initialize the helper with service account
+        
+        With an endpoint, such as a local fake_gcs_server.py, no service
+        account is needed and requests go to that server instead.
+        """
         self.service_key_path = SERVICE_KEY_PATH
-        self._validate_credentials()
+        self.endpoint = endpoint
+        if endpoint:
+            self.project_id = EMULATOR_PROJECT
+            self.service_account = None
+            print(f"Initialized Google Cloud Helper against {endpoint}")
+        else:
+            self._validate_credentials()
         
     def _validate_credentials(self):
         """Validate service account credentials"""
@@ -36,10 +392,9 @@ class GoogleCloudHelper:
         print(f"Service Account: {self.service_account}")
     
     def get_storage_client(self):
-        """Get Google Cloud Storage client"""
+        """Get the shared Google Cloud Storage client"""
         try:
-            from google.cloud import storage
-            return storage.Client()
+            return get_shared_storage_client(self.project_id, self.endpoint)
         except ImportError:
             print("ERROR: google-cloud-storage not installed")
             print("Run: pip install --break-system-packages google-cloud-storage")
@@ -83,8 +438,7 @@ class GoogleCloudHelper:
             if destination_blob_name is None:
                 destination_blob_name = Path(source_file_path).name
             
-            blob = bucket.blob(destination_blob_name)
-            blob.upload_from_filename(source_file_path)
+            self._upload_object(bucket, source_file_path, destination_blob_name)
             
             print(f"Uploaded {source_file_path} to gs://{bucket_name}/{destination_blob_name}")
             return True
@@ -100,8 +454,11 @@ class GoogleCloudHelper:
         
         try:
             bucket = client.bucket(bucket_name)
-            blob = bucket.blob(source_blob_name)
-            blob.download_to_filename(destination_file_path)
+            # One metadata lookup tells whether a ranged download pays off
+            listed = bucket.get_blob(source_blob_name)
+            if listed is None:
+                raise FileNotFoundError(f"gs://{bucket_name}/{source_blob_name} does not exist")
+            self._download_object(bucket, source_blob_name, destination_file_path, listed)
             
             print(f"Downloaded gs://{bucket_name}/{source_blob_name} to {destination_file_path}")
             return True
@@ -109,42 +466,414 @@ class GoogleCloudHelper:
             print(f"Failed to download file: {str(e)}")
             return False
     
-    def list_files(self, bucket_name, prefix=None):
-        """List files in a bucket"""
+    def _upload_object(self, bucket, source_file_path, blob_name):
+        """Upload one file, in parallel composite parts when it is large; returns bytes sent"""
+        size = os.path.getsize(source_file_path)
+        parts, workers = transfer_policy(size)
+        if parts == 1:
+            bucket.blob(blob_name).upload_from_filename(str(source_file_path))
+            return size
+        
+        token = uuid.uuid4().hex
+        part_blobs = [bucket.blob(f"{blob_name}.part-{token}-{index:02d}")
+                      for index in range(len(part_ranges(size, parts)))]
+        
+        def upload_part(index, start, length):
+            def send():
+                with _FileSlice(source_file_path, start, length) as part:
+                    part_blobs[index].upload_from_file(part, size=length)
+            with_retries(send)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(upload_part, index, start, length)
+                           for index, (start, length) in enumerate(part_ranges(size, parts))]
+                for future in futures:
+                    future.result()
+            
+            blob = bucket.blob(blob_name)
+            with_retries(lambda: blob.compose(part_blobs))
+            
+            local = file_checksums(source_file_path)
+            if local['crc32c'] and blob.crc32c and local['crc32c'] != blob.crc32c:
+                raise IOError(f"CRC32C mismatch after composing gs://{bucket.name}/{blob_name}")
+        finally:
+            for part in part_blobs:
+                try:
+                    part.delete()
+                except Exception:
+                    pass
+        return size
+    
+    def _download_object(self, bucket, blob_name, destination_file_path, listed=None):
+        """Download one blob, as concurrent byte ranges when it is large; returns bytes received
+        
+        listed is the blob's metadata (size, generation, crc32c) from a
+        listing or lookup. Without it no extra metadata request is made and
+        the blob is fetched in one stream. Data lands in a .part file that
+        replaces the destination once complete; ranged downloads
+        preallocate it and read the listed object generation.
+        """
+        destination_file_path = Path(destination_file_path)
+        partial = destination_file_path.with_name(destination_file_path.name + '.part')
+        
+        parts, workers = transfer_policy(listed.size) if listed is not None else (1, 1)
+        if parts == 1:
+            generation = listed.generation if listed is not None else None
+            bucket.blob(blob_name, generation=generation).download_to_filename(str(partial))
+            os.replace(partial, destination_file_path)
+            return destination_file_path.stat().st_size
+        
+        pinned = bucket.blob(blob_name, generation=listed.generation)
+        fd = os.open(partial, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            if hasattr(os, 'posix_fallocate'):
+                os.posix_fallocate(fd, 0, listed.size)
+            else:
+                os.ftruncate(fd, listed.size)
+            
+            def download_range(start, length):
+                with_retries(lambda: pinned.download_to_file(
+                    _OffsetWriter(fd, start), start=start, end=start + length - 1
+                ))
+            
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(download_range, start, length)
+                           for start, length in part_ranges(listed.size, parts)]
+                for future in futures:
+                    future.result()
+            os.fsync(fd)
+        except BaseException:
+            os.close(fd)
+            partial.unlink(missing_ok=True)
+            raise
+        os.close(fd)
+        
+        # Ranged reads skip the library's checksum, so check the whole file
+        local = file_checksums(partial)
+        if local['crc32c'] and listed.crc32c and local['crc32c'] != listed.crc32c:
+            partial.unlink(missing_ok=True)
+            raise IOError(f"CRC32C mismatch downloading gs://{bucket.name}/{blob_name}")
+        os.replace(partial, destination_file_path)
+        return listed.size
+    
+    def _transfer_many(self, label, jobs, workers):
+        """Run (name, transfer) jobs on a thread pool with progress and throughput
+
+        Each transfer returns the bytes it moved and is retried on
+        transient errors. Returns a summary of the whole batch.
+        """
+        summary = {'succeeded': [], 'failed': {}, 'bytes': 0, 'seconds': 0.0}
+        lock = threading.Lock()
+        start = time.perf_counter()
+        
+        def run(name, transfer):
+            file_start = time.perf_counter()
+            size = with_retries(transfer)
+            return name, size, time.perf_counter() - file_start
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(run, name, transfer): name for name, transfer in jobs}
+            for done, future in enumerate(as_completed(futures), 1):
+                name = futures[future]
+                try:
+                    _, size, seconds = future.result()
+                except Exception as e:
+                    with lock:
+                        summary['failed'][name] = str(e)
+                    print(f"  [{done}/{len(futures)}] Failed to {label.lower()} {name}: {str(e)}")
+                    continue
+                with lock:
+                    summary['succeeded'].append(name)
+                    summary['bytes'] += size
+                rate = size / (1024 * 1024) / seconds if seconds > 0 else 0.0
+                print(f"  [{done}/{len(futures)}] {label}ed {name} "
+                      f"({size / (1024 * 1024):.1f} MB, {rate:.1f} MB/s)")
+        
+        summary['seconds'] = time.perf_counter() - start
+        throughput = summary['bytes'] / (1024 * 1024) / summary['seconds'] if summary['seconds'] > 0 else 0.0
+        summary['throughput_mb_s'] = throughput
+        print(f"{label}ed {len(summary['succeeded'])} files, "
+              f"{summary['bytes'] / (1024 * 1024):.1f} MB in {summary['seconds']:.1f}s "
+              f"({throughput:.1f} MB/s), {len(summary['failed'])} failed")
+        return summary
+    
+    def upload_many(self, bucket_name, paths, prefix='', workers=TRANSFER_WORKERS):
+        """Upload files concurrently to gs://bucket_name/prefix
+        
+        Directories in paths are uploaded recursively, keeping their
+        layout below the prefix.
+        """
         client = self.get_storage_client()
         if not client:
-            return []
+            return None
+        
+        bucket = client.bucket(bucket_name)
+        prefix = prefix.strip('/')
+        
+        uploads = []
+        for path in map(Path, paths):
+            if path.is_dir():
+                uploads.extend((file, file.relative_to(path.parent).as_posix())
+                               for file in sorted(path.rglob('*')) if file.is_file())
+            else:
+                uploads.append((path, path.name))
+        
+        def upload_job(source, relative_name):
+            blob_name = f"{prefix}/{relative_name}" if prefix else relative_name
+            
+            def transfer():
+                return self._upload_object(bucket, source, blob_name)
+            return f"gs://{bucket_name}/{blob_name}", transfer
+        
+        return self._transfer_many('Upload', [upload_job(*upload) for upload in uploads], workers)
+    
+    def download_many(self, bucket_name, blobs, destination_dir, prefix='', workers=TRANSFER_WORKERS):
+        """Download blobs concurrently into destination_dir
+        
+        blobs are names or blobs from iter_files; listed blobs carry their
+        size, so large ones are fetched as parallel ranges without another
+        metadata request. Plain names are fetched in one stream each.
+        The part of each blob name after prefix/ becomes its path below
+        destination_dir. Each file appears only once it is complete. Blobs
+        outside the prefix or resolving outside destination_dir fail
+        without being fetched.
+        """
+        client = self.get_storage_client()
+        if not client:
+            return None
+        
+        bucket = client.bucket(bucket_name)
+        
+        def download_job(item):
+            listed = None if isinstance(item, str) else item
+            blob_name = item if listed is None else listed.name
+            
+            def transfer():
+                target = local_target(destination_dir, blob_name, prefix)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                return self._download_object(bucket, blob_name, target, listed)
+            return f"gs://{bucket_name}/{blob_name}", transfer
+        
+        return self._transfer_many('Download', [download_job(item) for item in blobs], workers)
+    
+    def sync(self, local_dir, bucket_name, prefix='', delete=False, workers=TRANSFER_WORKERS, force=False):
+        """Upload new or changed files of local_dir to gs://bucket_name/prefix
+        
+        A file is skipped when the blob with its name has the same size and
+        checksum. Local checksums are cached by size and mtime, so only
+        edited files are rehashed. With delete=True, blobs under the prefix
+        that have no local file are removed; that is refused for an empty
+        prefix (the whole bucket) or an empty local_dir unless force=True.
+        """
+        local_dir = Path(local_dir)
+        prefix = prefix.strip('/')
+        if not local_dir.is_dir():
+            raise NotADirectoryError(f"Sync source is not a directory: {local_dir}")
+        if delete and not prefix and not force:
+            raise ValueError("Refusing to delete across a whole bucket; pass a prefix or force=True")
+        
+        client = self.get_storage_client()
+        if not client:
+            return None
+        
+        bucket = client.bucket(bucket_name)
+        
+        def blob_name_of(relative_name):
+            return f"{prefix}/{relative_name}" if prefix else relative_name
         
         try:
-            bucket = client.bucket(bucket_name)
-            blobs = list(bucket.list_blobs(prefix=prefix))
+            remote = {
+                blob.name: {'size': blob.size, 'crc32c': blob.crc32c, 'md5': blob.md5_hash}
+                for blob in self.iter_files(bucket_name, f"{prefix}/" if prefix else None, fields=SYNC_LIST_FIELDS)
+            }
+        except Exception as e:
+            print(f"Failed to list gs://{bucket_name}/{prefix}: {str(e)}")
+            return None
+        
+        local = {}
+        for root, dirs, files in os.walk(local_dir):
+            for name in files:
+                path = Path(root) / name
+                if path.is_symlink():
+                    continue
+                local[blob_name_of(path.relative_to(local_dir).as_posix())] = path
+        
+        if delete and not local and not force:
+            raise ValueError(f"Refusing to delete every blob under gs://{bucket_name}/{prefix}: "
+                             f"{local_dir} is empty; pass force=True")
+        
+        cache = ChecksumCache()
+        
+        def needs_upload(blob_name):
+            path = local[blob_name]
+            stat = path.stat()
+            existing = remote.get(blob_name)
+            if existing is None or existing['size'] != stat.st_size:
+                return True
+            return not checksums_match(cache.checksums(path, stat), existing)
+        
+        names = sorted(local)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            changed = [name for name, upload in zip(names, pool.map(needs_upload, names)) if upload]
+        cache.save()
+        
+        print(f"Sync {local_dir} -> gs://{bucket_name}/{prefix}: "
+              f"{len(changed)} to upload, {len(names) - len(changed)} unchanged")
+        
+        def upload_job(blob_name):
+            source = local[blob_name]
+            
+            def transfer():
+                return self._upload_object(bucket, source, blob_name)
+            return blob_name, transfer
+        
+        summary = self._transfer_many('Upload', [upload_job(name) for name in changed], workers)
+        summary['unchanged'] = len(names) - len(changed)
+        summary['deleted'] = []
+        
+        if delete:
+            orphans = sorted(set(remote) - set(local))
+            
+            def delete_blob(blob_name):
+                with_retries(lambda: bucket.blob(blob_name).delete())
+                return blob_name
+            
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(delete_blob, name): name for name in orphans}
+                for future in as_completed(futures):
+                    try:
+                        summary['deleted'].append(future.result())
+                    except Exception as e:
+                        summary['failed'][futures[future]] = str(e)
+                        print(f"Failed to delete gs://{bucket_name}/{futures[future]}: {str(e)}")
+            print(f"Deleted {len(summary['deleted'])} remote files with no local copy")
+        
+        return summary
+    
+    def iter_files(self, bucket_name, prefix=None, fields=LIST_FIELDS, delimiter=None,
+                   page_size=LIST_PAGE_SIZE, prefetch=LIST_PREFETCH_PAGES):
+        """Stream the blobs under prefix page by page
+        
+        Only the given blob fields are requested. With a delimiter such as
+        '/', only blobs directly under prefix are yielded, followed by each
+        page's "directory" prefixes as plain strings. Up to prefetch pages
+        are fetched by a background thread while earlier ones are consumed.
+        """
+        client = self.get_storage_client()
+        if not client:
+            return
+        
+        bucket = client.bucket(bucket_name)
+        item_fields = f"items({fields}),nextPageToken"
+        if delimiter:
+            item_fields += ",prefixes"
+        pages = bucket.list_blobs(
+            prefix=prefix, delimiter=delimiter, page_size=page_size, fields=item_fields
+        ).pages
+        
+        if prefetch <= 0:
+            for page in pages:
+                yield from page
+                yield from getattr(page, 'prefixes', ())
+            return
+        
+        # Page tokens chain, so prefetching overlaps the next request with consumption
+        done = object()
+        ready = queue.Queue(maxsize=prefetch)
+        stop = threading.Event()
+        
+        def offer(item):
+            """Queue item unless the consumer has gone; returns whether it was queued"""
+            while not stop.is_set():
+                try:
+                    ready.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def fetch():
+            try:
+                for page in pages:
+                    if not offer((list(page), tuple(getattr(page, 'prefixes', ())))):
+                        return
+                offer(done)
+            except Exception as e:
+                offer(e)
+        
+        fetcher = threading.Thread(target=fetch, daemon=True)
+        fetcher.start()
+        try:
+            while True:
+                item = ready.get()
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                blobs, prefixes = item
+                yield from blobs
+                yield from prefixes
+        finally:
+            stop.set()
+    
+    def list_files(self, bucket_name, prefix=None, limit=10):
+        """List files in a bucket, printing the first few; returns the file count"""
+        try:
+            count = 0
+            shown = []
+            for blob in self.iter_files(bucket_name, prefix, fields='name'):
+                if count < limit:
+                    shown.append(blob.name)
+                count += 1
             
-            print(f"Found {len(blobs)} files in {bucket_name}:")
-            for blob in blobs[:10]:  # Show first 10
-                print(f"  - {blob.name}")
+            print(f"Found {count} files in {bucket_name}:")
+            for name in shown:
+                print(f"  - {name}")
             
-            if len(blobs) > 10:
-                print(f"  ... and {len(blobs) - 10} more")
+            if count > limit:
+                print(f"  ... and {count - limit} more")
             
-            return blobs
+            return count
         except Exception as e:
             print(f"Failed to list files: {str(e)}")
-            return []
+            return 0
     
-    def generate_signed_url(self, bucket_name, blob_name, expiration_minutes=60):
-        """Generate a signed URL for temporary access"""
+    def generate_signed_urls(self, bucket_name, blob_names, expiration_minutes=60, method='GET'):
+        """Signed URLs for many blobs; returns {blob_name: url}
+        
+        Signing is local, with the shared client's service account key.
+        URLs still valid in the process-wide cache are reused.
+        """
         client = self.get_storage_client()
         if not client:
-            return None
+            return {}
+        
+        bucket = client.bucket(bucket_name)
+        lifetime = timedelta(minutes=expiration_minutes)
+        urls = {}
+        signed = 0
+        for blob_name in blob_names:
+            key = (bucket_name, blob_name, method)
+            url = _signed_urls.get(key, lifetime)
+            if url is None:
+                url = bucket.blob(blob_name).generate_signed_url(
+                    version='v4', expiration=lifetime, method=method
+                )
+                _signed_urls.put(key, url, lifetime)
+                signed += 1
+            urls[blob_name] = url
         
+        if signed:
+            print(f"Signed {signed} URLs ({len(urls) - signed} from cache)")
+        return urls
+    
+    def generate_signed_url(self, bucket_name, blob_name, expiration_minutes=60):
+        """Generate a signed URL for temporary access"""
         try:
-            bucket = client.bucket(bucket_name)
-            blob = bucket.blob(blob_name)
-            
-            url = blob.generate_signed_url(
-                expiration=datetime.timedelta(minutes=expiration_minutes),
-                method='GET'
-            )
+            url = self.generate_signed_urls(bucket_name, [blob_name], expiration_minutes).get(blob_name)
+            if url is None:
+                return None
             
             print(f"Generated signed URL (expires in {expiration_minutes} minutes):")
             print(url)
@@ -11,6 +11,8 @@ from datetime import datetime
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
 from scripts.logger import log_action
+from scripts.fast_move import fast_move
+from scripts.reference_index import replace_references
 
 def create_backup_before_cleanup():
     """Create a safety backup before cleanup"""
@@ -111,7 +113,8 @@ def move_google_cloud_sdk():
                 shutil.rmtree(gcloud_path)
             else:
                 log_action("Moving Google Cloud SDK to /app/tools")
-                shutil.move(str(gcloud_path), str(target_path))
+                # Rename on one filesystem, parallel in-kernel copy across filesystems
+                fast_move(gcloud_path, target_path)
                 
                 # Update any scripts that reference it
                 update_gcloud_references()
@@ -136,20 +139,16 @@ def update_gcloud_references():
         'test_gcloud_cli.sh'
     ]
     
-    for script_name in scripts_to_check:
-        script_path = scripts_path / script_name
-        if script_path.exists():
-            try:
-                content = script_path.read_text()
-                if '/app/main/web_app/google-cloud-sdk' in content:
-                    new_content = content.replace(
-                        '/app/main/web_app/google-cloud-sdk',
-                        '/app/tools/google-cloud-sdk'
-                    )
-                    script_path.write_text(new_content)
-                    log_action(f"Updated gcloud path in {script_name}")
-            except Exception as e:
-                log_action(f"Error updating {script_name}: {e}")
+    # The reference index skips the listed scripts that no longer mention the old path
+    try:
+        updated = replace_references(
+            '/app/main/web_app/google-cloud-sdk',
+            '/app/tools/google-cloud-sdk',
+            only=[scripts_path / script_name for script_name in scripts_to_check]
+        )
+        log_action(f"Updated gcloud path in {len(updated)} files")
+    except Exception as e:
+        log_action(f"Error updating gcloud references: {e}")
 
 def organize_deployment_files():
     """Organize deployment-related files"""
@@ -175,7 +174,7 @@ def organize_deployment_files():
         if file_path.exists() and file_path.is_file():
             try:
                 target = deployment_dir / file_name
-                shutil.move(str(file_path), str(target))
+                fast_move(file_path, target)
                 moved_files.append(file_name)
                 log_action(f"Moved {file_name} to deployment/")
             except Exception as e:
@@ -192,7 +191,7 @@ def organize_deployment_files():
         if full_path.exists():
             try:
                 target = deployment_dir / Path(script_path).name
-                shutil.move(str(full_path), str(target))
+                fast_move(full_path, target)
                 moved_files.append(script_path)
                 log_action(f"Moved {script_path} to deployment/")
             except Exception as e:
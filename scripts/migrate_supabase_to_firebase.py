@@ -7,12 +7,12 @@ import re
 import shutil
 from datetime import datetime
 from pathlib import Path
-import json
 
 # Add parent directory to path
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
 from scripts.logger import log_action
+from scripts.migration_report import MigrationReportWriter
 
 # Define replacements
 REPLACEMENTS = {
@@ -175,24 +175,10 @@ def find_supabase_references(directory):
     
     return supabase_files
 
-def generate_report(results):
-    """Generate a migration report"""
-    report = {
-        "migration_date": datetime.now().isoformat(),
-        "total_files_scanned": results['total_scanned'],
-        "files_with_supabase": results['files_found'],
-        "files_modified": results['files_modified'],
-        "total_replacements": results['total_replacements'],
-        "modified_files": results['modified_files'],
-        "skipped_files": results['skipped_files'],
-        "errors": results['errors']
-    }
-    
-    report_path = Path("/app/main/web_app/logs/firebase_migration_report.json")
-    with open(report_path, 'w') as f:
-        json.dump(report, f, indent=2, default=str)
-    
-    return report_path
+def open_report():
+    """Open the streaming migration report"""
+    report_path = Path("/app/main/web_app/logs/firebase_migration_report.jsonl")
+    return MigrationReportWriter(report_path, "find_and_replace")
 
 def main():
     """Main migration function"""
@@ -206,16 +192,12 @@ def main():
     supabase_files = find_supabase_references(web_app_dir)
     log_action(f"Found {len(supabase_files)} files with Supabase references")
     
-    # Process results
-    results = {
-        'total_scanned': 0,
-        'files_found': len(supabase_files),
-        'files_modified': 0,
-        'total_replacements': 0,
-        'modified_files': [],
-        'skipped_files': [],
-        'errors': []
-    }
+    # Records are streamed to the report as they happen; only counters
+    # and a short preview of modified files are kept in memory
+    report = open_report()
+    report.update_summary(files_found=len(supabase_files), total_scanned=0)
+    results = report.summary
+    modified_preview = []
     
     # Process each file
     for file_path in supabase_files:
@@ -226,23 +208,23 @@ def main():
             results['total_scanned'] += 1
             
             if modified:
-                results['files_modified'] += 1
-                results['total_replacements'] += count
-                results['modified_files'].append({
-                    'path': str(file_path),
-                    'replacements': count
-                })
+                report.record_modified(file_path, count)
+                if len(modified_preview) < 10:
+                    modified_preview.append({
+                        'path': str(file_path),
+                        'replacements': count
+                    })
                 log_action(f"Modified {file_path} with {count} replacements")
             else:
-                results['skipped_files'].append(str(file_path))
+                report.record_skipped(file_path)
         except Exception as e:
             error_msg = f"Error processing {file_path}: {str(e)}"
             log_action(error_msg)
-            results['errors'].append(error_msg)
+            report.record_error(error_msg)
     
-    # Generate report
-    report_path = generate_report(results)
-    log_action(f"Migration report saved to: {report_path}")
+    # Finalize report
+    report.close()
+    log_action(f"Migration report saved to: {report.report_path}")
     
     # Print summary
     print("\n" + "="*50)
@@ -252,14 +234,14 @@ def main():
     print(f"Files with Supabase references: {results['files_found']}")
     print(f"Files modified: {results['files_modified']}")
     print(f"Total replacements: {results['total_replacements']}")
-    print(f"Errors: {len(results['errors'])}")
+    print(f"Errors: {results['errors']}")
     
-    if results['modified_files']:
+    if modified_preview:
         print("\nModified files:")
-        for file_info in results['modified_files'][:10]:  # Show first 10
+        for file_info in modified_preview:  # Show first 10
             print(f"  - {file_info['path']} ({file_info['replacements']} replacements)")
-        if len(results['modified_files']) > 10:
-            print(f"  ... and {len(results['modified_files']) - 10} more")
+        if results['files_modified'] > 10:
+            print(f"  ... and {results['files_modified'] - 10} more")
     
     log_action("Migration completed!")
     
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Streaming JSONL report writer for the Firebase migration scripts
+Records are appended as the migration runs and a summary footer is written at exit
+"""
+import atexit
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+# Bytes read from the end of a report when looking for the summary footer
+FOOTER_PROBE_BYTES = 64 * 1024
+
+
+class MigrationReportWriter:
+    """Append-only migration report, one JSON record per line"""
+
+    def __init__(self, report_path, migration_type, **header):
+        self.report_path = Path(report_path)
+        self.report_path.parent.mkdir(parents=True, exist_ok=True)
+        self.summary = {
+            'files_modified': 0,
+            'files_skipped': 0,
+            'total_replacements': 0,
+            'errors': 0,
+        }
+        self.closed = False
+
+        # Line buffered so every record reaches the file as soon as it is written
+        self._file = open(self.report_path, 'w', encoding='utf-8', buffering=1)
+        self._write({
+            'type': 'header',
+            'migration_date': datetime.now().isoformat(),
+            'migration_type': migration_type,
+            **header
+        })
+
+        # Finalize the footer even if the migration crashes part way through
+        atexit.register(self._close_at_exit)
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, default=str) + '\n')
+
+    def record_modified(self, path, replacements):
+        """Record a file that was rewritten"""
+        self.summary['files_modified'] += 1
+        self.summary['total_replacements'] += replacements
+        self._write({'type': 'modified', 'path': str(path), 'replacements': replacements})
+
+    def record_skipped(self, path):
+        """Record a file that was scanned but left unchanged"""
+        self.summary['files_skipped'] += 1
+        self._write({'type': 'skipped', 'path': str(path)})
+
+    def record_error(self, message):
+        """Record an error message"""
+        self.summary['errors'] += 1
+        self._write({'type': 'error', 'message': message})
+
+    def update_summary(self, **fields):
+        """Set extra summary fields (e.g. files_found) written in the footer"""
+        self.summary.update(fields)
+
+    def close(self, status='completed'):
+        """Write the summary footer and close the report"""
+        if self.closed:
+            return self.summary
+        self._write({
+            'type': 'summary',
+            'status': status,
+            'finished_at': datetime.now().isoformat(),
+            **self.summary
+        })
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self.closed = True
+        atexit.unregister(self._close_at_exit)
+        return self.summary
+
+    def _close_at_exit(self):
+        self.close(status='interrupted')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(status='completed' if exc_type is None else 'failed')
+        return False
+
+
+def iter_records(report_path, record_type=None):
+    """Yield records from a JSONL report, optionally filtered by type"""
+    with open(report_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a truncated last line behind
+                continue
+            if record_type is None or record.get('type') == record_type:
+                yield record
+
+
+def _read_footer(report_path):
+    """Return the summary footer if it is the last line of the report"""
+    with open(report_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - FOOTER_PROBE_BYTES))
+        tail = f.read().rstrip(b'\n')
+
+    last_line = tail.rsplit(b'\n', 1)[-1]
+    try:
+        record = json.loads(last_line)
+    except json.JSONDecodeError:
+        return None
+    return record if record.get('type') == 'summary' else None
+
+
+def read_report_summary(report_path):
+    """Rebuild the summary view of a report
+
+    Finalized reports are answered from the footer alone. Reports from runs
+    that never reached the footer are replayed record by record.
+    """
+    header = {}
+    footer = _read_footer(report_path)
+
+    for record in iter_records(report_path, 'header'):
+        header = record
+        break
+
+    if footer is not None:
+        return {**header, **footer}
+
+    summary = {
+        'status': 'incomplete',
+        'files_modified': 0,
+        'files_skipped': 0,
+        'total_replacements': 0,
+        'errors': 0,
+    }
+    for record in iter_records(report_path):
+        record_type = record.get('type')
+        if record_type == 'modified':
+            summary['files_modified'] += 1
+            summary['total_replacements'] += record.get('replacements', 0)
+        elif record_type == 'skipped':
+            summary['files_skipped'] += 1
+        elif record_type == 'error':
+            summary['errors'] += 1
+
+    return {**header, **summary, 'type': 'summary'}
+
+
+def main():
+    """Print the summary of one or more migration reports"""
+    import sys
+    if len(sys.argv) < 2:
+        print("Usage: migration_report.py <report.jsonl> [...]")
+        return
+
+    for report_path in sys.argv[1:]:
+        summary = read_report_summary(report_path)
+        print(f"\n{report_path}")
+        print("=" * 50)
+        for key, value in summary.items():
+            if key != 'type':
+                print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
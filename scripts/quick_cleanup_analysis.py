@@ -11,6 +11,8 @@ from datetime import datetime
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
 from scripts.logger import log_action
+from scripts.scan_cache import ScanCache
+from scripts.disk_usage_daemon import query_usage
 
 def analyze_root_files():
     """Analyze files in root directory that should be organized"""
@@ -98,12 +100,18 @@ def analyze_large_directories():
         'input': None
     }
     
-    for dir_name in large_dirs.keys():
-        dir_path = web_app_path / dir_name
-        if dir_path.exists() and dir_path.is_dir():
-            # Quick size check (count files instead of calculating size)
-            file_count = sum(1 for _ in dir_path.rglob('*') if _.is_file())
-            large_dirs[dir_name] = file_count
+    with ScanCache(web_app_path / 'logs' / 'scan_cache.db') as scan_cache:
+        for dir_name in large_dirs.keys():
+            dir_path = web_app_path / dir_name
+            if dir_path.exists() and dir_path.is_dir():
+                # A running disk_usage_daemon answers from memory
+                usage = query_usage(dir_path)
+                if usage is not None:
+                    large_dirs[dir_name] = usage['files']
+                    continue
+                # Quick size check (count files instead of calculating size)
+                file_count = sum(1 for entry in scan_cache.scan(dir_path) if not entry.is_dir)
+                large_dirs[dir_name] = file_count
     
     return large_dirs
 
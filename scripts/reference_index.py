@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Persistent reverse index from words in paths and identifiers to the files that use them
+Answers "who references X" from SQLite and limits reference rewrites after a move
+to the files that can actually contain the old string
+
+Usage:
+    python3 reference_index.py build
+    python3 reference_index.py query <text>
+    python3 reference_index.py replace <old> <new>
+"""
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.logger import log_action
+from scripts.fs_scanner import scan_tree
+
+WEB_APP_PATH = Path("/app/main/web_app")
+INDEX_PATH = WEB_APP_PATH / "logs" / "reference_index.db"
+
+INDEX_VERSION = 1
+
+# Not indexed: dependencies, build output, copies and moved tool trees
+INDEX_SKIP_DIRS = {'node_modules', '.git', '.next', 'backup', 'logs', '.quarantine', 'google-cloud-sdk'}
+
+TEXT_EXTENSIONS = {
+    '.py', '.js', '.jsx', '.ts', '.tsx', '.mjs', '.cjs', '.json', '.md', '.txt', '.sh',
+    '.yml', '.yaml', '.toml', '.cfg', '.ini', '.html', '.css', '.sql', '.example',
+}
+
+# Larger files are not indexed
+MAX_INDEX_BYTES = 2 * 1024 * 1024
+
+# Files read and tokenized concurrently
+INDEX_WORKERS = 8
+
+# Path components and identifiers are both split into these words
+WORD_PATTERN = re.compile(r'[A-Za-z0-9_]{2,}')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    word TEXT NOT NULL,
+    file_id INTEGER NOT NULL,
+    PRIMARY KEY (word, file_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_file ON postings (file_id);
+"""
+
+
+def words(text):
+    """Lowercased words of a path, identifier or document"""
+    return {word.lower() for word in WORD_PATTERN.findall(text)}
+
+
+def is_indexable(name, size):
+    """Whether a file is small text worth indexing"""
+    if size > MAX_INDEX_BYTES:
+        return False
+    return name.startswith('.env') or os.path.splitext(name)[1].lower() in TEXT_EXTENSIONS
+
+
+def _read_words(path):
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return words(f.read())
+    except OSError as e:
+        log_action(f"Error indexing {path}: {e}")
+        return None
+
+
+class ReferenceIndex:
+    """Word -> files index over the text files of a tree, updated incrementally
+
+    A query returns the files containing every word of the query text;
+    references() then confirms the exact string in just those files.
+    """
+
+    def __init__(self, root=WEB_APP_PATH, index_path=INDEX_PATH):
+        self.root = Path(root)
+        self.index_path = Path(index_path)
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.index_path))
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        if self.conn.execute('PRAGMA user_version').fetchone()[0] != INDEX_VERSION:
+            self.conn.executescript(
+                'DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS postings;'
+                + SCHEMA + f'PRAGMA user_version={INDEX_VERSION};'
+            )
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _store(self, path, size, mtime_ns, file_words):
+        row = self.conn.execute('SELECT id FROM files WHERE path = ?', (path,)).fetchone()
+        if row:
+            file_id = row[0]
+            self.conn.execute('UPDATE files SET size = ?, mtime_ns = ? WHERE id = ?', (size, mtime_ns, file_id))
+            self.conn.execute('DELETE FROM postings WHERE file_id = ?', (file_id,))
+        else:
+            file_id = self.conn.execute(
+                'INSERT INTO files (path, size, mtime_ns) VALUES (?, ?, ?)', (path, size, mtime_ns)
+            ).lastrowid
+        self.conn.executemany('INSERT INTO postings VALUES (?, ?)', ((word, file_id) for word in file_words))
+
+    def _forget(self, path):
+        row = self.conn.execute('SELECT id FROM files WHERE path = ?', (path,)).fetchone()
+        if row:
+            self.conn.execute('DELETE FROM postings WHERE file_id = ?', (row[0],))
+            self.conn.execute('DELETE FROM files WHERE id = ?', (row[0],))
+
+    def update(self, skip_dirs=INDEX_SKIP_DIRS, workers=INDEX_WORKERS):
+        """Reindex files whose size or mtime changed; returns (reindexed, removed)"""
+        known = {path: (size, mtime_ns) for path, size, mtime_ns
+                 in self.conn.execute('SELECT path, size, mtime_ns FROM files')}
+        changed = []
+        seen = set()
+        for entry in scan_tree(self.root, skip_dirs):
+            if entry.is_dir or not is_indexable(entry.name, entry.size):
+                continue
+            seen.add(entry.path)
+            if known.get(entry.path) != (entry.size, entry.mtime_ns):
+                changed.append(entry)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for entry, file_words in zip(changed, pool.map(lambda e: _read_words(e.path), changed)):
+                if file_words is not None:
+                    self._store(entry.path, entry.size, entry.mtime_ns, file_words)
+
+        removed = [path for path in known if path not in seen]
+        for path in removed:
+            self._forget(path)
+        self.conn.commit()
+        return len(changed), len(removed)
+
+    def refresh(self, paths):
+        """Reindex specific files right after they were edited"""
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                self._forget(str(path))
+                continue
+            file_words = _read_words(path)
+            if file_words is not None:
+                self._store(str(path), stat.st_size, stat.st_mtime_ns, file_words)
+        self.conn.commit()
+
+    def candidates(self, text):
+        """Indexed files containing every word of text, smallest posting list first"""
+        query_words = words(text)
+        if not query_words:
+            return sorted(path for path, in self.conn.execute('SELECT path FROM files'))
+
+        postings = []
+        for word in query_words:
+            file_ids = {file_id for file_id, in self.conn.execute(
+                'SELECT file_id FROM postings WHERE word = ?', (word,))}
+            if not file_ids:
+                return []
+            postings.append(file_ids)
+        postings.sort(key=len)
+        file_ids = set.intersection(*postings)
+
+        file_ids = sorted(file_ids)
+        paths = []
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(file_ids), 500):
+            chunk = file_ids[start:start + 500]
+            paths.extend(path for path, in self.conn.execute(
+                f"SELECT path FROM files WHERE id IN ({','.join('?' * len(chunk))})", chunk))
+        return sorted(paths)
+
+    def references(self, text):
+        """Files that contain text exactly, with occurrence counts"""
+        found = {}
+        for path in self.candidates(text):
+            try:
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    count = f.read().count(text)
+            except OSError:
+                continue
+            if count:
+                found[path] = count
+        return found
+
+    def replace(self, old, new, exclude=(), only=None):
+        """Replace old with new in every file that references it; returns {path: count}
+
+        With only, files outside that collection are left alone.
+        """
+        exclude = {os.path.realpath(path) for path in exclude}
+        if only is not None:
+            only = {os.path.realpath(path) for path in only}
+        replaced = {}
+        for path, count in self.references(old).items():
+            if os.path.realpath(path) in exclude or (only is not None and os.path.realpath(path) not in only):
+                continue
+            try:
+                content = Path(path).read_text(encoding='utf-8')
+                Path(path).write_text(content.replace(old, new), encoding='utf-8')
+                replaced[path] = count
+            except (OSError, UnicodeDecodeError) as e:
+                log_action(f"Error updating references in {path}: {e}")
+        self.refresh(replaced)
+        return replaced
+
+
+def find_references(text, root=WEB_APP_PATH):
+    """Bring the index up to date and return {path: count} of files mentioning text"""
+    with ReferenceIndex(root) as index:
+        index.update()
+        return index.references(text)
+
+
+def replace_references(old, new, root=WEB_APP_PATH, exclude=(), only=None):
+    """Bring the index up to date and rewrite old to new wherever it is referenced
+
+    Files in exclude, such as the calling script, are left alone. only
+    restricts the rewrite to a curated list of files; the index then just
+    skips the ones that no longer mention old.
+    """
+    with ReferenceIndex(root) as index:
+        index.update()
+        replaced = index.replace(old, new, exclude, only)
+    for path, count in replaced.items():
+        log_action(f"Replaced {count} references to {old} in {path}")
+    return replaced
+
+
+def main():
+    """Command line entry point"""
+    args = sys.argv[1:]
+    command = args[0] if args else None
+
+    if command == 'build':
+        start = time.perf_counter()
+        with ReferenceIndex() as index:
+            reindexed, removed = index.update()
+            total = index.conn.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+        print(f"Indexed {total} files ({reindexed} reindexed, {removed} removed) "
+              f"in {time.perf_counter() - start:.2f} s")
+    elif command == 'query' and len(args) == 2:
+        start = time.perf_counter()
+        found = find_references(args[1])
+        for path, count in found.items():
+            print(f"  {os.path.relpath(path, WEB_APP_PATH)}: {count}")
+        print(f"{len(found)} files reference {args[1]!r} ({(time.perf_counter() - start) * 1000:.0f} ms)")
+    elif command == 'replace' and len(args) == 3:
+        replaced = replace_references(args[1], args[2])
+        print(f"Updated {sum(replaced.values())} references in {len(replaced)} files")
+    else:
+        print(__doc__)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ import sys
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 from scripts.logger import log_action
+from scripts.reference_index import WEB_APP_PATH, find_references
 
 # Files to process (excluding backups and node_modules)
 files_to_process = [
@@ -82,7 +83,13 @@ def main():
     total_replacements = 0
     files_modified = 0
     
+    # The reference index narrows the curated list to files that still
+    # mention .env.local, so the rest are never opened
+    referencing = {os.path.realpath(path) for path in find_references('.env.local')}
     for file_path in files_to_process:
+        if os.path.realpath(WEB_APP_PATH / file_path) not in referencing:
+            continue
+        file_path = WEB_APP_PATH / file_path
         if os.path.exists(file_path):
             count = replace_env_local(file_path)
             if count > 0:
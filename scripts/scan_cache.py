@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Persistent SQLite catalog that makes repeat directory scans incremental
+Every directory is still stat'ed, but one whose mtime is unchanged since the last scan
+is served from the catalog instead of being listed again
+
+Usage:
+    python3 scan_cache.py [directory]
+"""
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.logger import log_action
+from scripts.fs_scanner import ScanEntry, SCAN_WORKERS, _list_directory
+
+CACHE_PATH = Path("/app/main/web_app/logs/scan_cache.db")
+
+CACHE_VERSION = 1
+
+# A directory modified this close to the scan may change again within the
+# same mtime tick, so its listing is not trusted on the next run
+RACY_WINDOW_NS = 2 * 10**9
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS directories (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS entries (
+    parent TEXT NOT NULL,
+    name TEXT NOT NULL,
+    is_dir INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    device INTEGER NOT NULL,
+    hash TEXT,
+    PRIMARY KEY (parent, name)
+) WITHOUT ROWID;
+"""
+
+
+def _stat_directory(path, rel_path, cached_mtime, skip_dirs):
+    """Stat a directory and list it only if it changed since it was cataloged
+
+    Returns (mtime_ns, entries, subdirs); entries is None when the cached
+    listing is still valid.
+    """
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError as e:
+        log_action(f"Error scanning {path}: {e}")
+        return None, [], []
+    if mtime_ns == cached_mtime:
+        return mtime_ns, None, None
+    entries, subdirs = _list_directory(path, rel_path, skip_dirs)
+    return mtime_ns, entries, subdirs
+
+
+class ScanCache:
+    """Catalog of path, size, mtime, inode and optional content hash
+
+    Rows are keyed by absolute parent directory, so scans of different
+    roots share one catalog.
+    """
+
+    def __init__(self, cache_path=CACHE_PATH):
+        self.cache_path = Path(cache_path)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.cache_path))
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        if self.conn.execute('PRAGMA user_version').fetchone()[0] != CACHE_VERSION:
+            self.conn.executescript(
+                'DROP TABLE IF EXISTS directories; DROP TABLE IF EXISTS entries;'
+                + SCHEMA + f'PRAGMA user_version={CACHE_VERSION};'
+            )
+        self.dirs_listed = 0
+        self.dirs_reused = 0
+
+    def close(self):
+        """Commit and close the catalog"""
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _cached_entries(self, path, rel_path, skip_dirs):
+        """Rebuild the entries and subdirectories of a directory from the catalog"""
+        entries = []
+        subdirs = []
+        rows = self.conn.execute(
+            'SELECT name, is_dir, size, mtime_ns, inode, device FROM entries WHERE parent = ?',
+            (path,)
+        )
+        for name, is_dir, size, mtime_ns, inode, device in rows:
+            entry_path = os.path.join(path, name)
+            entry_rel_path = f"{rel_path}/{name}" if rel_path else name
+            entries.append(ScanEntry(entry_path, entry_rel_path, name, bool(is_dir), size, mtime_ns, inode, device))
+            if is_dir and name not in skip_dirs:
+                subdirs.append((entry_path, entry_rel_path))
+        return entries, subdirs
+
+    def _store_listing(self, path, mtime_ns, entries, scan_start_ns):
+        """Replace a directory's cataloged listing, keeping still-valid hashes"""
+        old = {
+            name: (is_dir, size, mtime, hash_value)
+            for name, is_dir, size, mtime, hash_value in self.conn.execute(
+                'SELECT name, is_dir, size, mtime_ns, hash FROM entries WHERE parent = ?', (path,)
+            )
+        }
+        names = {entry.name for entry in entries}
+
+        # Forget subtrees of directories that disappeared
+        for name, (is_dir, _, _, _) in old.items():
+            if is_dir and name not in names:
+                self._forget_tree(os.path.join(path, name))
+
+        rows = []
+        for entry in entries:
+            previous = old.get(entry.name)
+            hash_value = None
+            if previous and previous[1:3] == (entry.size, entry.mtime_ns):
+                hash_value = previous[3]
+            rows.append((path, entry.name, int(entry.is_dir), entry.size, entry.mtime_ns,
+                         entry.inode, entry.device, hash_value))
+
+        self.conn.execute('DELETE FROM entries WHERE parent = ?', (path,))
+        self.conn.executemany('INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+        # Racily-clean directories are listed again next time
+        trusted_mtime = mtime_ns if mtime_ns < scan_start_ns - RACY_WINDOW_NS else -1
+        self.conn.execute('INSERT OR REPLACE INTO directories VALUES (?, ?)', (path, trusted_mtime))
+
+    def _forget_tree(self, path):
+        """Drop every cataloged row at or below a directory"""
+        pattern = path.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '/%'
+        self.conn.execute("DELETE FROM directories WHERE path = ? OR path LIKE ? ESCAPE '\\'", (path, pattern))
+        self.conn.execute("DELETE FROM entries WHERE parent = ? OR parent LIKE ? ESCAPE '\\'", (path, pattern))
+
+    def scan(self, root, skip_dirs=(), workers=SCAN_WORKERS):
+        """Yield a ScanEntry for every file and directory below root
+
+        Produces the same stream as fs_scanner.scan_tree. Directories are
+        stat'ed concurrently; only those whose mtime changed are listed,
+        and the catalog is updated from the new listings. Changes that do
+        not touch a directory's mtime, such as a file rewritten in place,
+        are picked up once something else in that directory changes.
+        """
+        root = os.path.abspath(root)
+        skip_dirs = frozenset(skip_dirs)
+        scan_start_ns = time.time_ns()
+        cached_mtimes = dict(self.conn.execute('SELECT path, mtime_ns FROM directories'))
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                def submit(path, rel_path):
+                    future = pool.submit(_stat_directory, path, rel_path, cached_mtimes.get(path), skip_dirs)
+                    pending[future] = (path, rel_path)
+
+                pending = {}
+                submit(root, '')
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        path, rel_path = pending.pop(future)
+                        mtime_ns, entries, subdirs = future.result()
+                        if mtime_ns is None:
+                            self._forget_tree(path)
+                            continue
+                        if entries is None:
+                            self.dirs_reused += 1
+                            entries, subdirs = self._cached_entries(path, rel_path, skip_dirs)
+                        else:
+                            self.dirs_listed += 1
+                            self._store_listing(path, mtime_ns, entries, scan_start_ns)
+                        for subdir_path, subdir_rel_path in subdirs:
+                            submit(subdir_path, subdir_rel_path)
+                        yield from entries
+        finally:
+            self.conn.commit()
+
+    def refresh(self, entry):
+        """Bring the catalog row of a freshly stat'ed entry up to date
+
+        Entries served from the catalog miss files rewritten in place; a
+        row whose size or mtime differs is corrected and its stored hash
+        dropped.
+        """
+        self.conn.execute(
+            'UPDATE entries SET size = ?, mtime_ns = ?, hash = NULL '
+            'WHERE parent = ? AND name = ? AND (size != ? OR mtime_ns != ?)',
+            (entry.size, entry.mtime_ns, os.path.dirname(entry.path), entry.name, entry.size, entry.mtime_ns)
+        )
+
+    def cached_hash(self, entry):
+        """Stored content hash for an entry, if the file on disk still has its size and mtime"""
+        try:
+            stat = os.stat(entry.path)
+        except OSError:
+            return None
+        row = self.conn.execute(
+            'SELECT size, mtime_ns, hash FROM entries WHERE parent = ? AND name = ?',
+            (os.path.dirname(entry.path), entry.name)
+        ).fetchone()
+        current = (stat.st_size, stat.st_mtime_ns)
+        if row and (row[0], row[1]) == current == (entry.size, entry.mtime_ns):
+            return row[2]
+        return None
+
+    def store_hashes(self, hashes):
+        """Record content hashes for (entry, hash) pairs"""
+        self.conn.executemany(
+            'UPDATE entries SET hash = ? WHERE parent = ? AND name = ? AND size = ? AND mtime_ns = ?',
+            [(hash_value, os.path.dirname(entry.path), entry.name, entry.size, entry.mtime_ns)
+             for entry, hash_value in hashes]
+        )
+        self.conn.commit()
+
+
+def main():
+    """Command line entry point: scan a tree twice and compare timings"""
+    root = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("/app/main/web_app")
+
+    with ScanCache() as cache:
+        for label in ('First scan', 'Second scan'):
+            cache.dirs_listed = cache.dirs_reused = 0
+            start = time.perf_counter()
+            count = sum(1 for _ in cache.scan(root))
+            elapsed = time.perf_counter() - start
+            print(f"{label}: {count:,} entries in {elapsed:.2f} s "
+                  f"({cache.dirs_listed:,} dirs listed, {cache.dirs_reused:,} reused)")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ import json
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
 from scripts.logger import log_action
+from scripts.migration_report import MigrationReportWriter, iter_records
 
 # Context-aware replacements
 def smart_replace(content, file_path):
@@ -124,7 +125,8 @@ SKIP_FILES = [
     'package-lock.json',
     'yarn.lock',
     'pnpm-lock.yaml',
-    'firebase_migration_report.json'
+    'firebase_migration_report.json',
+    'firebase_migration_report.jsonl'
 ]
 
 def create_backup(file_path):
@@ -213,33 +215,26 @@ def process_file(file_path, restore_first=True):
 
 def find_modified_files():
     """Find all files that were modified in the previous migration"""
-    report_path = Path("/app/main/web_app/logs/firebase_migration_report.json")
+    logs_dir = Path("/app/main/web_app/logs")
+    report_path = logs_dir / "firebase_migration_report.jsonl"
     
     if report_path.exists():
-        with open(report_path, 'r') as f:
+        return [Path(record['path']) for record in iter_records(report_path, 'modified')]
+    
+    # Reports written before the JSONL format
+    legacy_report_path = logs_dir / "firebase_migration_report.json"
+    if legacy_report_path.exists():
+        with open(legacy_report_path, 'r') as f:
             report = json.load(f)
         
         return [Path(file_info['path']) for file_info in report.get('modified_files', [])]
     
     return []
 
-def generate_report(results):
-    """Generate a migration report"""
-    report = {
-        "migration_date": datetime.now().isoformat(),
-        "migration_type": "smart_replacement",
-        "files_processed": results['files_processed'],
-        "files_modified": results['files_modified'],
-        "total_replacements": results['total_replacements'],
-        "modified_files": results['modified_files'],
-        "errors": results['errors']
-    }
-    
-    report_path = Path("/app/main/web_app/logs/smart_firebase_migration_report.json")
-    with open(report_path, 'w') as f:
-        json.dump(report, f, indent=2, default=str)
-    
-    return report_path
+def open_report():
+    """Open the streaming smart migration report"""
+    report_path = Path("/app/main/web_app/logs/smart_firebase_migration_report.jsonl")
+    return MigrationReportWriter(report_path, "smart_replacement")
 
 def main():
     """Main migration function"""
@@ -249,14 +244,12 @@ def main():
     modified_files = find_modified_files()
     log_action(f"Found {len(modified_files)} files from previous migration")
     
-    # Process results
-    results = {
-        'files_processed': 0,
-        'files_modified': 0,
-        'total_replacements': 0,
-        'modified_files': [],
-        'errors': []
-    }
+    # Records are streamed to the report as they happen; only counters
+    # and a short preview of modified files are kept in memory
+    report = open_report()
+    report.update_summary(files_processed=0)
+    results = report.summary
+    modified_preview = []
     
     # Process each previously modified file
     for file_path in modified_files:
@@ -275,21 +268,21 @@ def main():
             results['files_processed'] += 1
             
             if modified:
-                results['files_modified'] += 1
-                results['total_replacements'] += count
-                results['modified_files'].append({
-                    'path': str(file_path),
-                    'replacements': count
-                })
+                report.record_modified(file_path, count)
+                if len(modified_preview) < 10:
+                    modified_preview.append({
+                        'path': str(file_path),
+                        'replacements': count
+                    })
                 log_action(f"Modified {file_path} with {count} smart replacements")
         except Exception as e:
             error_msg = f"Error processing {file_path}: {str(e)}"
             log_action(error_msg)
-            results['errors'].append(error_msg)
+            report.record_error(error_msg)
     
-    # Generate report
-    report_path = generate_report(results)
-    log_action(f"Smart migration report saved to: {report_path}")
+    # Finalize report
+    report.close()
+    log_action(f"Smart migration report saved to: {report.report_path}")
     
     # Print summary
     print("\n" + "="*50)
@@ -298,14 +291,14 @@ def main():
     print(f"Files processed: {results['files_processed']}")
     print(f"Files modified: {results['files_modified']}")
     print(f"Total replacements: {results['total_replacements']}")
-    print(f"Errors: {len(results['errors'])}")
+    print(f"Errors: {results['errors']}")
     
-    if results['modified_files']:
+    if modified_preview:
         print("\nModified files:")
-        for file_info in results['modified_files'][:10]:  # Show first 10
+        for file_info in modified_preview:  # Show first 10
             print(f"  - {file_info['path']} ({file_info['replacements']} replacements)")
-        if len(results['modified_files']) > 10:
-            print(f"  ... and {len(results['modified_files']) - 10} more")
+        if results['files_modified'] > 10:
+            print(f"  ... and {results['files_modified'] - 10} more")
     
     log_action("Smart migration completed!")
     
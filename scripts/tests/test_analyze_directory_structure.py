@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the cleanup plan generated from a copy of this repository
+"""
+import contextlib
+import io
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add repository root to path
+REPO_ROOT = Path(__file__).parent.parent.parent
+sys.path.append(str(REPO_ROOT))
+from scripts.analyze_directory_structure import generate_cleanup_plan
+
+# Every path the analyzer plans to delete from this repository. A change
+# here is a change in what execute_cleanup.py would quarantine.
+EXPECTED_DELETIONS = [
+    'QUICK_DEPLOY.txt',
+    'Web_App_Instructions',
+    'backup/README_supabase_backup_20250716_211102.md',
+    'backup/pre_nextjs_20250715_160335/.gitignore',
+    'backup/pre_nextjs_20250715_160335/Web_App_Instructions',
+    'backup/pre_nextjs_20250715_160335/scripts/configure_cli.py',
+    'backup/pre_nextjs_20250715_160335/scripts/install_cli_tools.py',
+    'backup/pre_nextjs_20250715_160335/scripts/setup_github.py',
+    'backup/pre_nextjs_20250715_160335/scripts/track_progress.py',
+    'backup/pre_nextjs_20250715_160335/scripts/update_progress.py',
+    'deploy.sh',
+    'scripts/final_category_test.js',
+    'scripts/migrate_supabase_to_firebase.py',
+    'scripts/smart_firebase_migration.py',
+    'scripts/test_google_cloud_complete.py',
+    'scripts/test_google_connection.py',
+    'staging_app/input/',
+    'temp/',
+]
+
+
+@pytest.fixture(scope='module')
+def repo_plan(tmp_path_factory):
+    """Cleanup plan for a copy of the tracked files of this repository"""
+    try:
+        tracked = subprocess.run(['git', 'ls-files', '-z'], cwd=REPO_ROOT, capture_output=True,
+                                 check=True).stdout.decode().split('\0')
+    except (OSError, subprocess.CalledProcessError):
+        pytest.skip('git checkout required')
+    root = tmp_path_factory.mktemp('web_app')
+    for rel_path in filter(None, tracked):
+        source = REPO_ROOT / rel_path
+        if source.is_file():
+            (root / rel_path).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, root / rel_path)
+    (root / 'logs').mkdir(exist_ok=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return generate_cleanup_plan(root)
+
+
+def test_planned_deletions_are_pinned(repo_plan):
+    assert repo_plan['cleanup_recommendations']['files_to_delete'] == EXPECTED_DELETIONS
+
+
+def test_test_suites_are_never_deleted(repo_plan):
+    deletions = repo_plan['cleanup_recommendations']['files_to_delete']
+    assert not [path for path in deletions if path.startswith(('tests/', 'scripts/tests/'))]
+
+
+def test_duplicates_are_reported_but_only_backup_copies_deleted(repo_plan):
+    recommendations = repo_plan['cleanup_recommendations']
+    groups = {group['keep']: group['duplicates'] for group in recommendations['duplicate_files']}
+    assert groups['public/assets/logo/true_harmonic_logo_transparent.png'] == \
+        ['assets/logo/true_harmonic_logo_transparent.png']
+    assert groups['scripts/configure_cli.py'] == ['backup/pre_nextjs_20250715_160335/scripts/configure_cli.py']
+    assert recommendations['reclaimable_bytes'] == sum(group['reclaimable_bytes']
+                                                        for group in recommendations['duplicate_files'])
+
+    deletions = set(recommendations['files_to_delete'])
+    assert 'assets/logo/true_harmonic_logo_transparent.png' not in deletions
+    assert 'backup/pre_nextjs_20250715_160335/scripts/configure_cli.py' in deletions
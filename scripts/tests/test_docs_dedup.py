@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for MinHash/LSH near-duplicate detection and doc consolidation
+"""
+import os
+import random
+import sys
+from pathlib import Path
+
+# Add repository root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from scripts import docs_dedup
+from scripts.consolidate_docs import consolidate_related_docs
+from scripts.docs_dedup import (
+    estimate_similarity, find_near_duplicates, minhash_signature, unique_paragraphs
+)
+
+WORDS = [f"word{index}" for index in range(5000)]
+
+
+def document(seed, length=400):
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(WORDS) for _ in range(length))
+
+
+def edited(text, changes, seed=0):
+    """Copy of text with a few words replaced"""
+    rng = random.Random(seed)
+    words = text.split()
+    for index in rng.sample(range(len(words)), changes):
+        words[index] = 'edited'
+    return ' '.join(words)
+
+
+def write_docs(root, docs, mtimes=None):
+    paths = []
+    for index, (name, text) in enumerate(docs.items()):
+        path = root / name
+        path.write_text(text)
+        stamp = (mtimes or {}).get(name, 1_600_000_000 + index)
+        os.utime(path, (stamp, stamp))
+        paths.append(path)
+    return paths
+
+
+def test_lsh_banding_matches_the_threshold():
+    bands, rows = docs_dedup.LSH_BANDS, docs_dedup.LSH_ROWS
+
+    def collision(similarity):
+        return 1 - (1 - similarity ** rows) ** bands
+
+    # Pairs above the threshold almost always become candidates
+    assert collision(docs_dedup.SIMILARITY_THRESHOLD) > 0.999
+    assert collision(0.7) > 0.95
+
+
+def test_signatures_estimate_jaccard_similarity():
+    a = set(range(1000))
+    b = set(range(200, 1200))
+    # Jaccard = 800 / 1200
+    estimate = estimate_similarity(minhash_signature(a), minhash_signature(b))
+    assert abs(estimate - 800 / 1200) < 0.15
+    assert estimate_similarity(minhash_signature(a), minhash_signature(a)) == 1.0
+
+
+def test_near_duplicates_cluster_under_the_newest_copy(tmp_path):
+    guide = document(1)
+    paths = write_docs(tmp_path, {
+        'guide.md': guide,
+        'guide_backup_20250101.md': edited(guide, 3),
+        'guide_copy.md': edited(guide, 4, seed=1),
+        'unrelated.md': document(2),
+        'empty.md': '',
+    }, mtimes={'guide_copy.md': 1_700_000_000})
+
+    clusters = find_near_duplicates(paths)
+
+    assert len(clusters) == 1
+    cluster = clusters[0]
+    assert Path(cluster['canonical']).name == 'guide_copy.md'
+    assert sorted(Path(member['path']).name for member in cluster['members']) == \
+        ['guide.md', 'guide_backup_20250101.md']
+    assert all(member['similarity'] >= docs_dedup.SIMILARITY_THRESHOLD for member in cluster['members'])
+
+
+def test_loosely_related_docs_stay_apart(tmp_path):
+    base = document(3)
+    # Roughly a third of the words replaced: well under the threshold
+    paths = write_docs(tmp_path, {'a.md': base, 'b.md': edited(base, 130)})
+    assert find_near_duplicates(paths) == []
+
+
+def test_unique_paragraphs_ignore_reflowed_copies():
+    canonical = "# Title\n\nFirst paragraph here.\n\nSecond paragraph."
+    copy = "# Title\n\nFirst paragraph\nhere.\n\nOnly in the copy.\n\nSecond paragraph.\n\nOnly in the copy."
+    assert unique_paragraphs(copy, canonical) == ['Only in the copy.']
+    assert unique_paragraphs(canonical, canonical) == []
+
+
+def test_consolidation_merges_unique_content_of_near_duplicates(tmp_path):
+    plan = '\n\n'.join(document(seed, 80) for seed in range(10, 20))
+    extra = 'Rollout checklist that only the older copy has.'
+    write_docs(tmp_path, {
+        'implementation_guide.md': plan + '\n\n' + extra,
+        'implementation_plan.md': plan,
+        'video-algorithm-prompt.md': document(30),
+        'IMPLEMENTATION_STATUS.md': document(31),
+    }, mtimes={'implementation_plan.md': 1_700_000_000})
+
+    consolidate_related_docs(tmp_path)
+    consolidated = (tmp_path / 'CONSOLIDATED_IMPLEMENTATION.md').read_text()
+
+    # The canonical plan appears once, the older copy adds only what the plan lacks
+    assert consolidated.count('## From implementation_plan.md') == 1
+    assert consolidated.count(document(10, 80)) == 1
+    assert consolidated.count(extra) == 1
+    assert '## From implementation_guide.md' in consolidated
+    assert '## From video-algorithm-prompt.md' in consolidated
+    # Docs outside the implementation list are never pulled in
+    assert 'IMPLEMENTATION_STATUS.md' not in consolidated
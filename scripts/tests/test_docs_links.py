@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for docs link validation and link rewriting on moves
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add repository root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from scripts.docs_links import LinkGraph
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Repository with docs/ and a README linking into it"""
+    docs = tmp_path / 'docs'
+    (docs / 'guides').mkdir(parents=True)
+    (docs / 'guides' / 'setup.md').write_text('# Setup\n\n## Install steps\n')
+    (docs / 'index.md').write_text(
+        '# Index\n\n'
+        '[setup](guides/setup.md#install-steps)\n'
+        '[absolute](/docs/guides/setup.md)\n'
+        '[missing](/docs/nowhere.md)\n'
+        '[readme](/README.md)\n'
+    )
+    (tmp_path / 'README.md').write_text('# Readme\n')
+    return tmp_path
+
+
+def graph(repo):
+    return LinkGraph(repo / 'docs', cache_path=repo / 'cache.json').build()
+
+
+def test_root_relative_links_resolve_against_the_repository(repo):
+    broken = graph(repo).validate()
+    assert [(link['line'], link['target']) for link in broken] == [(5, '/docs/nowhere.md')]
+
+
+def test_moves_keep_root_relative_links_root_relative(repo):
+    links = graph(repo)
+    rewritten = links.move({repo / 'docs' / 'guides' / 'setup.md': repo / 'docs' / 'setup' / 'setup.md'})
+
+    assert rewritten == 2
+    index = (repo / 'docs' / 'index.md').read_text()
+    assert '[setup](setup/setup.md#install-steps)' in index
+    assert '[absolute](/docs/setup/setup.md)' in index
+    assert [link['target'] for link in links.validate()] == ['/docs/nowhere.md']
+
+
+def test_rewritten_targets_are_url_quoted(repo):
+    links = graph(repo)
+    new_path = repo / 'docs' / 'Setup Guide (old).md'
+    links.move({repo / 'docs' / 'guides' / 'setup.md': new_path})
+
+    index = (repo / 'docs' / 'index.md').read_text()
+    assert '[setup](Setup%20Guide%20%28old%29.md#install-steps)' in index
+    assert '[absolute](/docs/Setup%20Guide%20%28old%29.md)' in index
+    # The quoted targets still parse and resolve
+    assert [link['target'] for link in graph(repo).validate()] == ['/docs/nowhere.md']
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the staged byte-identical duplicate finder
+"""
+import os
+import sys
+from pathlib import Path
+
+# Add repository root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from scripts import duplicate_finder
+from scripts.duplicate_finder import PARTIAL_BYTES, SizeIndex, find_duplicate_files
+from scripts.fs_scanner import scan_tree
+
+
+def write(root, rel_path, data):
+    path = root / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def groups_by_keep(root, **options):
+    return {group['keep']: group for group in find_duplicate_files(scan_tree(root), root, **options)}
+
+
+def test_stages_only_fully_hash_large_collisions(tmp_path, monkeypatch):
+    large = os.urandom(3 * PARTIAL_BYTES)
+    # Same size, first and last 64 KB, different middle
+    middle_differs = large[:PARTIAL_BYTES] + bytes(PARTIAL_BYTES) + large[-PARTIAL_BYTES:]
+    write(tmp_path, 'video.mp4', large)
+    write(tmp_path, 'copies/video.mp4', large)
+    write(tmp_path, 'other.mp4', middle_differs)
+    write(tmp_path, 'a.txt', b'same small')
+    write(tmp_path, 'b.txt', b'same small')
+    write(tmp_path, 'c.txt', b'diff small')
+    write(tmp_path, 'unique.bin', os.urandom(5000))
+    write(tmp_path, 'empty1', b'')
+    write(tmp_path, 'empty2', b'')
+
+    hashed_whole = []
+    full_hash = duplicate_finder.full_hash
+    monkeypatch.setattr(duplicate_finder, 'full_hash', lambda path: hashed_whole.append(path) or full_hash(path))
+
+    groups = groups_by_keep(tmp_path)
+
+    assert sorted(groups) == ['a.txt', 'video.mp4']
+    assert groups['a.txt']['duplicates'] == ['b.txt']
+    assert groups['video.mp4']['duplicates'] == ['copies/video.mp4']
+    assert groups['video.mp4']['reclaimable_bytes'] == len(large)
+    # Small files are settled by the partial hash; only the three large ones are read whole
+    assert sorted(Path(path).relative_to(tmp_path).as_posix() for path in hashed_whole) == \
+        ['copies/video.mp4', 'other.mp4', 'video.mp4']
+
+
+def test_hard_links_are_not_duplicates(tmp_path):
+    original = write(tmp_path, 'original.bin', b'x' * 100)
+    os.link(original, tmp_path / 'linked.bin')
+    assert find_duplicate_files(scan_tree(tmp_path), tmp_path) == []
+
+
+def test_keep_priority(tmp_path):
+    data = b'identical content'
+    for rel_path in ['backup/old/a.js', 'archive/a.js', 'src/lib/deep/a.js', 'src/a.js', 'lib/a.js']:
+        write(tmp_path, rel_path, data)
+
+    # Outside backups, then shallowest, then by name
+    group = find_duplicate_files(scan_tree(tmp_path), tmp_path)[0]
+    assert group['keep'] == 'lib/a.js'
+    assert group['duplicates'] == ['src/a.js', 'src/lib/deep/a.js', 'archive/a.js', 'backup/old/a.js']
+    assert group['reclaimable_bytes'] == 4 * len(data)
+
+    # A protected copy wins even when deeper or inside a backup
+    group = find_duplicate_files(scan_tree(tmp_path), tmp_path,
+                                 protected=lambda path: path.startswith('backup/'))[0]
+    assert group['keep'] == 'backup/old/a.js'
+    assert group['duplicates'][0] == 'lib/a.js'
+
+
+def test_groups_sorted_by_reclaimable_bytes(tmp_path):
+    for index in range(3):
+        write(tmp_path, f"small{index}.txt", b's' * 10)
+    for index in range(2):
+        write(tmp_path, f"large{index}.txt", b'l' * 1000)
+
+    groups = find_duplicate_files(scan_tree(tmp_path), tmp_path)
+    assert [group['keep'] for group in groups] == ['large0.txt', 'small0.txt']
+    assert [group['reclaimable_bytes'] for group in groups] == [1000, 20]
+
+
+def test_size_index_keeps_only_paths_and_restats_collisions(tmp_path):
+    write(tmp_path, 'unique.txt', b'only one of this size')
+    write(tmp_path, 'a.txt', b'1234')
+    write(tmp_path, 'b.txt', b'abcd')
+    write(tmp_path, 'c.txt', b'abcd')
+    write(tmp_path, 'empty', b'')
+
+    index = SizeIndex(tmp_path)
+    for entry in scan_tree(tmp_path):
+        index.add(entry)
+    assert index.files == 4
+    assert all(isinstance(paths, (str, list)) for paths in index._paths.values())
+
+    # Rewritten after indexing: a.txt grows and no longer collides
+    write(tmp_path, 'a.txt', b'12345')
+    groups = find_duplicate_files(index)
+    assert [(group['keep'], group['duplicates']) for group in groups] == [('b.txt', ['c.txt'])]
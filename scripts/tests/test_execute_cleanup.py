@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Tests for executing and undoing cleanup plans on a throwaway web app tree
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add repository root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from scripts import execute_cleanup
+
+
+@pytest.fixture
+def web_app(tmp_path, monkeypatch):
+    root = tmp_path / 'web_app'
+    root.mkdir()
+    monkeypatch.setattr(execute_cleanup, 'WEB_APP_PATH', root)
+    monkeypatch.setattr(execute_cleanup, 'JOURNAL_DIR', root / 'logs' / 'cleanup_journals')
+    monkeypatch.setattr(execute_cleanup, 'QUARANTINE_DIR', root / '.quarantine')
+    monkeypatch.setattr(execute_cleanup, 'start_background_purge', lambda: None)
+    return root
+
+
+def write(root, rel_path, text):
+    path = root / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def snapshot(root):
+    """{relative path: contents} of every file outside logs/ and .quarantine/"""
+    return {
+        path.relative_to(root).as_posix(): path.read_text()
+        for path in root.rglob('*')
+        if path.is_file() and path.relative_to(root).parts[0] not in ('logs', '.quarantine')
+    }
+
+
+def write_plan(root, deletions=(), moves=()):
+    plan_path = root / 'logs' / 'cleanup_plan.json'
+    plan_path.parent.mkdir(parents=True, exist_ok=True)
+    plan_path.write_text(json.dumps({
+        'cleanup_recommendations': {'files_to_delete': list(deletions)},
+        'organization_plan': {'move_operations': [{'from': source, 'to': target} for source, target in moves]},
+    }))
+    return plan_path
+
+
+def test_run_and_undo_round_trip(web_app):
+    files = {
+        'old_notes.md': 'notes',
+        'backup/site/index.html': 'old index',
+        'backup/site/app.js': 'old app',
+        'setup_guide.md': 'guide',
+        'scripts/debug_tool.py': 'print(1)',
+        'package.json': '{}',
+        'public/logo.svg': '<svg/>',
+    }
+    for rel_path, text in files.items():
+        write(web_app, rel_path, text)
+    plan_path = write_plan(
+        web_app,
+        deletions=['old_notes.md', 'backup/', 'backup/site/app.js', 'package.json', 'public/logo.svg'],
+        moves=[('setup_guide.md', 'documentation/setup_guide.md'),
+               ('scripts/debug_tool.py', 'scripts/debug/debug_tool.py')],
+    )
+
+    run_id = execute_cleanup.execute_plan(plan_path)
+
+    after = snapshot(web_app)
+    assert after == {
+        'package.json': '{}',
+        'public/logo.svg': '<svg/>',
+        'documentation/setup_guide.md': 'guide',
+        'scripts/debug/debug_tool.py': 'print(1)',
+    }
+    quarantine = web_app / '.quarantine' / run_id
+    assert (quarantine / 'old_notes.md').read_text() == 'notes'
+    assert (quarantine / 'backup' / 'site' / 'app.js').read_text() == 'old app'
+
+    execute_cleanup.undo_run(run_id)
+
+    assert snapshot(web_app) == files
+    assert not (web_app / 'documentation').exists()
+    assert not (web_app / 'scripts' / 'debug').exists()
+    assert not (web_app / '.quarantine').exists()
+
+
+def test_dry_run_changes_nothing(web_app):
+    write(web_app, 'old_notes.md', 'notes')
+    plan_path = write_plan(web_app, deletions=['old_notes.md'])
+
+    execute_cleanup.execute_plan(plan_path, dry_run=True)
+
+    assert snapshot(web_app) == {'old_notes.md': 'notes'}
+    assert not (web_app / '.quarantine').exists()
+
+
+def test_moves_to_one_target_never_overwrite(web_app):
+    write(web_app, 'README.md', 'root readme')
+    write(web_app, 'backup/old/README.md', 'backup readme')
+    plan_path = write_plan(web_app, moves=[('README.md', 'documentation/README.md'),
+                                           ('backup/old/README.md', 'documentation/README.md')])
+
+    run_id = execute_cleanup.execute_plan(plan_path)
+
+    after = snapshot(web_app)
+    assert after['documentation/README.md'] == 'root readme'
+    assert after['backup/old/README.md'] == 'backup readme'
+    assert 'README.md' not in after
+
+    execute_cleanup.undo_run(run_id)
+    assert snapshot(web_app) == {'README.md': 'root readme', 'backup/old/README.md': 'backup readme'}
+
+
+def test_moves_sharing_a_destination_share_a_group():
+    operations = [
+        ('move', 'README.md', 'documentation/README.md'),
+        ('quarantine', 'tmp/a', 'tmp/a'),
+        ('move', 'backup/old/README.md', 'documentation/README.md'),
+        ('quarantine', 'old/b', 'old/b'),
+    ]
+    groups = execute_cleanup._group_by_subtree(operations)
+    assert sorted(map(len, groups)) == [1, 1, 2]
+    assert [operations[0], operations[2]] in groups
+
+
+def test_rename_refuses_to_replace(tmp_path):
+    source = tmp_path / 'source.txt'
+    source.write_text('new')
+    destination = tmp_path / 'sub' / 'destination.txt'
+    destination.parent.mkdir()
+    destination.write_text('existing')
+
+    with pytest.raises(FileExistsError):
+        execute_cleanup._rename(source, destination)
+    assert source.read_text() == 'new' and destination.read_text() == 'existing'
+
+    directory = tmp_path / 'dir'
+    directory.mkdir()
+    (tmp_path / 'taken').mkdir()
+    with pytest.raises(OSError):
+        execute_cleanup._rename(directory, tmp_path / 'taken')
+    assert directory.is_dir()
+
+    execute_cleanup._rename(source, tmp_path / 'moved' / 'source.txt')
+    assert not source.exists() and (tmp_path / 'moved' / 'source.txt').read_text() == 'new'
+
+
+def test_runs_in_the_same_second_get_their_own_ids(web_app):
+    write(web_app, 'a.log', 'a')
+    write(web_app, 'b.log', 'b')
+    first = execute_cleanup.execute_plan(write_plan(web_app, deletions=['a.log']))
+    second = execute_cleanup.execute_plan(write_plan(web_app, deletions=['b.log']))
+
+    assert first != second
+    assert (web_app / '.quarantine' / first / 'a.log').exists()
+    assert (web_app / '.quarantine' / second / 'b.log').exists()
+
+    execute_cleanup.undo_run(first)
+    assert snapshot(web_app) == {'a.log': 'a'}
+
+
+def test_purge_drops_expired_runs_only(web_app):
+    quarantine = web_app / '.quarantine'
+    for run_id in ['20200101_000000-abc123', '20200101_000000', '29990101_000000-def456', 'unrelated']:
+        (quarantine / run_id).mkdir(parents=True)
+
+    purged = execute_cleanup.purge_quarantine()
+
+    assert sorted(purged) == ['20200101_000000', '20200101_000000-abc123']
+    assert sorted(os.listdir(quarantine)) == ['29990101_000000-def456', 'unrelated']
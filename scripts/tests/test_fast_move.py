@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for fast_move's rename and cross-filesystem copy paths
+"""
+import errno
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add repository root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from scripts import fast_move as fast_move_module
+from scripts.fast_move import fast_move
+
+
+def contents(root):
+    """{relative path: bytes, or link target for symlinks}"""
+    return {
+        path.relative_to(root).as_posix(): (os.readlink(path) if path.is_symlink() else path.read_bytes())
+        for path in root.rglob('*') if path.is_file() or path.is_symlink()
+    }
+
+
+def make_tree(root):
+    (root / 'nested' / 'deeper').mkdir(parents=True)
+    (root / 'a.bin').write_bytes(os.urandom(300_000))
+    (root / 'nested' / 'b.txt').write_text('b')
+    (root / 'nested' / 'deeper' / 'c.txt').write_text('c')
+    (root / 'empty.txt').write_text('')
+    os.symlink('a.bin', root / 'link')
+    return contents(root)
+
+
+@pytest.fixture
+def cross_device(monkeypatch):
+    """Make every rename fail as it would across filesystems"""
+    def rename(source, destination):
+        raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+    monkeypatch.setattr(fast_move_module.os, 'rename', rename)
+
+
+def test_same_filesystem_is_a_rename(tmp_path):
+    expected = make_tree(tmp_path / 'source')
+    summary = fast_move(tmp_path / 'source', tmp_path / 'moved' / 'target')
+
+    assert summary['method'] == 'rename'
+    assert not (tmp_path / 'source').exists()
+    assert contents(tmp_path / 'moved' / 'target') == expected
+
+
+def test_cross_filesystem_directory_copy(tmp_path, cross_device):
+    expected = make_tree(tmp_path / 'source')
+    summary = fast_move(tmp_path / 'source', tmp_path / 'target')
+
+    assert summary['method'] == 'copy'
+    assert summary['files'] == 4 and summary['bytes'] == 300_002
+    assert not (tmp_path / 'source').exists()
+    assert contents(tmp_path / 'target') == expected
+    assert (tmp_path / 'target' / 'link').is_symlink()
+
+
+def test_cross_filesystem_file_copy(tmp_path, cross_device):
+    (tmp_path / 'video.mp4').write_bytes(b'v' * 1000)
+    summary = fast_move(tmp_path / 'video.mp4', tmp_path / 'out' / 'video.mp4')
+
+    assert summary['method'] == 'copy' and summary['bytes'] == 1000
+    assert not (tmp_path / 'video.mp4').exists()
+    assert (tmp_path / 'out' / 'video.mp4').read_bytes() == b'v' * 1000
+
+
+def test_existing_destination_is_refused(tmp_path):
+    (tmp_path / 'source.txt').write_text('new')
+    (tmp_path / 'target.txt').write_text('existing')
+
+    with pytest.raises(FileExistsError):
+        fast_move(tmp_path / 'source.txt', tmp_path / 'target.txt')
+    assert (tmp_path / 'source.txt').read_text() == 'new'
+    assert (tmp_path / 'target.txt').read_text() == 'existing'
+
+
+def test_failed_copy_leaves_the_source(tmp_path, cross_device, monkeypatch):
+    expected = make_tree(tmp_path / 'source')
+
+    def broken_verify(files):
+        raise OSError('size mismatch')
+    monkeypatch.setattr(fast_move_module, '_verify', broken_verify)
+
+    with pytest.raises(OSError, match='size mismatch'):
+        fast_move(tmp_path / 'source', tmp_path / 'target')
+    assert not (tmp_path / 'target').exists()
+    assert contents(tmp_path / 'source') == expected
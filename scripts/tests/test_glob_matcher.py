@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Tests for the precompiled glob matcher against per-pattern fnmatch
+"""
+import sys
+from pathlib import Path
+
+# Add repository root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from scripts.analyze_directory_structure import CLEANUP_PATTERNS
+from scripts.glob_matcher import GlobMatcher, _naive_match, _synthetic_names
+
+
+def test_agrees_with_fnmatch_on_synthetic_names():
+    matcher = GlobMatcher(CLEANUP_PATTERNS)
+    for name in _synthetic_names(20_000):
+        for is_dir in (False, True):
+            assert matcher.match(name, is_dir) == _naive_match(CLEANUP_PATTERNS, name, is_dir), name
+
+
+def test_categories_in_definition_order():
+    matcher = GlobMatcher({'cleanup': ['deploy.sh', '*.tmp'], 'deployment': ['deploy*.sh'], 'documentation': ['*.txt']})
+    assert matcher.match('deploy.sh') == ['cleanup', 'deployment']
+    assert matcher.match('deploy-production.sh') == ['deployment']
+    assert matcher.match('notes.txt.tmp') == ['cleanup']
+    assert matcher.match('index.js') == []
+
+
+def test_directory_patterns_only_match_directories():
+    matcher = GlobMatcher({'cleanup': ['temp/', 'supabase', 'build*/']})
+    assert matcher.match('temp', is_dir=True) == ['cleanup']
+    assert matcher.match('temp') == []
+    assert matcher.match('build-cache', is_dir=True) == ['cleanup']
+    assert matcher.match('build-cache') == []
+    assert matcher.match('supabase') == ['cleanup']
+    assert matcher.match('supabase', is_dir=True) == ['cleanup']
+
+
+def test_special_characters_are_literal():
+    matcher = GlobMatcher({'docs': ['*.md'], 'exact': ['a+b(1).txt'], 'range': ['file[0-9].log']})
+    assert matcher.match('a+b(1).txt') == ['exact']
+    assert matcher.match('aab(1).txt') == []
+    assert matcher.match('file7.log') == ['range']
+    assert matcher.match('fileX.log') == []
+    assert matcher.match('README.md') == ['docs']
+    assert matcher.match('README.mdx') == []
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Tests for GoogleCloudHelper against the in-process fake GCS server
+"""
+import filecmp
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add repository root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from scripts import google_cloud_helper
+from scripts.fake_gcs_server import FakeGCSServer
+from scripts.google_cloud_helper import GoogleCloudHelper
+
+pytest.importorskip('google.cloud.storage')
+
+BUCKET = 'test-bucket'
+
+
+@pytest.fixture
+def helper():
+    with FakeGCSServer() as server:
+        helper = GoogleCloudHelper(endpoint=server.url)
+        assert helper.create_bucket(BUCKET) is not None
+        yield helper
+
+
+def write_random(path, size):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(os.urandom(size))
+    return path
+
+
+def test_large_file_round_trip(helper, tmp_path, monkeypatch):
+    """Files over the threshold go up as composed parts and come back as byte ranges"""
+    # Parts over 8 MB take the resumable upload path, which needs a stream at position 0
+    monkeypatch.setattr(google_cloud_helper, 'PARALLEL_THRESHOLD', 20 * 1024 * 1024)
+    monkeypatch.setattr(google_cloud_helper, 'TARGET_PART_SIZE', 9 * 1024 * 1024)
+    source = write_random(tmp_path / 'large.mp4', 25 * 1024 * 1024 + 123)
+    assert google_cloud_helper.transfer_policy(source.stat().st_size)[0] > 1
+
+    assert helper.upload_file(BUCKET, str(source), 'videos/large.mp4')
+    names = [blob.name for blob in helper.iter_files(BUCKET)]
+    assert names == ['videos/large.mp4']
+
+    restored = tmp_path / 'restored.mp4'
+    assert helper.download_file(BUCKET, 'videos/large.mp4', str(restored))
+    assert filecmp.cmp(source, restored, shallow=False)
+
+
+def test_small_files_round_trip(helper, tmp_path):
+    source = tmp_path / 'source'
+    for index in range(12):
+        write_random(source / f"dir{index % 3}" / f"file{index:02d}.bin", 1000 + index)
+
+    summary = helper.upload_many(BUCKET, [source], prefix='small')
+    assert summary['failed'] == {} and len(summary['succeeded']) == 12
+
+    listed = list(helper.iter_files(BUCKET, 'small/'))
+    summary = helper.download_many(BUCKET, listed, tmp_path / 'restored', prefix='small/source')
+    assert summary['failed'] == {} and len(summary['succeeded']) == 12
+    for path in source.rglob('*.bin'):
+        assert filecmp.cmp(path, tmp_path / 'restored' / path.relative_to(source), shallow=False)
+
+
+def test_listing_pages_fields_and_delimiter(helper, tmp_path):
+    source = tmp_path / 'tree'
+    for name in ['a.txt', 'b.txt', 'nested/c.txt', 'nested/deeper/d.txt', 'other/e.txt']:
+        write_random(source / name, 10)
+    assert not helper.upload_many(BUCKET, [source])['failed']
+
+    names = [blob.name for blob in helper.iter_files(BUCKET, 'tree/', page_size=2)]
+    assert names == sorted(f"tree/{path.relative_to(source).as_posix()}"
+                           for path in source.rglob('*') if path.is_file())
+    assert names == [blob.name for blob in helper.iter_files(BUCKET, 'tree/', page_size=2, prefetch=0)]
+
+    # The server honours ?fields=, so unrequested fields come back empty
+    blob = next(helper.iter_files(BUCKET, 'tree/', fields='name'))
+    assert blob.name == 'tree/a.txt' and blob.size is None and blob.crc32c is None
+    blob = next(helper.iter_files(BUCKET, 'tree/'))
+    assert blob.size == 10 and blob.generation and blob.crc32c
+
+    entries = list(helper.iter_files(BUCKET, 'tree/', delimiter='/'))
+    assert [entry.name for entry in entries if not isinstance(entry, str)] == ['tree/a.txt', 'tree/b.txt']
+    assert [entry for entry in entries if isinstance(entry, str)] == ['tree/nested/', 'tree/other/']
+
+    assert helper.list_files(BUCKET, 'tree/nested/') == 2
+
+
+def test_iter_files_stops_when_closed(helper, tmp_path):
+    # Two one-object pages: the fetcher is left holding the end marker with the queue full
+    source = tmp_path / 'many'
+    for index in range(2):
+        write_random(source / f"{index:02d}.txt", 1)
+    assert not helper.upload_many(BUCKET, [source])['failed']
+
+    before = set(threading.enumerate())
+    files = helper.iter_files(BUCKET, 'many/', page_size=1, prefetch=1)
+    next(files)
+    time.sleep(0.3)
+    files.close()
+    fetchers = set(threading.enumerate()) - before
+    for thread in fetchers:
+        thread.join(timeout=2)
+        assert not thread.is_alive()
+
+
+@pytest.fixture
+def checksum_cache(tmp_path, monkeypatch):
+    cache_class = google_cloud_helper.ChecksumCache
+    monkeypatch.setattr(google_cloud_helper, 'ChecksumCache', lambda: cache_class(tmp_path / 'hash_cache.json'))
+
+
+def test_sync_uploads_changes_and_deletes_orphans(helper, tmp_path, checksum_cache):
+    local = tmp_path / 'site'
+    write_random(local / 'index.html', 100)
+    write_random(local / 'assets' / 'app.js', 200)
+
+    summary = helper.sync(local, BUCKET, prefix='site')
+    assert sorted(summary['succeeded']) == ['site/assets/app.js', 'site/index.html']
+
+    summary = helper.sync(local, BUCKET, prefix='site')
+    assert summary['succeeded'] == [] and summary['unchanged'] == 2
+
+    # Same size, different content: caught by checksum
+    write_random(local / 'index.html', 100)
+    (local / 'assets' / 'app.js').unlink()
+    summary = helper.sync(local, BUCKET, prefix='site', delete=True)
+    assert summary['succeeded'] == ['site/index.html']
+    assert summary['deleted'] == ['site/assets/app.js']
+
+    restored = tmp_path / 'restored.html'
+    assert helper.download_file(BUCKET, 'site/index.html', str(restored))
+    assert filecmp.cmp(local / 'index.html', restored, shallow=False)
+    assert [blob.name for blob in helper.iter_files(BUCKET)] == ['site/index.html']
+
+
+def test_sync_refuses_sweeping_deletes(helper, tmp_path, checksum_cache):
+    empty = tmp_path / 'empty'
+    empty.mkdir()
+    write_random(tmp_path / 'keep' / 'a.txt', 10)
+    assert not helper.upload_many(BUCKET, [tmp_path / 'keep'], prefix='site')['failed']
+
+    with pytest.raises(ValueError):
+        helper.sync(tmp_path / 'keep', BUCKET, delete=True)
+    with pytest.raises(ValueError):
+        helper.sync(empty, BUCKET, prefix='site/keep', delete=True)
+    with pytest.raises(NotADirectoryError):
+        helper.sync(tmp_path / 'missing', BUCKET, prefix='site', delete=True)
+    assert [blob.name for blob in helper.iter_files(BUCKET)] == ['site/keep/a.txt']
+
+
+def test_download_many_rejects_escaping_names(helper, tmp_path):
+    write_random(tmp_path / 'payload', 10)
+    assert helper.upload_file(BUCKET, str(tmp_path / 'payload'), 'pre/../../escaped.txt')
+
+    summary = helper.download_many(BUCKET, ['pre/../../escaped.txt'], tmp_path / 'out' / 'dest', prefix='pre')
+    assert list(summary['failed']) == ['gs://test-bucket/pre/../../escaped.txt']
+    assert not (tmp_path / 'escaped.txt').exists()
+
+
+def test_benchmark_round_trip(tmp_path):
+    from scripts.benchmark_gcs import run_benchmarks
+
+    report = run_benchmarks(small_files=10, large_file_mb=1)
+    assert report['listed'] == 10 and report['mismatched'] == []
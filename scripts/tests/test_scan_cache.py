@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental scan catalog and its invalidation
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add repository root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from scripts.fs_scanner import scan_tree
+from scripts.scan_cache import ScanCache
+
+
+def age(*directories, seconds=60):
+    """Backdate directories so their listings are outside the racy window"""
+    past = time.time() - seconds
+    for directory in directories:
+        os.utime(directory, (past, past))
+
+
+def listing(entries):
+    return sorted((entry.rel_path, entry.is_dir, entry.size) for entry in entries)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / 'tree'
+    (root / 'docs' / 'archive').mkdir(parents=True)
+    (root / 'scripts').mkdir()
+    (root / 'README.md').write_text('readme')
+    (root / 'docs' / 'guide.md').write_text('guide')
+    (root / 'docs' / 'archive' / 'old.md').write_text('old')
+    (root / 'scripts' / 'tool.py').write_text('print(1)')
+    age(root, *(path for path in root.rglob('*') if path.is_dir()))
+    return root
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with ScanCache(tmp_path / 'scan_cache.db') as cache:
+        yield cache
+
+
+def scan(cache, root):
+    cache.dirs_listed = cache.dirs_reused = 0
+    return listing(cache.scan(root))
+
+
+def test_unchanged_directories_are_reused(tree, cache):
+    assert scan(cache, tree) == listing(scan_tree(tree))
+    assert (cache.dirs_listed, cache.dirs_reused) == (4, 0)
+
+    assert scan(cache, tree) == listing(scan_tree(tree))
+    assert (cache.dirs_listed, cache.dirs_reused) == (0, 4)
+
+
+def test_recently_modified_directories_are_listed_again(tree, cache):
+    (tree / 'scripts' / 'new.py').write_text('new')
+    scan(cache, tree)
+    scan(cache, tree)
+    # scripts/ changed within the racy window, so its listing is not trusted yet
+    assert (cache.dirs_listed, cache.dirs_reused) == (1, 3)
+
+
+def test_added_and_removed_entries_invalidate_their_directory(tree, cache):
+    scan(cache, tree)
+
+    (tree / 'scripts' / 'new.py').write_text('new file')
+    (tree / 'docs' / 'guide.md').unlink()
+    for path in (tree / 'docs' / 'archive').iterdir():
+        path.unlink()
+    (tree / 'docs' / 'archive').rmdir()
+    age(tree / 'scripts', tree / 'docs')
+
+    assert scan(cache, tree) == listing(scan_tree(tree))
+    assert cache.dirs_listed == 2
+    # The removed subtree is dropped from the catalog
+    archive = str(tree / 'docs' / 'archive')
+    assert not cache.conn.execute('SELECT 1 FROM directories WHERE path = ?', (archive,)).fetchall()
+    assert not cache.conn.execute('SELECT 1 FROM entries WHERE parent = ?', (archive,)).fetchall()
+
+
+def test_hashes_are_dropped_when_files_change(tree, cache):
+    entries = {entry.rel_path: entry for entry in cache.scan(tree)}
+    guide = entries['docs/guide.md']
+    cache.store_hashes([(guide, 'guide-hash')])
+    assert cache.cached_hash(guide) == 'guide-hash'
+
+    # Rewritten in place: the directory mtime does not change, so the catalog is stale
+    (tree / 'docs' / 'guide.md').write_text('rewritten guide')
+    stale = {entry.rel_path: entry for entry in cache.scan(tree)}['docs/guide.md']
+    assert cache.dirs_reused == 4 and stale.size == guide.size
+    assert cache.cached_hash(stale) is None
+
+    # A freshly stat'ed entry corrects the row and never inherits the old hash
+    stat = os.stat(stale.path)
+    fresh = stale._replace(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+    cache.refresh(fresh)
+    assert cache.cached_hash(fresh) is None
+    assert {entry.rel_path: entry.size for entry in cache.scan(tree)}['docs/guide.md'] == stat.st_size
+
+    cache.store_hashes([(fresh, 'new-hash')])
+    assert cache.cached_hash(fresh) == 'new-hash'
+
+
+def test_hashes_survive_a_relisting_of_unchanged_files(tree, cache):
+    entries = {entry.rel_path: entry for entry in cache.scan(tree)}
+    cache.store_hashes([(entries['docs/guide.md'], 'guide-hash')])
+
+    (tree / 'docs' / 'another.md').write_text('another')
+    age(tree / 'docs')
+    relisted = {entry.rel_path: entry for entry in cache.scan(tree)}
+    assert cache.cached_hash(relisted['docs/guide.md']) == 'guide-hash'
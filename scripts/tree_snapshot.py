@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Compact binary snapshots of a directory tree and a streaming diff between two of them
+A snapshot holds the sorted file paths plus parallel size and mtime arrays; the diff
+walks two snapshots in one merge pass and reports size deltas per directory
+
+Usage:
+    python3 tree_snapshot.py take <snapshot> [directory]
+    python3 tree_snapshot.py diff <old snapshot> <new snapshot>
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.logger import log_action
+from scripts.fs_scanner import scan_tree
+
+SNAPSHOT_DIR = Path("/app/main/web_app/logs/snapshots")
+DIFF_PATH = Path("/app/main/web_app/logs/snapshot_diff.json")
+
+SNAPSHOT_MAGIC = b'TSNP'
+SNAPSHOT_VERSION = 1
+
+# magic, version, file count, path blob length, creation time
+HEADER = struct.Struct('<4sIQQd')
+
+# Directories reported in the diff summary
+TOP_DIRECTORIES = 20
+
+
+def snapshot_path(name):
+    """Resolve a snapshot name or path to a file"""
+    path = Path(name)
+    if path.suffix != '.snap' and path.parent == Path('.'):
+        path = SNAPSHOT_DIR / f"{name}.snap"
+    return path
+
+
+def write_snapshot(path, files):
+    """Write (rel_path, size, mtime_ns) records as a binary snapshot
+
+    Layout after the header, 8-byte aligned in native byte order:
+    path offsets (count + 1 x u64), sizes (count x u64),
+    mtimes (count x i64), then the UTF-8 path blob.
+    """
+    records = sorted((rel_path.encode('utf-8', 'surrogateescape'), size, mtime_ns)
+                     for rel_path, size, mtime_ns in files)
+    offsets = [0]
+    for encoded, _, _ in records:
+        offsets.append(offsets[-1] + len(encoded))
+    count = len(records)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, count, offsets[-1], time.time()))
+        array('Q', offsets).tofile(f)
+        array('Q', (size for _, size, _ in records)).tofile(f)
+        array('q', (mtime_ns for _, _, mtime_ns in records)).tofile(f)
+        for encoded, _, _ in records:
+            f.write(encoded)
+    os.replace(tmp_path, path)
+    log_action(f"Snapshot of {count} files written to {path}")
+    return path
+
+
+def take_snapshot(root, path, skip_dirs=()):
+    """Scan a tree and write its snapshot"""
+    return write_snapshot(path, (
+        (entry.rel_path, entry.size, entry.mtime_ns)
+        for entry in scan_tree(root, skip_dirs) if not entry.is_dir
+    ))
+
+
+class Snapshot:
+    """Memory-mapped snapshot; records are read lazily in path order"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, blob_length, self.created = HEADER.unpack_from(self._map, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            self.close()
+            raise ValueError(f"Not a version {SNAPSHOT_VERSION} snapshot: {self.path}")
+
+        # Zero-copy views over the parallel arrays
+        view = memoryview(self._map)
+        start = HEADER.size
+        self._offsets = view[start:start + 8 * (self.count + 1)].cast('Q')
+        start += 8 * (self.count + 1)
+        self.sizes = view[start:start + 8 * self.count].cast('Q')
+        start += 8 * self.count
+        self.mtimes = view[start:start + 8 * self.count].cast('q')
+        start += 8 * self.count
+        self._blob = view[start:start + blob_length]
+
+    def path_at(self, index):
+        """Encoded relative path of the record at index"""
+        return bytes(self._blob[self._offsets[index]:self._offsets[index + 1]])
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        """Yield (encoded path, size, mtime_ns) in sorted path order"""
+        for index in range(self.count):
+            yield self.path_at(index), self.sizes[index], self.mtimes[index]
+
+    def close(self):
+        """Release the mapping"""
+        for name in ('_offsets', 'sizes', 'mtimes', '_blob'):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _directory_of(encoded_path):
+    return encoded_path.rpartition(b'/')[0]
+
+
+def diff_snapshots(old, new, top_directories=TOP_DIRECTORIES):
+    """Merge-diff two snapshots in one pass over their sorted records
+
+    Only per-directory totals are held in memory; files are streamed.
+    A file's delta is credited to its own directory and every ancestor.
+    """
+    totals = {'added': 0, 'deleted': 0, 'modified': 0, 'unchanged': 0,
+              'bytes_added': 0, 'bytes_deleted': 0, 'size_delta': 0}
+    # directory -> [size delta, added, deleted, modified]
+    directories = {}
+
+    def record(encoded_path, delta, kind):
+        directory = _directory_of(encoded_path)
+        while True:
+            stats = directories.get(directory)
+            if stats is None:
+                stats = directories[directory] = [0, 0, 0, 0]
+            stats[0] += delta
+            stats[kind] += 1
+            if not directory:
+                break
+            directory = _directory_of(directory)
+
+    old_records = iter(old)
+    new_records = iter(new)
+    old_record = next(old_records, None)
+    new_record = next(new_records, None)
+
+    while old_record is not None or new_record is not None:
+        if new_record is None or (old_record is not None and old_record[0] < new_record[0]):
+            totals['deleted'] += 1
+            totals['bytes_deleted'] += old_record[1]
+            record(old_record[0], -old_record[1], 2)
+            old_record = next(old_records, None)
+        elif old_record is None or new_record[0] < old_record[0]:
+            totals['added'] += 1
+            totals['bytes_added'] += new_record[1]
+            record(new_record[0], new_record[1], 1)
+            new_record = next(new_records, None)
+        else:
+            if old_record[1] != new_record[1] or old_record[2] != new_record[2]:
+                totals['modified'] += 1
+                record(new_record[0], new_record[1] - old_record[1], 3)
+            else:
+                totals['unchanged'] += 1
+            old_record = next(old_records, None)
+            new_record = next(new_records, None)
+
+    # The root directory's totals cover the whole tree
+    totals['size_delta'] = directories.get(b'', [0])[0]
+
+    changed = sorted(
+        ((directory, stats) for directory, stats in directories.items() if directory),
+        key=lambda item: (-abs(item[1][0]), item[0])
+    )
+    return {
+        'old_snapshot': str(old.path),
+        'new_snapshot': str(new.path),
+        'old_created': old.created,
+        'new_created': new.created,
+        'totals': totals,
+        'directories': [
+            {
+                'directory': directory.decode('utf-8', 'surrogateescape'),
+                'size_delta': size_delta,
+                'added': added,
+                'deleted': deleted,
+                'modified': modified,
+            }
+            for directory, (size_delta, added, deleted, modified) in changed[:top_directories]
+        ],
+    }
+
+
+def diff_snapshot_files(old_path, new_path, output_path=DIFF_PATH):
+    """Diff two snapshot files, save the report as JSON and print a summary"""
+    with Snapshot(snapshot_path(old_path)) as old, Snapshot(snapshot_path(new_path)) as new:
+        report = diff_snapshots(old, new)
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    log_action(f"Snapshot diff saved to: {output_path}")
+
+    totals = report['totals']
+    print("\n" + "=" * 60)
+    print("Snapshot Diff")
+    print("=" * 60)
+    print(f"Added: {totals['added']} files ({totals['bytes_added'] / (1024*1024):.2f} MB)")
+    print(f"Deleted: {totals['deleted']} files ({totals['bytes_deleted'] / (1024*1024):.2f} MB)")
+    print(f"Modified: {totals['modified']} files")
+    print(f"Net size change: {totals['size_delta'] / (1024*1024):+.2f} MB")
+    print("\nLargest directory changes:")
+    for directory in report['directories'][:10]:
+        print(f"  - {directory['directory']}: {directory['size_delta'] / (1024*1024):+.2f} MB "
+              f"(+{directory['added']} -{directory['deleted']} ~{directory['modified']})")
+    return report
+
+
+def main():
+    """Command line entry point"""
+    if len(sys.argv) >= 3 and sys.argv[1] == 'take':
+        root = Path(sys.argv[3]) if len(sys.argv) > 3 else Path("/app/main/web_app")
+        path = take_snapshot(root, snapshot_path(sys.argv[2]))
+        print(f"Snapshot saved to: {path}")
+    elif len(sys.argv) == 4 and sys.argv[1] == 'diff':
+        diff_snapshot_files(sys.argv[2], sys.argv[3])
+    else:
+        print(__doc__)
+
+
+if __name__ == "__main__":
+    main()